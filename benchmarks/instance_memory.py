@@ -0,0 +1,108 @@
+"""
+A benchmark of the memory used by each state machine instance, in the default and in the compact state encoding.
+
+Each benchmark creates many instances of an empty state machine class and reports the traced memory per instance, which
+includes the instance itself and anything allocated on its behalf, but not the list holding the instances. After the
+instances are created, the benchmark also reports the memory per instance once each has retained an idempotent result.
+
+Run it from the repository root, after installing the package, with:
+
+    python benchmarks/instance_memory.py [--instances INSTANCES]
+"""
+from __future__ import annotations
+
+import tracemalloc
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from enum import auto
+from sys import getsizeof
+from typing import Any, Callable, Dict, Tuple
+
+from attr import mutable
+
+from afsm import State, StateMixin, transition
+
+
+class BenchmarkState(State):
+    """
+    The states of the benchmarked machines.
+    """
+
+    INITIAL = auto()
+    NEXT = auto()
+
+
+try:
+    # pylint: disable-next=unexpected-keyword-arg,useless-suppression # Only unexpected before Python 3.10
+    _slotted_dataclass: Dict[str, Callable[..., Any]] = {"dataclass:slots": dataclass(slots=True)}  # type: ignore
+except TypeError:  # Python < 3.10 does not support slotted dataclasses
+    _slotted_dataclass = {}
+
+CLASS_DECORATORS: Dict[str, Callable[..., Any]] = {
+    "undecorated": lambda cls: cls,
+    "attrs:slots": mutable(slots=True),
+    "dataclass:dict": dataclass,
+    **_slotted_dataclass,
+}
+
+
+def machine_class(class_decorator: Callable[..., Any], compact: bool) -> Any:
+    """
+    Create a state machine class with a single idempotent transition.
+    """
+
+    @class_decorator
+    class BenchmarkMachine(StateMixin, initial_state=BenchmarkState.INITIAL, compact=compact):
+        """
+        A machine without attributes, with a single idempotent transition.
+        """
+
+        @transition(from_=BenchmarkState.INITIAL, to_=BenchmarkState.NEXT, is_idempotent=True)
+        def to_next_state(self) -> bool:
+            """
+            Transition to the next state, retaining the result.
+            """
+            return True
+
+    return BenchmarkMachine
+
+
+def run(cls: Any, instances: int) -> Tuple[float, float]:
+    """
+    Return the traced memory per instance in bytes, before and after each instance retains an idempotent result.
+    """
+    tracemalloc.start()
+
+    try:
+        machines = [cls() for _ in range(instances)]
+        created = (tracemalloc.get_traced_memory()[0] - getsizeof(machines)) / instances
+
+        for machine in machines:
+            machine.to_next_state()
+
+        transitioned = (tracemalloc.get_traced_memory()[0] - getsizeof(machines)) / instances
+        return created, transitioned
+
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    """
+    Run the benchmark for each class decorator and state encoding, and print the memory per instance.
+    """
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--instances", type=int, default=1_000_000, help="instances per benchmark")
+    arguments = parser.parse_args()
+
+    print(f"{'class':<20}{'encoding':<12}{'created':>14}{'transitioned':>18}")
+
+    for name, class_decorator in CLASS_DECORATORS.items():
+        for compact in (False, True):
+            created, transitioned = run(machine_class(class_decorator, compact), arguments.instances)
+            encoding = "compact" if compact else "default"
+            print(f"{name:<20}{encoding:<12}{created:>8.1f} B/inst{transitioned:>12.1f} B/inst")
+
+
+if __name__ == "__main__":
+    main()
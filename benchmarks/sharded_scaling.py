@@ -0,0 +1,116 @@
+"""
+A benchmark of the scaling of a sharded executor with the number of worker processes.
+
+Each round runs one transition on every machine, alternating between two states, and each transition performs a fixed
+amount of work, so that the cost of the transitions dominates the cost of sending them to the workers. The benchmark
+reports the throughput of the executor for each number of processes, and the speedup over a single process running the
+same transitions directly, without an executor.
+
+Run it from the repository root, after installing the package, with:
+
+    python benchmarks/sharded_scaling.py [--machines MACHINES] [--rounds ROUNDS] [--work WORK]
+                                         [--processes PROCESSES [PROCESSES ...]]
+"""
+from __future__ import annotations
+
+import os
+from argparse import ArgumentParser
+from enum import auto
+from time import perf_counter
+from typing import Any, List, Tuple
+
+from afsm import ShardedExecutor, State, StateMixin, transition
+
+
+class BenchmarkState(State):
+    """
+    The two states between which the benchmarked machines alternate.
+    """
+
+    INITIAL = auto()
+    NEXT = auto()
+
+
+class BenchmarkMachine(StateMixin, initial_state=BenchmarkState.INITIAL):
+    """
+    A machine whose transitions perform a fixed amount of work.
+    """
+
+    @transition(from_=BenchmarkState.INITIAL, to_=BenchmarkState.NEXT)
+    def to_next_state(self, work: int) -> int:
+        """
+        Transition to the next state, performing the given amount of work.
+        """
+        return sum(range(work))
+
+    @transition(from_=BenchmarkState.NEXT, to_=BenchmarkState.INITIAL)
+    def to_initial_state(self, work: int) -> int:
+        """
+        Transition back to the initial state, performing the given amount of work.
+        """
+        return sum(range(work))
+
+
+def run_directly(machines: int, rounds: int, work: int) -> float:
+    """
+    Run the transitions in this process, returning the throughput in transitions per second.
+    """
+    instances = [BenchmarkMachine() for _ in range(machines)]
+    start = perf_counter()
+
+    for round_ in range(rounds):
+        name = "to_initial_state" if round_ % 2 else "to_next_state"
+
+        for instance in instances:
+            getattr(instance, name)(work)
+
+    return machines * rounds / (perf_counter() - start)
+
+
+def run_sharded(machines: int, rounds: int, work: int, processes: int) -> float:
+    """
+    Run the transitions with a sharded executor, returning the throughput in transitions per second.
+    """
+    with ShardedExecutor(BenchmarkMachine, machines, processes=processes) as executor:
+        # Create the machines in the workers before timing.
+        executor.run([(key, "to_next_state", (0,)) for key in range(machines)])
+        batches: List[List[Tuple[int, str, Tuple[Any, ...]]]] = [
+            [(key, "to_next_state" if round_ % 2 else "to_initial_state", (work,)) for key in range(machines)]
+            for round_ in range(rounds)
+        ]
+        start = perf_counter()
+
+        for batch in batches:
+            executor.run(batch)
+
+        return machines * rounds / (perf_counter() - start)
+
+
+def main() -> None:
+    """
+    Run the benchmark for each number of processes, and print the throughputs and speedups.
+    """
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--machines", type=int, default=100_000, help="number of machines")
+    parser.add_argument("--rounds", type=int, default=10, help="number of transitions of each machine")
+    parser.add_argument("--work", type=int, default=100, help="amount of work performed by each transition")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, 8, os.cpu_count() or 1}),
+        help="numbers of worker processes",
+    )
+    arguments = parser.parse_args()
+
+    baseline = run_directly(arguments.machines, arguments.rounds, arguments.work)
+    print(f"{'processes':<10}{'transitions/s':>16}{'speedup':>10}")
+    print(f"{'direct':<10}{baseline:>16,.0f}{1:>10.2f}")
+
+    for processes in arguments.processes:
+        throughput = run_sharded(arguments.machines, arguments.rounds, arguments.work, processes)
+        print(f"{processes:<10}{throughput:>16,.0f}{throughput / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
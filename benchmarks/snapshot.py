@@ -0,0 +1,113 @@
+"""
+A benchmark of writing and restoring snapshots of many state machines, compared with pickling them.
+
+The benchmark creates many instances of a slotted ``attrs`` state machine class, with some of them holding the result of
+an idempotent transition, then reports the time taken to write them to a file and to restore them, both with
+:class:`~afsm.Snapshot` and with :mod:`pickle`, along with the size of each file.
+
+Run it from the repository root, after installing the package, with:
+
+    python benchmarks/snapshot.py [--instances INSTANCES] [--directory DIRECTORY]
+"""
+from __future__ import annotations
+
+import os
+import pickle  # nosec B403 - the benchmark only unpickles the file it wrote
+from argparse import ArgumentParser
+from enum import auto
+from functools import partial
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Callable, List
+
+from attr import mutable
+
+from afsm import Snapshot, State, StateMixin, transition
+
+
+class BenchmarkState(State):
+    """
+    The states of the benchmarked machines.
+    """
+
+    INITIAL = auto()
+    NEXT = auto()
+
+
+@mutable
+class BenchmarkMachine(StateMixin, initial_state=BenchmarkState.INITIAL):
+    """
+    A machine with an identifier, which an idempotent transition returns.
+    """
+
+    identifier: int
+
+    @transition(from_=BenchmarkState.INITIAL, to_=BenchmarkState.NEXT, is_idempotent=True)
+    def to_next_state(self) -> int:
+        """
+        Transition to the next state, retaining the identifier of the machine as result.
+        """
+        return self.identifier
+
+
+def timed(function: Callable[[], Any]) -> float:
+    """
+    Return the time taken by a call to a function, in seconds.
+    """
+    start = perf_counter()
+    function()
+    return perf_counter() - start
+
+
+def restore(path: str) -> None:
+    """
+    Restore all the machines of a snapshot file.
+    """
+    with Snapshot(path, BenchmarkMachine) as snapshot:
+        snapshot.restore()
+
+
+def main() -> None:
+    """
+    Run the benchmark with and without results, and print the times and file sizes of snapshots and pickles.
+    """
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--instances", type=int, default=1_000_000, help="number of state machines")
+    parser.add_argument("--directory", help="the directory to write the files to, a temporary one by default")
+    arguments = parser.parse_args()
+
+    machines: List[BenchmarkMachine] = [BenchmarkMachine(identifier) for identifier in range(arguments.instances)]
+
+    for machine in machines[::10]:
+        machine.to_next_state()
+
+    with TemporaryDirectory(dir=arguments.directory) as directory:
+        for results in (False, True):
+            path = os.path.join(directory, f"snapshot-{results}.afsm")
+            write_time = timed(partial(Snapshot.write, path, BenchmarkMachine, machines, results=results))
+            restore_time = timed(partial(restore, path))
+            print(
+                f"{'snapshot' + (' with results' if results else ''):<24}write {write_time:>8.3f} s"
+                f"    restore {restore_time:>8.3f} s    {os.path.getsize(path):>14,} B"
+            )
+
+        path = os.path.join(directory, "machines.pickle")
+
+        def write_pickle() -> None:
+            with open(path, "wb") as pickle_file:
+                pickle.dump(machines, pickle_file, pickle.HIGHEST_PROTOCOL)
+
+        def restore_pickle() -> None:
+            with open(path, "rb") as pickle_file:
+                pickle.load(pickle_file)  # nosec B301
+
+        write_time = timed(write_pickle)
+        restore_time = timed(restore_pickle)
+        print(
+            f"{'pickle':<24}write {write_time:>8.3f} s    restore {restore_time:>8.3f} s"
+            f"    {os.path.getsize(path):>14,} B"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+A benchmark of the startup time of a process that imports the package and defines a catalog of state machine classes.
+
+Each run starts a fresh interpreter, which imports the package, then defines a number of classes with a number of
+transitions each, without creating any instance. The benchmark reports the best import time and class definition time
+out of several runs and, if a budget is given, fails when their sum exceeds it.
+
+Run it from the repository root, after installing the package, with:
+
+    python benchmarks/startup.py [--classes CLASSES] [--transitions TRANSITIONS] [--repeat REPEAT] [--budget BUDGET]
+"""
+from __future__ import annotations
+
+import json
+import subprocess  # nosec B404 - the benchmark only runs the current interpreter
+import sys
+from argparse import ArgumentParser
+from typing import Dict, List
+
+# The script run by each fresh interpreter, which prints its timings in milliseconds as JSON.
+_SCRIPT = """
+import json
+import sys
+from time import perf_counter
+
+start = perf_counter()
+
+from afsm import State, StateMixin, transition
+
+imported = perf_counter()
+classes, transitions = int(sys.argv[1]), int(sys.argv[2])
+BenchmarkState = State("BenchmarkState", [f"STATE_{index}" for index in range(8)])
+states = list(BenchmarkState)
+
+for index in range(classes):
+    namespace = {}
+
+    for number in range(transitions):
+        def method(self):
+            return None
+
+        method.__name__ = method.__qualname__ = f"transition_{number}"
+        namespace[method.__name__] = transition(
+            from_=(states[number % 8], states[(number + 1) % 8]), to_=states[(number + 2) % 8]
+        )(method)
+
+    type(f"BenchmarkMachine{index}", (StateMixin,), namespace, initial_state=states[0])
+
+defined = perf_counter()
+print(json.dumps({"import": (imported - start) * 1e3, "definition": (defined - imported) * 1e3}))
+"""
+
+
+def run(classes: int, transitions: int) -> Dict[str, float]:
+    """
+    Run the script in a fresh interpreter, returning its timings in milliseconds.
+    """
+    output = subprocess.run(  # nosec B603
+        [sys.executable, "-c", _SCRIPT, str(classes), str(transitions)], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)  # type: ignore[no-any-return]
+
+
+def main() -> None:
+    """
+    Run the benchmark with the command line arguments, and exit with an error if the startup time exceeds the budget.
+    """
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--classes", type=int, default=300, help="number of state machine classes")
+    parser.add_argument("--transitions", type=int, default=10, help="number of transitions of each class")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs")
+    parser.add_argument("--budget", type=float, help="the maximum import and definition time, in milliseconds")
+    arguments = parser.parse_args()
+
+    runs: List[Dict[str, float]] = [run(arguments.classes, arguments.transitions) for _ in range(arguments.repeat)]
+    import_time = min(timings["import"] for timings in runs)
+    definition_time = min(timings["definition"] for timings in runs)
+    total = import_time + definition_time
+
+    print(f"import {import_time:>10.1f} ms")
+    print(f"define {definition_time:>10.1f} ms  ({arguments.classes} classes x {arguments.transitions} transitions)")
+    print(f"total  {total:>10.1f} ms")
+
+    if arguments.budget is not None and total > arguments.budget:
+        sys.exit(f"The startup time of {total:.1f} ms exceeds the budget of {arguments.budget:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
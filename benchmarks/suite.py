@@ -0,0 +1,220 @@
+"""
+A benchmark suite of the transition overhead, the error paths and the memory of state machines, over the same class
+decorators as the tests.
+
+For each class decorator, the suite times successful transitions, idempotent transitions returning a retained result,
+transitions rejected with a :exc:`~afsm.StateError` or, without raising, with a :class:`~afsm.Rejection`, transitions
+handling an exception with ``on_exception``, and instance creation through :meth:`StateMixin.__new__`, reporting the
+best time per call out of several repetitions. It also reports the traced memory per instance. Results are written as
+JSON, and can be compared with the results of a previous run, for example of another version of the package, to spot
+regressions.
+
+Run it from the repository root, after installing the package, with:
+
+    python benchmarks/suite.py [--number NUMBER] [--repeat REPEAT] [--instances INSTANCES]
+                               [--output OUTPUT] [--compare BASELINE]
+"""
+from __future__ import annotations
+
+import json
+import platform
+import tracemalloc
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from enum import auto
+from functools import partial
+from sys import getsizeof
+from timeit import repeat
+from typing import Any, Callable, Dict, List, Optional
+
+from attr import frozen, mutable
+
+import afsm
+from afsm import State, StateError, StateMixin, transition
+
+
+class BenchmarkState(State):
+    """
+    The states of the benchmarked machines.
+    """
+
+    INITIAL = auto()
+    NEXT = auto()
+
+
+try:
+    # pylint: disable-next=unexpected-keyword-arg,useless-suppression # Only unexpected before Python 3.10
+    _slotted_dataclasses: Dict[str, Callable[..., Any]] = {
+        "dataclass:mutable,slots": dataclass(slots=True),  # type: ignore[call-overload]
+        "dataclass:frozen,slots": dataclass(frozen=True, slots=True),  # type: ignore[call-overload]
+    }
+except TypeError:  # Python < 3.10 does not support slotted dataclasses
+    _slotted_dataclasses = {}
+
+CLASS_DECORATORS: Dict[str, Callable[..., Any]] = {
+    "undecorated": lambda cls: cls,
+    "attrs:mutable,dict": mutable(slots=False),
+    "attrs:mutable,slots": mutable(slots=True),
+    "attrs:frozen,dict": frozen(slots=False),
+    "attrs:frozen,slots": frozen(slots=True),
+    "dataclass:mutable,dict": dataclass(frozen=False),
+    "dataclass:frozen,dict": dataclass(frozen=True),
+    **_slotted_dataclasses,
+}
+
+
+def _handle_exception(_: Any, __: Exception) -> None:
+    return None
+
+
+def machine_class(class_decorator: Callable[..., Any]) -> Any:
+    """
+    Create a state machine class with a transition for each benchmark.
+    """
+
+    @class_decorator
+    class BenchmarkMachine(StateMixin, initial_state=BenchmarkState.INITIAL):
+        """
+        A machine with a transition for each benchmark, which all do nothing but return or raise.
+        """
+
+        @transition(from_=(BenchmarkState.INITIAL, BenchmarkState.NEXT), to_=BenchmarkState.INITIAL)
+        def transitioning(self) -> None:
+            """
+            A transition that succeeds, checking then changing the state.
+            """
+
+        @transition(from_=BenchmarkState.NEXT, to_=BenchmarkState.INITIAL, is_idempotent=True)
+        def idempotent(self) -> None:
+            """
+            An idempotent transition, which returns its retained result once the new state is reached.
+            """
+
+        @transition(from_=BenchmarkState.NEXT, to_=BenchmarkState.INITIAL)
+        def rejected(self) -> None:
+            """
+            A transition that is always rejected, as the machine never reaches its expected state.
+            """
+
+        @transition(from_=BenchmarkState.INITIAL, to_=BenchmarkState.INITIAL, on_exception=_handle_exception)
+        def exception_handling(self) -> None:
+            """
+            A transition that raises an exception, which its exception handler handles.
+            """
+            raise ValueError()
+
+    return BenchmarkMachine
+
+
+def time_calls(cls: Any, number: int, repetitions: int) -> Dict[str, float]:
+    """
+    Time each benchmark on an instance of a class, returning the best time per call in nanoseconds keyed by name.
+    """
+    machine = cls()
+    rejected = machine.rejected
+
+    def rejection() -> None:
+        try:
+            rejected()
+        except StateError:
+            pass
+
+    benchmarks: Dict[str, Callable[[], Any]] = {
+        "transition": machine.transitioning,
+        "idempotent": machine.idempotent,
+        "rejection": rejection,
+        "rejection_without_raising": partial(cls.rejected.try_, machine),
+        "exception_handling": machine.exception_handling,
+        "creation": cls,
+    }
+
+    return {
+        name: min(repeat(benchmark, number=number, repeat=repetitions)) / number * 1e9
+        for name, benchmark in benchmarks.items()
+    }
+
+
+def instance_memory(cls: Any, instances: int) -> float:
+    """
+    Return the traced memory per instance of a class in bytes.
+    """
+    tracemalloc.start()
+
+    try:
+        machines = [cls() for _ in range(instances)]
+        return (tracemalloc.get_traced_memory()[0] - getsizeof(machines)) / instances
+    finally:
+        tracemalloc.stop()
+
+
+def run(number: int, repetitions: int, instances: int) -> Dict[str, Any]:
+    """
+    Run the suite, returning its results along with a description of the environment they were measured in.
+    """
+    results: List[Dict[str, Any]] = []
+
+    for name, class_decorator in CLASS_DECORATORS.items():
+        cls = machine_class(class_decorator)
+
+        for benchmark, timing in time_calls(cls, number, repetitions).items():
+            results.append({"class": name, "benchmark": benchmark, "value": timing, "unit": "ns/call"})
+
+        results.append(
+            {"class": name, "benchmark": "memory", "value": instance_memory(cls, instances), "unit": "B/instance"}
+        )
+
+    return {
+        "afsm": afsm.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def report(suite: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    """
+    Print the results of the suite, with their ratio to the same results in a baseline if given.
+    """
+    baseline_values = {
+        (result["class"], result["benchmark"]): result["value"] for result in (baseline or {}).get("results", ())
+    }
+
+    for result in suite["results"]:
+        line = f"{result['class']:<26}{result['benchmark']:<28}{result['value']:>10.1f} {result['unit']:<12}"
+        baseline_value = baseline_values.get((result["class"], result["benchmark"]))
+
+        if baseline_value:
+            line += f"{result['value'] / baseline_value:>8.2f}x"
+
+        print(line)
+
+
+def main() -> None:
+    """
+    Run the suite, print its results, and write them to a file or compare them with a baseline if requested.
+    """
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=200_000, help="calls per repetition")
+    parser.add_argument("--repeat", type=int, default=5, help="number of repetitions")
+    parser.add_argument("--instances", type=int, default=100_000, help="instances for the memory benchmark")
+    parser.add_argument("--output", help="the JSON file to write the results to")
+    parser.add_argument("--compare", help="a JSON file of results of a previous run to compare with")
+    arguments = parser.parse_args()
+
+    baseline = None
+
+    if arguments.compare:
+        with open(arguments.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+    suite = run(arguments.number, arguments.repeat, arguments.instances)
+    report(suite, baseline)
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as output_file:
+            json.dump(suite, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
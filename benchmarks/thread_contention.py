@@ -0,0 +1,114 @@
+"""
+A benchmark of thread-safe transitions under contention, from 1 to 32 threads.
+
+Each thread calls a transition in a tight loop, either on a machine of its own or on a single machine shared by all
+threads, and the benchmark reports the total throughput of all threads. On the shared machine, transitions that find
+the machine claimed by another thread raise a :exc:`~afsm.StateError`, and are counted as rejected. Machines that are
+not thread-safe are timed alongside, as a baseline.
+
+On free-threaded builds of CPython, the throughput on machines of their own should scale with the number of threads.
+
+Run it from the repository root, after installing the package, with:
+
+    python benchmarks/thread_contention.py [--calls CALLS] [--threads THREADS [THREADS ...]]
+"""
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from enum import auto
+from threading import Barrier, Thread
+from time import perf_counter
+from typing import List, Tuple, Type
+
+from afsm import State, StateError, StateMixin, transition
+
+
+class BenchmarkState(State):
+    """
+    The states of the benchmarked machines.
+    """
+
+    INITIAL = auto()
+    NEXT = auto()
+
+
+class BenchmarkMachine(StateMixin, initial_state=BenchmarkState.INITIAL):
+    """
+    A machine that is not thread-safe, with a transition that does nothing else than checking and changing its state.
+    """
+
+    @transition(from_=(BenchmarkState.INITIAL, BenchmarkState.NEXT), to_=BenchmarkState.INITIAL)
+    def checked_and_transitioning(self) -> None:
+        """
+        Check the state of the machine, then change it.
+        """
+        return None
+
+
+class ThreadSafeMachine(BenchmarkMachine, thread_safe=True):
+    """
+    A thread-safe machine, whose transitions claim it under a striped lock.
+    """
+
+
+MACHINE_CLASSES = {"unsafe": BenchmarkMachine, "thread_safe": ThreadSafeMachine}
+
+
+def run(machine_class: Type[BenchmarkMachine], threads: int, calls: int, shared: bool) -> Tuple[float, int]:
+    """
+    Run the transition from all threads, returning the throughput in calls per second and the number of rejected calls.
+    """
+    shared_machine = machine_class()
+    barrier = Barrier(threads + 1)
+    rejections: List[int] = []
+
+    def call_transition() -> None:
+        """
+        Call the transition once all threads are started, counting the rejected calls.
+        """
+        transition_ = (shared_machine if shared else machine_class()).checked_and_transitioning
+        rejected = 0
+        barrier.wait()
+
+        for _ in range(calls):
+            try:
+                transition_()
+            except StateError:
+                rejected += 1
+
+        rejections.append(rejected)
+
+    workers = [Thread(target=call_transition) for _ in range(threads)]
+
+    for worker in workers:
+        worker.start()
+
+    barrier.wait()
+    start = perf_counter()
+
+    for worker in workers:
+        worker.join()
+
+    return threads * calls / (perf_counter() - start), sum(rejections)
+
+
+def main() -> None:
+    """
+    Run the benchmark for each kind of machine and number of threads, and print the throughputs.
+    """
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000, help="calls per thread")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="numbers of threads")
+    arguments = parser.parse_args()
+
+    print(f"{'machine':<14}{'threads':>8}{'own calls/s':>16}{'shared calls/s':>16}{'rejected':>10}")
+
+    for name, machine_class in MACHINE_CLASSES.items():
+        for threads in arguments.threads:
+            own_throughput, _ = run(machine_class, threads, arguments.calls, shared=False)
+            shared_throughput, rejected = run(machine_class, threads, arguments.calls, shared=True)
+            print(f"{name:<14}{threads:>8}{own_throughput:>16,.0f}{shared_throughput:>16,.0f}{rejected:>10,}")
+
+
+if __name__ == "__main__":
+    main()
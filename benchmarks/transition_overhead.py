@@ -0,0 +1,115 @@
+"""
+A micro-benchmark of the overhead :class:`~afsm.transition` adds to a method call.
+
+Each benchmark calls a method of the same state machine instance in a tight loop, and reports the best time per call
+out of several repetitions, alongside its ratio to the time per call of an undecorated method.
+
+Run it from the repository root, after installing the package, with:
+
+    python benchmarks/transition_overhead.py [--number NUMBER] [--repeat REPEAT]
+"""
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from enum import auto
+from timeit import repeat
+from typing import Any, Callable, Dict
+
+from afsm import State, StateMixin, transition
+
+
+class BenchmarkState(State):
+    """
+    The states of the benchmarked machine.
+    """
+
+    INITIAL = auto()
+    NEXT = auto()
+
+
+def _handle_exception(_: Any, __: Exception) -> None:
+    return None
+
+
+class BenchmarkMachine(StateMixin, initial_state=BenchmarkState.INITIAL):
+    """
+    A machine with a method for each benchmark, which all do nothing but return.
+    """
+
+    def undecorated(self) -> None:
+        """
+        A method without state checks, the baseline of the other benchmarks.
+        """
+        return None
+
+    @transition()
+    def unchecked(self) -> None:
+        """
+        A transition that neither checks nor changes the state.
+        """
+        return None
+
+    @transition(from_=BenchmarkState.INITIAL)
+    def checked(self) -> None:
+        """
+        A transition that checks the state, without changing it.
+        """
+        return None
+
+    @transition(from_=(BenchmarkState.NEXT, BenchmarkState.INITIAL), to_=BenchmarkState.INITIAL)
+    def checked_and_transitioning(self) -> None:
+        """
+        A transition that checks the state, then changes it.
+        """
+        return None
+
+    @transition(from_=BenchmarkState.NEXT, to_=BenchmarkState.INITIAL, is_idempotent=True)
+    def idempotent(self) -> None:
+        """
+        An idempotent transition, which returns its retained result once the new state is reached.
+        """
+        return None
+
+    @transition(from_=BenchmarkState.INITIAL, to_=BenchmarkState.INITIAL, on_exception=_handle_exception)
+    def exception_handling(self) -> None:
+        """
+        A transition with an exception handler, which is not called as the method does not raise.
+        """
+        return None
+
+
+BENCHMARKS = ("undecorated", "unchecked", "checked", "checked_and_transitioning", "idempotent", "exception_handling")
+
+
+def run(number: int, repetitions: int) -> Dict[str, float]:
+    """
+    Time each benchmark method, returning the best time per call in nanoseconds keyed by method name.
+    """
+    machine = BenchmarkMachine()
+    timings = {}
+
+    for name in BENCHMARKS:
+        method: Callable[[], None] = getattr(machine, name)
+        timings[name] = min(repeat(method, number=number, repeat=repetitions)) / number * 1e9
+
+    return timings
+
+
+def main() -> None:
+    """
+    Run the benchmarks, and print their times per call and their ratios to the time per call of an undecorated method.
+    """
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=1_000_000, help="calls per repetition")
+    parser.add_argument("--repeat", type=int, default=5, help="number of repetitions")
+    arguments = parser.parse_args()
+
+    timings = run(arguments.number, arguments.repeat)
+    baseline = timings["undecorated"]
+
+    for name, timing in timings.items():
+        print(f"{name:<28}{timing:>8.1f} ns/call{timing / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -41,8 +41,88 @@ Third, define the finite atate machine. Use :class:`~afsm.StateMixin`. Specify a
     >>>
 """
 
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+from afsm._cache import CacheInfo, CacheScope, ResultCache, Retention
 from afsm._fsm import StateMixin, Transition as transition
-from afsm._state import State, StateError
+from afsm._population import Population
+from afsm._state import GuardError, Rejection, State, StateError, TransientState, TransitioningMethod
+from afsm._table import TransitionTable, dispatch_many
+from afsm._timer import TimingWheel
+
+if TYPE_CHECKING:  # pragma: no cover
+    from afsm._codec import StateCodec
+    from afsm._fleet import Fleet
+    from afsm._journal import Journal, JournalRecord
+    from afsm._observe import LatencyHistogram, Observer, TransitionMetrics, observe, unobserve
+    from afsm._shard import ShardedExecutor
+    from afsm._snapshot import Snapshot
+
+# The subsystems that defining and using state machines does not need, which are imported when first accessed, so that
+# importing the package only imports its core.
+_LAZY_ATTRIBUTES = {
+    "Fleet": "afsm._fleet",
+    "Journal": "afsm._journal",
+    "JournalRecord": "afsm._journal",
+    "LatencyHistogram": "afsm._observe",
+    "Observer": "afsm._observe",
+    "ShardedExecutor": "afsm._shard",
+    "Snapshot": "afsm._snapshot",
+    "StateCodec": "afsm._codec",
+    "TransitionMetrics": "afsm._observe",
+    "observe": "afsm._observe",
+    "unobserve": "afsm._observe",
+}
 
 __version__ = "1.0.0"
-__all__ = ["StateMixin", "State", "StateError", "transition"]
+__all__ = [
+    "CacheInfo",
+    "CacheScope",
+    "Fleet",
+    "GuardError",
+    "Journal",
+    "JournalRecord",
+    "LatencyHistogram",
+    "Observer",
+    "Population",
+    "Rejection",
+    "ResultCache",
+    "Retention",
+    "ShardedExecutor",
+    "Snapshot",
+    "StateCodec",
+    "StateMixin",
+    "State",
+    "StateError",
+    "TimingWheel",
+    "TransientState",
+    "TransitionMetrics",
+    "TransitionTable",
+    "TransitioningMethod",
+    "dispatch_many",
+    "observe",
+    "transition",
+    "unobserve",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import the subsystem defining an attribute of the package when the attribute is first accessed.
+    """
+    module = _LAZY_ATTRIBUTES.get(name)
+
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """
+    Return the attributes of the package, including those of the subsystems that are not imported yet.
+    """
+    return sorted({*globals(), *_LAZY_ATTRIBUTES})
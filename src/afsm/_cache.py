@@ -0,0 +1,229 @@
+"""
+This module defines how the results of idempotent transitions are cached.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from enum import Enum, unique
+from typing import Any, Callable, Hashable, NamedTuple, Optional, Tuple
+from weakref import ref
+
+from afsm._state import StateField
+
+# The key of the memoized results of the guards of an instance, keyed by guard, in the results mapping.
+GUARDS_KEY = object()
+
+# The key of the lock that serializes the asynchronous transitions of an instance, in the results mapping.
+ASYNC_LOCK_KEY = object()
+
+
+@unique
+class Retention(Enum):
+    """
+    An :class:`~Enum` of policies that define how long the result of an idempotent transition is retained. The retained
+    result is returned by later calls to the transition, as long as the instance remains in the new state.
+
+    Example:
+        >>> from enum import auto
+        >>> from afsm import Retention, State, StateMixin, transition
+        ...
+        >>> class MachineState(State):
+        ...     INITIAL = auto()
+        ...     FINAL = auto()
+        ...
+        >>> class AFiniteStateMachine(
+        ...     StateMixin, initial_state=MachineState.INITIAL, result_retention=Retention.CLEAR_ON_LEAVE
+        ... ):
+        ...     @transition(from_=MachineState.INITIAL, to_=MachineState.FINAL, is_idempotent=True)
+        ...     def to_final_state(self):
+        ...         return "a large payload"
+
+    Attributes:
+        STRONG: the result is retained until the transition is called again from an expected state.
+        WEAK: the result is retained through a weak reference, so it is returned only while it is referenced elsewhere.
+              Results that do not support weak references, such as strings or numbers, are retained as with
+              :attr:`STRONG`.
+        CLEAR_ON_LEAVE: the result is retained until the instance leaves the new state of the transition.
+    """
+
+    STRONG = "strong"
+    WEAK = "weak"
+    CLEAR_ON_LEAVE = "clear_on_leave"
+
+
+class ResultRef(ref):  # type: ignore[type-arg] # pylint: disable=too-few-public-methods
+    """
+    A weak reference to a result retained with :attr:`Retention.WEAK`. Its type distinguishes it from results that are
+    themselves weak references.
+    """
+
+    __slots__ = ()
+
+
+@unique
+class CacheScope(Enum):
+    """
+    An :class:`~Enum` of scopes for the :class:`ResultCache` of an idempotent transition that memoizes its results by
+    call arguments.
+
+    Attributes:
+        INSTANCE: each instance has its own cache, allocated when its first result is stored.
+        CLASS: a single cache, keyed by instance and call arguments, is shared by all instances of the class, which
+               bounds the number of results they memoize together. The cache references each instance with a result
+               until the result is evicted.
+    """
+
+    INSTANCE = "instance"
+    CLASS = "class"
+
+
+class CacheInfo(NamedTuple):
+    """
+    Statistics of a :class:`ResultCache`, with the same fields as those reported by :func:`functools.lru_cache`.
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class ResultCache:
+    """
+    A cache of the results of an idempotent transition keyed by call arguments. When the cache is full, the least
+    recently used result is evicted. A hit is a result found in the cache, and a miss a result computed then cached.
+
+    Example:
+        >>> from enum import auto
+        >>> from afsm import State, StateMixin, transition
+        ...
+        >>> class MachineState(State):
+        ...     INITIAL = auto()
+        ...     OPEN = auto()
+        ...
+        >>> class AFiniteStateMachine(StateMixin, initial_state=MachineState.INITIAL):
+        ...     @transition(from_=MachineState.INITIAL, to_=MachineState.OPEN, is_idempotent=True, cache_size=2)
+        ...     def open(self, path):
+        ...         return f"opened {path}"
+        ...
+        >>> afsm = AFiniteStateMachine()
+        >>> afsm.open("first")
+        'opened first'
+        >>> afsm.open("second")
+        'opened second'
+        >>> afsm.open("first")
+        'opened first'
+        >>> AFiniteStateMachine.open.cache_info(afsm)
+        CacheInfo(hits=1, misses=2, maxsize=2, currsize=2)
+
+    Arguments:
+        maxsize: the maximum number of results in the cache.
+    """
+
+    __slots__ = ("maxsize", "hits", "misses", "_results")
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the result cached for a key and mark it as the most recently used, or ``default`` if there is none.
+        """
+        results = self._results
+
+        if key in results:
+            self.hits += 1
+            results.move_to_end(key)
+            return results[key]
+
+        return default
+
+    def put(self, key: Hashable, result: Any) -> None:
+        """
+        Cache the result computed for a key as the most recently used, evicting the least recently used result if
+        full, and count a miss.
+        """
+        self.misses += 1
+        results = self._results
+        results[key] = result
+        results.move_to_end(key)
+
+        if len(results) > self.maxsize:
+            results.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove all results from the cache and reset its statistics.
+        """
+        self._results.clear()
+        self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Return the statistics of the cache.
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._results))
+
+    def copy(self) -> ResultCache:
+        """
+        Return a copy of the cache, with the same results and statistics.
+        """
+        cache = ResultCache(self.maxsize)
+        cache.hits = self.hits
+        cache.misses = self.misses
+        cache._results = self._results.copy()  # pylint: disable=protected-access
+        return cache
+
+
+def cache_functions(
+    method: Callable[..., Any], cache_size: int, shared_cache: Optional[ResultCache]
+) -> Tuple[Callable[..., CacheInfo], Callable[..., None]]:
+    """
+    Return the functions that report statistics of, and clear, the results memoized by a decorated method.
+    """
+    if shared_cache is not None:
+        return shared_cache.info, shared_cache.clear
+
+    def instance_cache(instance: Any) -> Optional[ResultCache]:
+        results = getattr(instance, StateField.RETURN_VALUES.value)
+        return None if results is None else results.get(method, None)
+
+    def cache_info(instance: Any) -> CacheInfo:
+        cache = instance_cache(instance)
+        return CacheInfo(0, 0, cache_size, 0) if cache is None else cache.info()
+
+    def cache_clear(instance: Any) -> None:
+        cache = instance_cache(instance)
+
+        if cache is not None:
+            cache.clear()
+
+    return cache_info, cache_clear
+
+
+def clear_guards(guards: Tuple[Callable[[Any], Any], ...], instance: Any) -> None:
+    """
+    Clear the results of the given guards memoized by an instance.
+    """
+    results = getattr(instance, StateField.RETURN_VALUES.value)
+    guard_results = None if results is None else results.get(GUARDS_KEY, None)
+
+    if guard_results is not None:
+        for guard in guards:
+            guard_results.pop(guard, None)
+
+
+def async_lock() -> Any:
+    """
+    Return a new :class:`asyncio.Lock`, to serialize the asynchronous transitions of an instance.
+    """
+    # The core of the package, which this module belongs to, does not import `asyncio` until a lock is needed.
+    from asyncio import Lock as AsyncLock  # pylint: disable=import-outside-toplevel
+
+    return AsyncLock()
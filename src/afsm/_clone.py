@@ -0,0 +1,151 @@
+"""
+This module defines how state machines are copied from a prototype, with their state, results and attributes, without
+calling their ``__init__()`` method.
+"""
+from __future__ import annotations
+
+from collections.abc import MutableMapping, MutableSequence, MutableSet
+from copy import copy
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from afsm._cache import ASYNC_LOCK_KEY, GUARDS_KEY, ResultCache
+from afsm._state import StateField, TransientState
+from afsm._timer import TIMERS_KEY
+
+_Machine = TypeVar("_Machine")
+
+# The slots holding the state and the results, which are copied separately from the other attributes.
+_STATE_SLOTS = frozenset((StateField.STATE.value, StateField.RETURN_VALUES.value, "__dict__", "__weakref__"))
+
+# The mutable containers that attributes are copied from rather than shared with, such as the lists and dictionaries
+# created by the factories of `attrs` or `dataclass` fields.
+_CONTAINERS = (MutableSequence, MutableMapping, MutableSet)
+
+
+def clone_many(  # pylint: disable=too-many-locals # The setters and values are resolved once, outside the loop
+    prototype: _Machine, count: int, new: Callable[[], _Machine]
+) -> List[_Machine]:
+    """
+    Return copies of a prototype, with the same state, a copy of its results, and the same attributes. Attributes that
+    are mutable sequences, mappings or sets are copied with :func:`copy.copy`, so that copies do not share them, but
+    their items are not, and other attributes are shared with the prototype. Copies are created with a constructor
+    that leaves them uninitialized, then their state, results and attributes are set through slot descriptors and
+    instance dictionaries, bypassing the ``__setattr__()`` method of frozen classes. Copies are tracked in the
+    population of their class, if any, and copies of instances of classes with timed transitions are scheduled in their
+    state.
+
+    Raises:
+        :exc:`ValueError`: if the prototype is in :attr:`TransientState.IN_TRANSITION`.
+    """
+    cls: type = type(prototype)
+    options = getattr(cls, StateField.CLASS_OPTIONS.value)
+    state = getattr(prototype, StateField.STATE.value)
+
+    if options.thread_safe and state == options.encode(TransientState.IN_TRANSITION):
+        raise ValueError("Machines in transition cannot be cloned")
+
+    results: Optional[Dict[Any, Any]] = getattr(prototype, StateField.RETURN_VALUES.value)
+    set_state, set_results, slots, has_dict = _setters(cls)
+    values = [(set_slot, value) for set_slot, get_slot in slots for value in _slot_value(get_slot, prototype)]
+    shared_slots = [(set_slot, value) for set_slot, value in values if not isinstance(value, _CONTAINERS)]
+    copied_slots = [(set_slot, value) for set_slot, value in values if isinstance(value, _CONTAINERS)]
+    attributes: Dict[str, Any] = vars(prototype) if has_dict else {}
+    shared_attributes = {name: value for name, value in attributes.items() if not isinstance(value, _CONTAINERS)}
+    copied_attributes = [(name, value) for name, value in attributes.items() if isinstance(value, _CONTAINERS)]
+    track = None if options.timers is None or not options.timeouts else options.timers.track
+    populate = None if options.population is None else options.population.track
+
+    # Create the copies in a single loop with the setters resolved once, as bulk creation of millions of machines is
+    # bounded by the cost of each iteration.
+    clones: List[_Machine] = []
+    append = clones.append
+
+    for _ in range(count):
+        clone = new()
+        set_state(clone, state)
+        set_results(clone, None if results is None else copy_results(results))
+
+        for set_slot, value in shared_slots:
+            set_slot(clone, value)
+
+        for set_slot, value in copied_slots:
+            set_slot(clone, copy(value))
+
+        if has_dict:
+            instance_dict = vars(clone)
+            instance_dict.update(shared_attributes)
+
+            for name, value in copied_attributes:
+                instance_dict[name] = copy(value)
+
+        if populate is not None:
+            populate(clone)
+
+        if track is not None:
+            track(clone)
+
+        append(clone)
+
+    return clones
+
+
+def copy_results(results: Dict[Any, Any]) -> Optional[Dict[Any, Any]]:
+    """
+    Return a copy of the results of an instance, with copies of its result caches and of the memoized results of its
+    guards, but without its lock and timers, which belong to the instance.
+    """
+    copied: Dict[Any, Any] = {}
+
+    for key, value in results.items():
+        if key is ASYNC_LOCK_KEY or key is TIMERS_KEY:
+            continue
+
+        if key is GUARDS_KEY:
+            value = dict(value)
+        elif type(value) is ResultCache:  # pylint: disable=unidiomatic-typecheck
+            value = value.copy()
+
+        copied[key] = value
+
+    return copied or None
+
+
+@lru_cache(maxsize=None)
+def _setters(
+    cls: type,
+) -> Tuple[Callable[..., None], Callable[..., None], Tuple[Tuple[Callable[..., None], Callable[..., Any]], ...], bool]:
+    """
+    Return the setters of the state and the results of the instances of a class, the setter and getter of each of their
+    other slots, and whether they have an instance dictionary.
+    """
+    slots: List[Tuple[Callable[..., None], Callable[..., Any]]] = []
+
+    for class_ in cls.__mro__:
+        names = vars(class_).get("__slots__", ())
+
+        for name in (names,) if isinstance(names, str) else names:
+            # Private names are mangled with the name of the class declaring them.
+            if name.startswith("__") and not name.endswith("__"):
+                name = f"_{class_.__name__.lstrip('_')}{name}"
+
+            if name not in _STATE_SLOTS and name in vars(class_):
+                descriptor = vars(class_)[name]
+                slots.append((descriptor.__set__, descriptor.__get__))
+
+    return (
+        getattr(cls, StateField.STATE.value).__set__,
+        getattr(cls, StateField.RETURN_VALUES.value).__set__,
+        tuple(slots),
+        cls.__dictoffset__ != 0,
+    )
+
+
+def _slot_value(get_slot: Callable[..., Any], instance: Any) -> Tuple[Any, ...]:
+    """
+    Return the value of a slot of an instance in a tuple, or an empty tuple if the slot is not set.
+    """
+    try:
+        return (get_slot(instance),)
+    except AttributeError:
+        return ()
@@ -0,0 +1,246 @@
+"""
+This module defines the codec of a :class:`State` class, which converts between its members, their names and values,
+and their integer codes, one at a time or in batches.
+"""
+from __future__ import annotations
+
+import sys
+from functools import lru_cache
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, Type, TypeVar
+
+from afsm._state import State
+
+_State = TypeVar("_State", bound=State)
+
+
+class StateCodec(Generic[_State]):
+    """
+    The codec of a :class:`State` class, with tables computed once per class, that converts names and values of states,
+    as read from messages or database rows, to members or to integer codes, and integer codes back to members, names or
+    values. The integer code of a state is its index within its class, the code used by compact state machines, see
+    :class:`~afsm.StateMixin`, and by :class:`~afsm.Fleet`.
+
+    States are decoded from their member, name or value, with a single dictionary lookup. Names and values that are
+    strings are also decoded in lower case, upper case, or as UTF-8 bytes, and other strings are decoded regardless of
+    their case, so they need no normalization. Values take precedence over names that are equal to them.
+
+    Batches are lists, or NumPy arrays that are converted with array operations rather than a conversion per element,
+    and are returned as lists or NumPy arrays respectively.
+
+    Example:
+        >>> from enum import auto
+        >>> from afsm import State, StateCodec
+        ...
+        >>> class MachineState(State):
+        ...     INITIAL = auto()
+        ...     FINAL = "done"
+        ...
+        >>> codec = StateCodec.of(MachineState)
+        >>> codec.decode("done") is MachineState.FINAL
+        True
+        >>> codec.encode_many(["initial", "FINAL", b"done", MachineState.INITIAL])
+        [0, 1, 1, 0]
+        >>> codec.from_codes([1, 0], codec.values)
+        ['done', 'INITIAL']
+
+    Arguments:
+        state_class: the :class:`State` class.
+
+    Attributes:
+        state_class: the :class:`State` class.
+        members: the members of the class, indexed by integer code.
+        names: the names of the members, indexed by integer code.
+        values: the values of the members, indexed by integer code.
+    """
+
+    def __init__(self, state_class: Type[_State]) -> None:
+        self.state_class = state_class
+        self.members: Tuple[_State, ...] = tuple(state_class)
+        self.names: Tuple[str, ...] = tuple(member.name for member in self.members)
+        self.values: Tuple[Any, ...] = tuple(member.value for member in self.members)
+
+        codes: Dict[Any, int] = {}
+        folded: Dict[str, Optional[int]] = {}
+
+        for code, member in enumerate(self.members):
+            codes[member] = code
+            codes.setdefault(member.name, code)
+
+        for code, value in enumerate(self.values):
+            if isinstance(value, Hashable):
+                codes[value] = code
+
+        # Add the variants of names and values after them, so that they never shadow a name or a value.
+        for code, key in (*enumerate(self.names), *enumerate(self.values)):
+            if isinstance(key, str):
+                for variant in (key.lower(), key.upper(), key.encode(), key.lower().encode(), key.upper().encode()):
+                    codes.setdefault(variant, code)
+
+                # Strings equal regardless of their case, but of different members, are ambiguous.
+                folded[key.casefold()] = code if folded.get(key.casefold(), code) == code else None
+
+        self._codes = codes
+        self._folded = {key: code for key, code in folded.items() if code is not None}
+        self._members: Dict[Any, _State] = {key: self.members[code] for key, code in codes.items()}
+
+    @classmethod
+    def of(cls, state_class: Type[_State]) -> StateCodec[_State]:
+        """
+        Return the codec of a :class:`State` class, which is created when first requested.
+        """
+        return _codec(state_class)  # type: ignore[return-value]
+
+    def decode(self, key: Any) -> _State:
+        """
+        Return the member with the given name or value, or the given member.
+
+        Raises:
+            :exc:`ValueError`: if no member has the given name or value.
+        """
+        try:
+            return self._members[key]
+        except (KeyError, TypeError):
+            return self.members[self._code(key)]
+
+    def encode(self, key: Any) -> int:
+        """
+        Return the integer code of the member with the given name or value, or of the given member.
+
+        Raises:
+            :exc:`ValueError`: if no member has the given name or value.
+        """
+        try:
+            return self._codes[key]
+        except (KeyError, TypeError):
+            return self._code(key)
+
+    def decode_many(self, keys: Any) -> Any:
+        """
+        Return the members with the given names or values, or the given members, as a list, or as a NumPy array of
+        objects if the keys are a NumPy array.
+
+        Raises:
+            :exc:`ValueError`: if no member has one of the given names or values.
+        """
+        numpy = _numpy_of(keys)
+
+        if numpy is not None:
+            return self._array(numpy, self.members)[self.encode_many(keys)]
+
+        members = self._members
+        keys = keys if isinstance(keys, (list, tuple)) else list(keys)
+
+        try:
+            return [members[key] for key in keys]
+        except (KeyError, TypeError):
+            return list(map(self.decode, keys))
+
+    def encode_many(self, keys: Any) -> Any:
+        """
+        Return the integer codes of the members with the given names or values, or of the given members, as a list, or
+        as a NumPy array of the smallest unsigned integer type that holds every code if the keys are a NumPy array.
+        Arrays are encoded one distinct key at a time.
+
+        Raises:
+            :exc:`ValueError`: if no member has one of the given names or values.
+        """
+        numpy = _numpy_of(keys)
+
+        if numpy is not None:
+            dtype = numpy.min_scalar_type(max(len(self.members) - 1, 0))
+
+            try:
+                distinct, inverse = numpy.unique(keys, return_inverse=True)
+            except TypeError:  # Object arrays of keys that cannot be ordered
+                return numpy.fromiter(map(self.encode, keys.ravel().tolist()), dtype).reshape(keys.shape)
+
+            codes = numpy.fromiter(map(self.encode, distinct.tolist()), dtype, len(distinct))
+            return codes[inverse].reshape(keys.shape)
+
+        codes = self._codes
+        keys = keys if isinstance(keys, (list, tuple)) else list(keys)
+
+        try:
+            return [codes[key] for key in keys]
+        except (KeyError, TypeError):
+            return list(map(self.encode, keys))
+
+    def from_codes(self, codes: Any, table: Optional[Tuple[Any, ...]] = None) -> Any:
+        """
+        Return the members, or the entries of another table indexed by integer code, such as :attr:`names` or
+        :attr:`values`, at the given integer codes, as a list, or as a NumPy array if the codes are a NumPy array.
+
+        Arguments:
+            codes: the integer codes.
+            table: the table indexed by integer code, :attr:`members` by default.
+
+        Raises:
+            :exc:`IndexError`: if a code is not the code of a member.
+        """
+        table = self.members if table is None else table
+        numpy = _numpy_of(codes)
+
+        # Negative codes would otherwise index the table from its end.
+        if numpy is not None:
+            if codes.size and codes.min() < 0:
+                raise IndexError(f"{codes.min()} is not the code of a {self.state_class.__name__}")
+
+            return self._array(numpy, table)[codes]
+
+        codes = codes if isinstance(codes, (list, tuple)) else list(codes)
+
+        if codes and min(codes) < 0:
+            raise IndexError(f"{min(codes)} is not the code of a {self.state_class.__name__}")
+
+        return list(map(table.__getitem__, codes))
+
+    def _code(self, key: Any) -> int:
+        """
+        Return the integer code of a key that is not in the table of codes, by decoding bytes and folding the case of
+        strings.
+        """
+        if isinstance(key, (bytes, bytearray)):
+            try:
+                key = key.decode()
+            except UnicodeDecodeError:
+                pass
+
+        if isinstance(key, str):
+            code = self._codes.get(key)
+
+            if code is None:
+                code = self._folded.get(key.casefold())
+
+            if code is not None:
+                return code
+
+        raise ValueError(f"{key!r} is not a valid {self.state_class.__name__}")
+
+    @staticmethod
+    def _array(numpy: Any, table: Tuple[Any, ...]) -> Any:
+        """
+        Return a NumPy array of a table, with the entries of the table as objects unless they are all strings or all
+        numbers, which NumPy would otherwise convert to a common type.
+        """
+        kinds = set(map(type, table))
+
+        if kinds and (kinds <= {str} or kinds <= {int, float}):
+            return numpy.asarray(table)
+
+        array = numpy.empty(len(table), dtype=object)
+        array[:] = table
+        return array
+
+
+@lru_cache(maxsize=None)
+def _codec(state_class: Type[State]) -> StateCodec[State]:
+    return StateCodec(state_class)
+
+
+def _numpy_of(keys: Any) -> Any:
+    """
+    Return the NumPy module if the given keys are a NumPy array, or ``None`` otherwise. NumPy is an optional dependency
+    that is never imported here, as arrays can only exist once it is.
+    """
+    numpy = sys.modules.get("numpy")
+    return numpy if numpy is not None and isinstance(keys, numpy.ndarray) else None
@@ -0,0 +1,483 @@
+"""
+This module generates the wrappers that :class:`~afsm.transition` applies to decorated methods.
+
+Similarly to the ``__init__()`` methods generated by ``attrs`` and ``dataclasses``, each wrapper is compiled from source
+code that only contains the steps its transition needs. For example, a transition without an exception handler has no
+``try`` block, and a transition that is not idempotent never looks up a cached result.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from inspect import Parameter, signature
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from afsm._cache import CacheScope, Retention
+from afsm._state import StateField, TransitioningMethod
+
+# The values a transitioning method factory binds into each transitioning method it creates.
+FACTORY_ARGUMENTS = (
+    "method",
+    "to_state",
+    "expected_mask",
+    "expected_states",
+    "on_exception",
+    "set_state",
+    "set_results",
+    "result_ref",
+    "leave_mask",
+    "cleared_on_leave",
+    "result_cache",
+    "shared_cache",
+    "cache_size",
+    "missing",
+    "kwargs_mark",
+    "states",
+    "async_lock",
+    "lock_key",
+    "state_error",
+    "locks",
+    "lock_mask",
+    "in_transition",
+    "observers",
+    "clock",
+    "method_name",
+    "target_state",
+    "rejection",
+    "journal",
+    "enter",
+    "decode",
+    "reschedule",
+    "population",
+    "guards",
+    "guards_key",
+    "guard_error",
+    "bits",
+)
+
+# The results mapping of an instance, which also holds its locks, is only allocated when first needed.
+_ALLOCATE_RESULTS = [
+    f"results = instance.{StateField.RETURN_VALUES.value}",
+    "if results is None:",
+    "    results = {}",
+    "    set_results(instance, results)",
+]
+
+# Names used by the generated source code, which the parameters of a decorated method must not shadow.
+_RESERVED_NAMES = frozenset(FACTORY_ARGUMENTS).union(
+    ("instance", "current_state", "result", "results", "cache", "key", "lock", "claim_lock", "cleared_method"),
+    ("observer", "start", "duration"),
+    ("configuration", "left", "cleared_bit", "cleared_methods"),
+    ("guard", "guard_results", "passed"),
+    ("exception", "args", "kwargs"),
+    ("id", "type", "hash", "bool", "BaseException", "Exception", "TypeError"),
+)
+
+
+def fixed_parameters(method: Callable[..., Any]) -> Optional[Tuple[str, ...]]:
+    """
+    Return the names of the parameters of a method, excluding the instance, if the method only takes a fixed number of
+    positional-or-keyword parameters without defaults. A transitioning method with the same parameters avoids packing
+    and unpacking arguments, which is a large part of the cost of calling a wrapper.
+
+    Arguments:
+        method: the decorated method.
+
+    Returns:
+        The names of the method parameters, or ``None`` if the transitioning method must forward arbitrary arguments.
+    """
+    try:
+        parameters = list(signature(method).parameters.values())
+    except (TypeError, ValueError):  # Not all callables have an introspectable signature
+        return None
+
+    if not parameters or any(
+        parameter.kind is not Parameter.POSITIONAL_OR_KEYWORD
+        or parameter.default is not Parameter.empty
+        or parameter.name in _RESERVED_NAMES
+        for parameter in parameters
+    ):
+        return None
+
+    return tuple(parameter.name for parameter in parameters[1:])
+
+
+@lru_cache(maxsize=None)
+def transition_factory(  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
+    *,
+    check_state: bool,
+    retention: Optional[Retention],
+    memoize: Optional[CacheScope],
+    handle_exception: bool,
+    change_state: bool,
+    clear_on_leave: bool,
+    compact: bool,
+    hierarchical: bool,
+    is_async: bool,
+    await_handler: bool,
+    serialize: bool,
+    claim: bool,
+    observe: bool,
+    journal: bool,
+    timed: bool,
+    populate: bool,
+    guard: bool,
+    cache_guard: bool,
+    clear_guards: bool,
+    raise_rejection: bool,
+    parameters: Optional[Tuple[str, ...]],
+) -> Callable[..., TransitioningMethod[Any]]:
+    """
+    Compile a factory of transitioning methods specialized for the given configuration. Factories are cached, so the
+    source code for each configuration is compiled only once, regardless of how many methods are decorated.
+
+    Arguments:
+        check_state: if ``True``, the transitioning method checks the current state against the expected states.
+        retention: if not ``None``, the transitioning method is idempotent, and its result is retained according to
+                   this :class:`~afsm.Retention` policy.
+        memoize: if not ``None``, the results of the idempotent transitioning method are memoized by call arguments in
+                 a :class:`~afsm.ResultCache` with this :class:`~afsm.CacheScope`.
+        handle_exception: if ``True``, exceptions raised by the decorated method are passed to an exception handler.
+        change_state: if ``True``, the transitioning method sets the new state after the decorated method is called.
+        clear_on_leave: if ``True``, the transitioning method drops the results retained with
+                        :attr:`~afsm.Retention.CLEAR_ON_LEAVE` for the state the instance leaves.
+        compact: if ``True``, the instance stores its state as the index of the state within its class, and bit masks
+                 of states are made of bits at those indices. Otherwise, bit masks of states are made of the ``bits``
+                 of the states of the class.
+        hierarchical: if ``True``, the instance stores its active configuration as a bit set of its active states,
+                      ``to_state`` is the bit of the new state, and the transitioning method computes the configuration
+                      it enters with ``enter`` and converts configurations to active states with ``decode``.
+        is_async: if ``True``, the decorated method is a coroutine function, and the transitioning method awaits it
+                  before storing its result and setting the new state.
+        await_handler: if ``True``, the exception handler is a coroutine function, awaited by the transitioning method.
+        serialize: if ``True``, the asynchronous transitioning method holds a lock, allocated for each instance when
+                   the method is first called, so that asynchronous transitions of the same instance do not interleave.
+        claim: if ``True``, the transitioning method checks the current state and sets the transient ``in_transition``
+               state under one of the striped ``locks``, then releases the lock and calls the decorated method. The
+               instance is thus claimed by a single thread until it reaches the new state, or returns to the previous
+               state if the decorated method raises an exception.
+        observe: if ``True``, the transitioning method notifies each of the ``observers`` of rejections, of exceptions
+                 raised by the decorated method, and of transitions, along with the time they took in nanoseconds.
+        journal: if ``True``, the transitioning method records each successful transition in the ``journal``.
+        timed: if ``True``, the transitioning method calls ``reschedule`` after setting the new state, to cancel the
+               timers of the states the instance leaves and schedule those of the states it enters.
+        populate: if ``True``, the transitioning method calls ``population`` after setting the new state, to move the
+                  instance to the new state in the registry of live instances per state.
+        guard: if ``True``, the transitioning method calls each of the ``guards`` with the instance once the state is
+               checked, and rejects the call like a call in an unexpected state if any guard does not hold.
+        cache_guard: if ``True``, the results of the guards are memoized in the results mapping of the instance.
+        clear_guards: if ``True``, the transitioning method drops the memoized results of all guards when it sets the
+                      new state.
+        raise_rejection: if ``True``, the transitioning method raises a :exc:`~afsm.StateError` when called in an
+                         unexpected state, otherwise it returns the ``rejection`` sentinel.
+        parameters: the parameters of the transitioning method, excluding the instance, as returned by
+                    :func:`fixed_parameters`. If ``None``, the transitioning method forwards arbitrary arguments.
+
+    Returns:
+        A factory that takes the values in ``FACTORY_ARGUMENTS`` as keyword arguments and returns a transitioning
+        method.
+    """
+    arguments = "*args, **kwargs" if parameters is None else ", ".join(parameters)
+    state_attr = StateField.STATE.value
+    body: List[str] = [f"current_state = instance.{state_attr}"]
+
+    # Compact states are integer codes, hence compared by value and never unset, and their bits are computed.
+    reached = "current_state == to_state" if compact else "current_state is to_state"
+    left = "current_state != to_state" if compact else "current_state is not to_state and current_state is not None"
+    unset = "" if compact else "current_state is None or "
+    bit = "(1 << current_state)" if compact else "bits[current_state]"
+    actual_state = "states[current_state]" if compact else "current_state"
+    new_state = "target_state" if change_state else actual_state
+
+    # Hierarchical configurations are bit sets of the active states, so the new state is reached if its bit is set, and
+    # the configuration itself is checked against the bit mask of the expected states.
+    if hierarchical:
+        reached, unset, bit, actual_state = "current_state & to_state", "", "current_state", "decode(current_state)"
+        new_state = "decode(configuration)" if change_state else actual_state
+
+    # Rejecting the call raises an exception or returns a sentinel, after notifying the observers if any.
+    rejected = [
+        "    for observer in observers:",
+        f"        observer.rejected(type(instance), method_name, {actual_state})",
+    ]
+    reject = [
+        *(rejected if observe else []),
+        f"    raise state_error(type(instance), expected_states, {actual_state})"
+        if raise_rejection
+        else "    return rejection",
+    ]
+
+    # A claimed instance returns to its previous state when a guard does not hold.
+    reject_guard = [
+        *(["    set_state(instance, current_state)"] if claim else []),
+        *(rejected if observe else []),
+        f"    raise guard_error(type(instance), expected_states, {actual_state}, guard)"
+        if raise_rejection
+        else "    return rejection",
+    ]
+
+    # If the method is marked as idempotent with respect to the wanted state, and the wanted state has already been
+    # reached, return the previous result and do not change state.
+    if retention is not None:
+        body += _lookup_result(reached, retention, memoize, parameters)
+
+    # Raise an exception if the current state is unexpected at this time. Each state owns a distinct bit, so checking
+    # membership in the expected states is a single bitwise operation. Memoized methods are also called in the wanted
+    # state if no result is memoized for the given arguments.
+    if check_state:
+        body += [
+            f"{'elif' if memoize else 'if'} {unset}not {bit} & expected_mask:",
+            *reject,
+        ]
+
+    # A claimed instance is in the transient state, which is never expected, so only transitions that check no state
+    # must explicitly reject it.
+    if claim and not check_state:
+        body += [
+            f"if current_state {'==' if compact or hierarchical else 'is'} in_transition:",
+            *reject,
+        ]
+
+    # Check the state and claim the instance atomically, holding the lock only for as long as this takes.
+    if claim:
+        body = [
+            "claim_lock = locks[id(instance) >> 4 & lock_mask]",
+            "claim_lock.acquire()",  # Faster than a `with` statement
+            "try:",
+            *(f"    {line}" for line in body),
+            "    set_state(instance, in_transition)",
+            "finally:",
+            "    claim_lock.release()",
+        ]
+
+    # Call the decorated method and, if the method is idempotent, store the result to be later returned.
+    call = f"result = {'await ' if is_async else ''}method(instance, {arguments})"
+    store = [] if retention is None else _store_result(retention, memoize)
+    failed = [
+        "for observer in observers:",
+        f"    observer.failed(type(instance), method_name, {actual_state}, exception, clock() - start)",
+    ]
+
+    if handle_exception:
+        calling = [
+            "try:",
+            f"    {call}",
+            "except Exception as exception:",
+            *(f"    {line}" for line in (failed if observe else [])),
+            f"    result = {'await ' if await_handler else ''}on_exception(instance, exception, {arguments})",
+            *(["else:", *(f"    {line}" for line in store)] if store else []),
+        ]
+    else:
+        calling = [call, *store]
+
+    # Time the call, and report exceptions that are not handled, as handled exceptions are already reported.
+    if observe and handle_exception:
+        calling = ["start = clock()", *calling]
+    elif observe:
+        calling = [
+            "start = clock()",
+            "try:",
+            *(f"    {line}" for line in calling),
+            "except Exception as exception:",
+            *(f"    {line}" for line in failed),
+            "    raise",
+        ]
+
+    # Check the guards once the state is checked and the instance claimed, but before calling and timing the method.
+    if guard:
+        calling = [*_check_guards(cache_guard, reject_guard), *calling]
+
+    # Release a claimed instance in its previous state if the transition fails.
+    if claim:
+        calling = [
+            "try:",
+            *(f"    {line}" for line in calling),
+            "except BaseException:",
+            "    set_state(instance, current_state)",
+            "    raise",
+        ]
+
+    body += calling
+
+    # Set the new state, if specified, otherwise retain the current state. Before that, drop the results that must not
+    # outlive the state the instance is leaving. A hierarchical instance enters a configuration that depends on the
+    # states it is leaving.
+    if change_state:
+        body += [
+            *(["configuration = enter(current_state)"] if hierarchical else []),
+            *(_clear_results(left, bit, hierarchical) if clear_on_leave else []),
+            *(
+                [
+                    f"results = instance.{StateField.RETURN_VALUES.value}",
+                    "if results is not None:",
+                    "    results.pop(guards_key, None)",
+                ]
+                if clear_guards
+                else []
+            ),
+            f"set_state(instance, {'configuration' if hierarchical else 'to_state'})",
+        ]
+
+    if populate:
+        body += [f"population(instance, {new_state})"]
+
+    if timed:
+        body += [f"reschedule(instance, {actual_state}, {new_state}, target_state)"]
+
+    if journal:
+        body += [f"journal(instance, method_name, {actual_state}, {new_state})"]
+
+    if observe:
+        body += [
+            "duration = clock() - start",
+            "for observer in observers:",
+            f"    observer.transitioned(type(instance), method_name, {actual_state}, {new_state}, duration)",
+        ]
+
+    body += ["return result"]
+
+    # Hold the lock of the instance for the whole transition, from checking the state to setting the new state.
+    if serialize:
+        body = [
+            *_ALLOCATE_RESULTS,
+            "lock = results.get(lock_key, None)",
+            "if lock is None:",
+            "    lock = results[lock_key] = async_lock()",
+            "async with lock:",
+            *(f"    {line}" for line in body),
+        ]
+
+    source = "\n".join(
+        [
+            f"def make_transitioning_method({', '.join(FACTORY_ARGUMENTS)}):",
+            f"    {'async ' if is_async else ''}def transitioning_method(instance, {arguments}):",
+            *(f"        {line}" for line in body),
+            "    return transitioning_method",
+        ]
+    )
+
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, "<afsm transition>", "exec"), {}, namespace)  # nosec B102 # pylint: disable=exec-used
+    return namespace["make_transitioning_method"]  # type: ignore[no-any-return]
+
+
+def _lookup_result(
+    reached: str, retention: Retention, memoize: Optional[CacheScope], parameters: Optional[Tuple[str, ...]]
+) -> List[str]:
+    ret_values_attr = StateField.RETURN_VALUES.value
+
+    if memoize is None:
+        return [
+            f"if {reached}:",
+            f"    results = instance.{ret_values_attr}",
+            "    result = None if results is None else results.get(method, None)",
+            *(
+                ["    if type(result) is result_ref:", "        result = result()"]
+                if retention is Retention.WEAK
+                else []
+            ),
+            "    return result",
+        ]
+
+    # Key memoized results by call arguments, in the same way as `functools.lru_cache()`, and by instance if shared.
+    if parameters is None:
+        key = "(*args, kwargs_mark, *kwargs.items()) if kwargs else args"
+    else:
+        key = f"({', '.join(parameters)}{',' if len(parameters) == 1 else ''})"
+
+    # Hash the key before calling the method, so that unhashable arguments are rejected before any side effect, as
+    # they are by `functools.lru_cache()`.
+    return [
+        f"key = {key}" if memoize is CacheScope.INSTANCE else f"key = (id(instance), {key})",
+        "hash(key)",
+        f"if {reached}:",
+        *(
+            [
+                f"    results = instance.{ret_values_attr}",
+                "    cache = None if results is None else results.get(method, None)",
+                "    if cache is not None:",
+                "        result = cache.get(key, missing)",
+                "        if result is not missing:",
+                "            return result",
+            ]
+            if memoize is CacheScope.INSTANCE
+            else [
+                "    result = shared_cache.get(key, missing)",
+                "    if result is not missing:",
+                "        return result[1]",
+            ]
+        ),
+    ]
+
+
+def _check_guards(cache_guard: bool, reject: List[str]) -> List[str]:
+    if not cache_guard:
+        return [
+            "for guard in guards:",
+            "    if not guard(instance):",
+            *(f"    {line}" for line in reject),
+        ]
+
+    # Memoize the result of each guard, so that guards shared by several transitions are also called only once.
+    return [
+        *_ALLOCATE_RESULTS,
+        "guard_results = results.get(guards_key, None)",
+        "if guard_results is None:",
+        "    guard_results = results[guards_key] = {}",
+        "for guard in guards:",
+        "    passed = guard_results.get(guard, None)",
+        "    if passed is None:",
+        "        passed = guard_results[guard] = bool(guard(instance))",
+        "    if not passed:",
+        *(f"    {line}" for line in reject),
+    ]
+
+
+def _clear_results(left: str, bit: str, hierarchical: bool) -> List[str]:
+    ret_values_attr = StateField.RETURN_VALUES.value
+
+    # A hierarchical instance can leave several states at once, which are those not active in the configuration it
+    # enters.
+    if hierarchical:
+        return [
+            "left = current_state & ~configuration & leave_mask",
+            "if left:",
+            f"    results = instance.{ret_values_attr}",
+            "    if results is not None:",
+            "        for cleared_bit, cleared_methods in cleared_on_leave.items():",
+            "            if cleared_bit & left:",
+            "                for cleared_method in cleared_methods:",
+            "                    results.pop(cleared_method, None)",
+        ]
+
+    return [
+        f"if {left} and {bit} & leave_mask:",
+        f"    results = instance.{ret_values_attr}",
+        "    if results is not None:",
+        f"        for cleared_method in cleared_on_leave[{bit}]:",
+        "            results.pop(cleared_method, None)",
+    ]
+
+
+def _store_result(retention: Retention, memoize: Optional[CacheScope]) -> List[str]:
+    if memoize is CacheScope.CLASS:
+        return ["shared_cache.put(key, (instance, result))"]  # Keep the instance alive, so its id is not reused
+
+    if memoize is CacheScope.INSTANCE:
+        return [
+            *_ALLOCATE_RESULTS,
+            "cache = results.get(method, None)",
+            "if cache is None:",
+            "    cache = results[method] = result_cache(cache_size)",
+            "cache.put(key, result)",
+        ]
+
+    if retention is Retention.WEAK:
+        return [
+            *_ALLOCATE_RESULTS,
+            "try:",
+            "    results[method] = result_ref(result)",
+            "except TypeError:",  # The result does not support weak references
+            "    results[method] = result",
+        ]
+
+    return [*_ALLOCATE_RESULTS, "results[method] = result"]
@@ -0,0 +1,218 @@
+"""
+This module defines a fleet of finite state machines of the same class, whose states are stored in a NumPy array.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, Generic, Iterable, Optional, Sequence, Tuple, Type, TypeVar, Union
+
+from afsm._fsm import StateMixin, Transition, _set_state
+from afsm._options import machine_states
+from afsm._state import State, StateField, TransientState, state_index
+
+_Machine = TypeVar("_Machine", bound=StateMixin)
+
+
+class Fleet(Generic[_Machine]):
+    """
+    A fleet of state machines of the same :class:`StateMixin` subclass, whose states are stored as integer codes in a
+    contiguous NumPy array. Transitions are applied to any selection of machines in a single batched operation, using
+    the ``from_`` and ``to_`` states declared by :class:`~afsm.transition`. Applying a transition to a fleet only
+    changes states, the decorated method is not called.
+
+    Warning:
+        Fleets require `NumPy <https://numpy.org>`_, which can be installed with the ``numpy`` extra of this package.
+
+    Example:
+        >>> from enum import auto
+        >>> from afsm import Fleet, State, StateMixin, transition
+        ...
+        >>> class MachineState(State):
+        ...     INITIAL = auto()
+        ...     FINAL = auto()
+        ...
+        >>> class AFiniteStateMachine(StateMixin, initial_state=MachineState.INITIAL):
+        ...     @transition(from_=MachineState.INITIAL, to_=MachineState.FINAL)
+        ...     def to_final_state(self):
+        ...         print("Transitioning to final state")
+        ...
+        >>> fleet = Fleet(AFiniteStateMachine, 4)
+        >>> fleet.apply("to_final_state", [0, 1]).tolist()
+        []
+        >>> fleet.apply("to_final_state", [1, 2]).tolist()
+        [1]
+        >>> fleet.count(MachineState.FINAL)
+        3
+
+    Arguments:
+        machine_class: the class of the machines in the fleet. The class must have an initial state, and all its states
+                       must be members of the same :class:`State` class.
+        size: the number of machines in the fleet, all in the initial state.
+        codes: the integer codes of the states of the machines in the fleet, which are the indices of the states within
+               their :class:`State` class. If given, ``size`` is ignored.
+
+    Attributes:
+        machine_class: the class of the machines in the fleet.
+        states: the states of the machines in the fleet, indexed by integer code.
+        codes: the array of integer codes of the states of the machines in the fleet.
+
+    Raises:
+        :exc:`ImportError`: if NumPy is not installed.
+        :exc:`ValueError`: if the machine class has no initial state, or uses states of different classes.
+    """
+
+    def __init__(self, machine_class: Type[_Machine], size: int = 0, codes: Optional[Iterable[int]] = None) -> None:
+        numpy = _numpy()
+        self.machine_class = machine_class
+        self.states = machine_states(machine_class)
+        dtype = numpy.min_scalar_type(len(self.states) - 1)
+
+        if codes is None:
+            initial_state: State = getattr(machine_class, StateField.INITIAL_STATE.value)
+            self.codes = numpy.full(size, state_index(initial_state), dtype=dtype)
+        else:
+            self.codes = numpy.asarray(codes, dtype=dtype)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def of(cls, machine_class: Type[_Machine], machines: Sequence[_Machine]) -> Fleet[_Machine]:
+        """
+        Create a fleet with the states of the given machines.
+
+        Arguments:
+            machine_class: the class of the machines.
+            machines: the machines, whose states are copied into the fleet in the same order.
+
+        Returns:
+            A new fleet.
+
+        Raises:
+            :exc:`ValueError`: if one of the machines is in :attr:`TransientState.IN_TRANSITION`.
+        """
+        options = getattr(machine_class, StateField.CLASS_OPTIONS.value)
+        state_attr = StateField.STATE.value
+        stored = [getattr(machine, state_attr) for machine in machines]
+
+        if options.encode(TransientState.IN_TRANSITION) in stored:
+            raise ValueError("Machines in transition cannot be stored in a fleet")
+
+        codes = stored if options.compact else [state_index(state) for state in stored]
+
+        return cls(machine_class, codes=codes)
+
+    def store(self, machines: Sequence[_Machine]) -> None:
+        """
+        Store the states of the fleet in the given machines, without calling any method. The machines drop the results
+        that transitions drop when leaving their states, such as memoized guard results. If the class has a
+        :class:`~afsm.Population`, the machines are moved to their new states in the population, and if it has a
+        :class:`~afsm.TimingWheel`, their timed transitions are rescheduled for their new states.
+
+        Arguments:
+            machines: the machines, whose states are replaced by those in the fleet in the same order.
+        """
+        if len(machines) != len(self.codes):
+            raise ValueError(f"Expected {len(self.codes)} machines, got {len(machines)}")
+
+        options = getattr(self.machine_class, StateField.CLASS_OPTIONS.value)
+        codes = self.codes.tolist()
+
+        if options.compact:
+            values: Sequence[Any] = codes
+        else:
+            values = [self.states[code] for code in codes]
+
+        for machine, value in zip(machines, values):
+            options.leave(machine, value)
+            _set_state(machine, value)
+
+        if options.population is not None:
+            for machine in machines:
+                options.population.track(machine)
+
+        if options.timers is not None and options.timeouts:
+            for machine in machines:
+                options.timers.track(machine)
+
+    def state(self, index: int) -> State:
+        """
+        Return the state of the machine at an index in the fleet.
+        """
+        return self.states[int(self.codes[index])]
+
+    def count(self, state: State) -> int:
+        """
+        Return the number of machines in the fleet in a state.
+        """
+        return int(_numpy().count_nonzero(self.codes == state_index(state)))
+
+    def apply(self, transition: Union[str, Any], selection: Optional[Any] = None) -> Any:
+        """
+        Apply a transition to a selection of the machines in the fleet. Selected machines in one of the expected states
+        transition to the new state, or remain in the same state if the transition is idempotent and the new state has
+        already been reached. All other selected machines are rejected, and their state does not change.
+
+        Arguments:
+            transition: the name of a method decorated with :class:`~afsm.transition`, or the method itself.
+            selection: a slice, a boolean mask, or an array of indices of the machines to apply the transition to. If
+                       ``None``, the transition is applied to all machines.
+
+        Returns:
+            An array of the indices of the rejected machines, for which the method would have raised a
+            :exc:`~afsm.StateError`.
+
+        Raises:
+            :exc:`TypeError`: if the method is not decorated with :class:`~afsm.transition`.
+            :exc:`ValueError`: if the transition has guards, which can only be evaluated on instances.
+        """
+        numpy = _numpy()
+        from_states, to_state, is_idempotent = self._transition(transition)
+        indices = numpy.arange(len(self.codes))
+
+        if selection is not None:
+            indices = indices[selection]
+
+        codes = self.codes[indices]
+
+        if from_states:
+            allowed = numpy.zeros(len(self.states), dtype=bool)
+            allowed[[state_index(state) for state in from_states]] = True
+
+            if is_idempotent:
+                allowed[state_index(to_state)] = True  # type: ignore[arg-type]
+
+            accepted = allowed[codes]
+        else:
+            accepted = numpy.ones(len(codes), dtype=bool)
+
+        if to_state is not None:
+            self.codes[indices[accepted]] = state_index(to_state)
+
+        return indices[~accepted]
+
+    def _transition(self, transition: Union[str, Any]) -> Tuple[Tuple[State, ...], Optional[State], bool]:
+        method = getattr(self.machine_class, transition) if isinstance(transition, str) else transition
+        transition_: Optional[Transition[Any]] = getattr(method, "__transition__", None)
+
+        if transition_ is None:
+            raise TypeError(f"'{getattr(method, '__name__', method)}' is not a transitioning method")
+
+        if transition_._guards():  # pylint: disable=protected-access
+            raise ValueError(f"'{method.__name__}' has guards, which cannot be applied to a fleet")
+
+        is_idempotent = transition_.is_idempotent and transition_.to_ is not None
+        return transition_._from_states(), transition_.to_, is_idempotent  # pylint: disable=protected-access
+
+
+@lru_cache(maxsize=None)
+def _numpy() -> Any:
+    """
+    Import NumPy when a fleet is first used rather than when this package is imported, as NumPy is an optional
+    dependency, only required by fleets, and it takes longer to import than the rest of this package.
+    """
+    try:
+        return import_module("numpy")
+    except ImportError:
+        raise ImportError("Fleets require NumPy, install it with the 'numpy' extra of this package") from None
@@ -4,30 +4,50 @@ This module defines the business logic for a finite state machine.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from functools import wraps
-from typing import Any, Callable, Generic, Iterable, Optional, TypeVar, final, overload
+from functools import partial, reduce, wraps
+from inspect import iscoroutinefunction
+from operator import or_
+from threading import Lock
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Tuple, Type, TypeVar, final, overload
+
+from afsm._cache import (
+    ASYNC_LOCK_KEY,
+    GUARDS_KEY,
+    CacheScope,
+    ResultCache,
+    ResultRef,
+    Retention,
+    async_lock,
+    cache_functions,
+    clear_guards,
+)
+from afsm._clone import clone_many
+from afsm._compiler import fixed_parameters, transition_factory
+from afsm._options import DEFAULT_CLASS_OPTIONS, SLOTTED, ClassOptions, compact_state_getter
+from afsm._population import populated_constructor
+from afsm._prepare import LazyTransitioningMethod, defer_preparation, transitioning_methods
+from afsm._state import GuardError, Rejection, State, StateError, StateField, TransientState, TransitioningMethod
+from afsm._table import TransitionTable
+from afsm._timer import timed_constructor
 
-from afsm._state import State, StateError, StateField
-
-_State = TypeVar("_State", bound="State")
 _Result = TypeVar("_Result")
 _ErrorResult = TypeVar("_ErrorResult")
-
-try:
-    dataclass(eq=False, frozen=True, slots=True)  # type: ignore[call-overload] # pylint: disable=unexpected-keyword-arg
-    _is_slotted = {"slots": True}
-except TypeError:  # Python < 3.10 does not support slotted dataclasses
-    _is_slotted = {}
+_Machine = TypeVar("_Machine", bound="StateMixin")
 
 
 @final
-@dataclass(eq=False, frozen=True, **_is_slotted)  # pylint: disable=unexpected-keyword-arg
-class Transition(Generic[_ErrorResult]):
+@dataclass(eq=False, frozen=True, **SLOTTED)  # pylint: disable=unexpected-keyword-arg,useless-suppression
+class Transition(Generic[_ErrorResult]):  # pylint: disable=too-many-instance-attributes # One field per argument
     r"""
     A decorator that ensures a state machine in an expected state before calling the decorated method. When an expected
     ``from_`` state is given, the instance transitions to a wanted ``to_`` state if the call to the decorated method
     succeeds. No transition occurs if the call to the decorated method raises an exception.
 
+    The decorated method can be a coroutine function, in which case the state is checked when the returned coroutine is
+    awaited, and the instance transitions to the new state only after the awaited method succeeds. The exception
+    handler can also be a coroutine function, which is then awaited.
+
     Warning:
         This decorator can only be applied to methods of classes that inherit from :class:`StateMixin`.
 
@@ -55,72 +75,260 @@ class Transition(Generic[_ErrorResult]):
                        already been reached, return the previous result and do not change state.
         on_exception: the callable to invoke if the decorated method raises an exception. The first argument to the
                       callable is the raised exception, the remaining arguments are the same passed to the method.
+        result_retention: the :class:`Retention` policy for the result of an idempotent method. If ``None``, the policy
+                          specified on the class is used, which defaults to :attr:`Retention.STRONG`. The results of
+                          methods that are not idempotent are never retained.
+        cache_size: if specified, the results of an idempotent method are memoized by call arguments in a
+                    :class:`ResultCache` of this size, rather than retaining a single result. If the new state has
+                    already been reached, the method is only called if no result is memoized for the arguments.
+                    Memoized results are retained strongly or, with :attr:`Retention.CLEAR_ON_LEAVE`, until the
+                    instance leaves the new state. Cache statistics are returned by ``cache_info()`` and the cache is
+                    cleared by ``cache_clear()``, two functions added to the method that take the instance as argument
+                    when ``cache_scope`` is :attr:`CacheScope.INSTANCE`.
+        cache_scope: the :class:`CacheScope` of the results memoized by an idempotent method.
+        event: the name of an event the decorated method handles, in its expected states, when events are dispatched
+               with :meth:`StateMixin.dispatch` or :func:`dispatch_many`. Several methods can handle the same event,
+               as long as they expect different states.
+        timeout: if specified, the number of seconds after which the transition is called without arguments, if the
+                 instance is still in the expected state it entered, by the :class:`TimingWheel` of the class.
+        guard: one or more callables that take the instance and return whether the transition is allowed, called in
+               order once the instance is in an expected state, and before the decorated method is called. If any of
+               them returns a false value, the call is rejected as in an unexpected state, raising a
+               :exc:`GuardError` or returning :attr:`Rejection.REJECTED`.
+        cache_guard: if ``True``, the result of each guard is memoized by the instance, and reused by the transitions
+                     sharing the guard, until a transition of the class changes the state of the instance, or the
+                     memoized results are dropped by ``guard_clear()``, a function added to the method that takes the
+                     instance as argument.
 
     Raises:
         :exc:`StateError`: if the instance is not in the expected :class:`State` or in the expected set of states.
+        :exc:`GuardError`: if a guard of the transition does not hold.
+        :exc:`ValueError`: if ``cache_size`` is not positive or the method is not idempotent, if ``timeout`` is not
+                           positive or the transition expects no state, or if ``cache_guard`` is specified without
+                           guards.
 
     Returns:
-        A state-checking method with the same declaration as the decorated method.
+        A state-checking method with the same declaration as the decorated method. Its ``try_()`` function takes the
+        instance and the same arguments, but returns :attr:`Rejection.REJECTED` instead of raising a
+        :exc:`StateError`. Arguments are bound to the parameters of the method before the state is checked, so a call
+        with arguments the decorated method does not accept can raise a :exc:`TypeError` in any state.
     """
 
     from_: Optional[Iterable[State] | State] = None
     to_: Optional[State] = None
     is_idempotent: bool = False
     on_exception: Optional[Callable[..., _ErrorResult]] = None
+    result_retention: Optional[Retention] = None
+    cache_size: Optional[int] = None
+    cache_scope: CacheScope = CacheScope.INSTANCE
+    event: Optional[str] = None
+    timeout: Optional[float] = None
+    guard: Optional[Iterable[Callable[[Any], Any]] | Callable[[Any], Any]] = None
+    cache_guard: bool = False
+
+    def __post_init__(self) -> None:
+        # Iterables of expected states and guards are read several times, so one-shot iterators are consumed once here.
+        if self.from_ is not None and not isinstance(self.from_, State):
+            object.__setattr__(self, "from_", tuple(dict.fromkeys(self.from_)))
+
+        if self.guard is not None and isinstance(self.guard, Iterable):
+            object.__setattr__(self, "guard", tuple(self.guard))
+
+        if self.cache_size is not None and (not self.is_idempotent or self.to_ is None or self.cache_size < 1):
+            raise ValueError("A cache size must be positive, and can only be specified for idempotent transitions")
+
+        if self.timeout is not None and (self.timeout <= 0 or not self._from_states()):
+            raise ValueError("A timeout must be positive, and can only be specified for transitions expecting states")
+
+        if self.cache_guard and not self._guards():
+            raise ValueError("Guard results can only be memoized for transitions with guards")
 
     @overload
-    def __call__(self, method: Callable[..., _ErrorResult]) -> Callable[..., _ErrorResult]:
+    def __call__(self, method: Callable[..., _ErrorResult]) -> TransitioningMethod[_ErrorResult]:
         ...
 
     @overload
-    def __call__(self, method: Callable[..., _Result]) -> Callable[..., _Result]:
+    def __call__(self, method: Callable[..., _Result]) -> TransitioningMethod[_Result]:
         ...
 
     def __call__(self, method: Any) -> Any:
-        # Cache values and method access calls at the outset for speed.
-        state_attr = StateField.STATE.value
-        ret_values_attr = StateField.RETURN_VALUES.value
-        expected_states = frozenset(
-            self.from_ if isinstance(self.from_, Iterable) else [self.from_] if self.from_ else []
-        )
+        return LazyTransitioningMethod(self, method)
+
+    def _compile(self, method: Callable[..., Any], options: ClassOptions) -> Callable[..., Any]:
+        """
+        Compile a transitioning method specialized for this transition and the options of the class it belongs to.
+
+        Arguments:
+            method: the decorated method.
+            options: the options of the class the decorated method belongs to.
+
+        Returns:
+            A state-checking method with the same declaration as the decorated method.
+        """
+        # Resolve the expected states at the outset, as an ordered tuple for error reporting and a mask for checks.
+        expected_states = self._from_states()
+        guards = self._guards()
+
+        is_async = iscoroutinefunction(method)
+        retention = self._retention(options)
+        hierarchy = options.hierarchy
+        memoize = self.cache_scope if self.cache_size is not None else None
+        shared_cache = ResultCache(self.cache_size) if memoize is CacheScope.CLASS else None  # type: ignore[arg-type]
+
+        configuration: Dict[str, Any] = {
+            "check_state": bool(expected_states),
+            "retention": retention,
+            "memoize": memoize,
+            "handle_exception": self.on_exception is not None,
+            "change_state": self.to_ is not None,
+            "clear_on_leave": bool(options.leave_mask),
+            "compact": options.compact,
+            "hierarchical": hierarchy is not None,
+            "is_async": is_async,
+            "await_handler": is_async and iscoroutinefunction(self.on_exception),
+            "serialize": is_async and options.serialize_async,
+            "claim": options.thread_safe and self.to_ is not None,
+            "observe": bool(options.observers),
+            "journal": options.journal is not None,
+            "timed": bool(options.timeouts) and self.to_ is not None,
+            "populate": options.population is not None and self.to_ is not None,
+            "guard": bool(guards),
+            "cache_guard": self.cache_guard,
+            "clear_guards": options.clear_guards and self.to_ is not None,
+            # Exception handlers receive arguments exactly as they were passed, so these must be forwarded unchanged.
+            "parameters": None if self.on_exception is not None else fixed_parameters(method),
+        }
+        values: Dict[str, Any] = {
+            "method": method,
+            "to_state": options.encode(self.to_) if hierarchy is None or self.to_ is None else hierarchy.bit(self.to_),
+            "expected_mask": reduce(or_, map(options.bit, expected_states), 0),
+            "expected_states": expected_states,
+            "on_exception": self.on_exception,
+            "set_state": _set_state,
+            "set_results": _set_results,
+            "result_ref": ResultRef,
+            "leave_mask": options.leave_mask,
+            "cleared_on_leave": options.cleared_on_leave,
+            "result_cache": ResultCache,
+            "shared_cache": shared_cache,
+            "cache_size": self.cache_size,
+            "missing": _MISSING,
+            "kwargs_mark": _MISSING,
+            "states": (*options.states, TransientState.IN_TRANSITION),
+            "async_lock": async_lock,
+            "lock_key": ASYNC_LOCK_KEY,
+            "state_error": StateError,
+            "locks": _LOCKS,
+            "lock_mask": len(_LOCKS) - 1,
+            "in_transition": options.encode(TransientState.IN_TRANSITION),
+            "observers": options.observers,
+            "clock": perf_counter_ns,
+            "method_name": method.__name__,
+            "target_state": self.to_,
+            "rejection": Rejection.REJECTED,
+            "journal": None if options.journal is None else options.journal.record,
+            "enter": None if hierarchy is None or self.to_ is None else hierarchy.entry(self.to_),
+            "decode": None if hierarchy is None else hierarchy.decode,
+            "reschedule": None if options.timers is None else partial(options.timers.reschedule, options.timeouts),
+            "population": None if options.population is None else options.population.move,
+            "guards": guards,
+            "guards_key": GUARDS_KEY,
+            "guard_error": GuardError,
+            "bits": options.bits,
+        }
+        transitioning_method = transition_factory(**configuration, raise_rejection=True)(**values)
+
+        # Transitions that can be rejected also have a variant that returns a sentinel instead of raising an exception.
+        try_method: Callable[..., Any]
+
+        if configuration["check_state"] or configuration["claim"] or guards:
+            try_method = wraps(method)(transition_factory(**configuration, raise_rejection=False)(**values))
+        else:
+            try_method = transitioning_method
+
+        wraps(method)(transitioning_method)
+        transitioning_method.__transition__ = self
+        transitioning_method.__class_options__ = options
+        transitioning_method.try_ = try_method
+
+        if self.cache_guard:
+            transitioning_method.guard_clear = partial(clear_guards, guards)
+
+        if memoize is not None:
+            transitioning_method.cache_info, transitioning_method.cache_clear = cache_functions(
+                method, self.cache_size, shared_cache  # type: ignore[arg-type]
+            )
 
-        @wraps(method)
-        def transitioning_method(instance: Any, *args: Any, **kwargs: Any) -> _Result | _ErrorResult:
-            current_state = getattr(instance, state_attr)
+        return transitioning_method
 
-            # If the method is marked as idempotent with respect to the wanted state, and the wanted state has already
-            # been reached, return the previous result and do not change state.
-            if self.is_idempotent and self.to_ is not None and current_state is self.to_:
-                return getattr(instance, ret_values_attr).get(method, None)  # type: ignore[no-any-return]
+    def _from_states(self) -> Tuple[State, ...]:
+        if isinstance(self.from_, State):  # Faster than the check against the abstract `Iterable` class
+            return (self.from_,)
 
-            # Raise an exception if the current state is unexpected at this time.
-            if expected_states and current_state not in expected_states:
-                raise StateError(type(instance), expected_states, current_state)
+        return () if self.from_ is None else tuple(self.from_)
 
-            # Call the decorated method and store the result to be later returned by idempotent methods.
-            try:
-                result: _Result | _ErrorResult
-                result = getattr(instance, ret_values_attr)[method] = method(instance, *args, **kwargs)
+    def _guards(self) -> Tuple[Callable[[Any], Any], ...]:
+        if self.guard is None:
+            return ()
 
-            except Exception as exception:  # pylint: disable=broad-except
-                if self.on_exception is None:
-                    raise exception
+        return tuple(self.guard) if isinstance(self.guard, Iterable) else (self.guard,)
 
-                result = self.on_exception(instance, exception, *args, **kwargs)
+    def _retention(self, options: ClassOptions) -> Optional[Retention]:
+        # Only the results of idempotent transitions are ever returned again, hence retained.
+        if not self.is_idempotent or self.to_ is None:
+            return None
 
-            # Set the new state, if specified, otherwise retain the current state.
-            # Use `object.__setattr__()` for compatibility with frozen/immutable `attrs` or `dataclass` classes.
-            # See https://www.attrs.org/en/stable/init.html#post-init.
-            object.__setattr__(instance, state_attr, self.to_ or current_state)
-            return result
+        return self.result_retention or options.result_retention
 
-        return transitioning_method
+
+# A sentinel for results missing from a cache, also used to separate positional and keyword arguments in cache keys.
+_MISSING = object()
+
+# The locks under which thread-safe transitions claim instances, selected by address and only held to claim them.
+_LOCKS = tuple(Lock() for _ in range(256))
+
+# Attribute names read when dispatching events, resolved once rather than on each dispatch.
+_STATE_ATTR = StateField.STATE.value
+_EVENT_HANDLERS_ATTR = StateField.EVENT_HANDLERS.value
+_BASE_NEW_ATTR = "_base_new"  # The attribute of the constructors of classes with options, holding the one they wrap
 
 
 class StateMixin:
     """
     A mixin class that adds state tracking to a class definition. The initial machine state can be specified using the
-    argument ``initial_state`` in the class definition statement.
+    argument ``initial_state`` in the class definition statement. The default :class:`Retention` policy for the results
+    of idempotent transitions can be specified using the argument ``result_retention``.
+
+    If the argument ``compact`` is ``True``, instances store their state as the integer index of the state within its
+    :class:`State` class. A compact state machine requires an initial state, and all its states must be members of the
+    same class. This encoding is used to pack the states of many machines into arrays, though it does not change the
+    size of each instance: both a reference to a :class:`State` and an integer occupy a single slot.
+
+    If the argument ``serialize_async`` is ``True``, each instance holds an :class:`asyncio.Lock`, allocated when first
+    needed, for the whole duration of its asynchronous transitions, so that concurrent tasks driving the same instance
+    do not interleave them. Transitions that are not asynchronous do not acquire the lock.
+
+    If the argument ``thread_safe`` is ``True``, transitions that change state check the current state and claim the
+    instance atomically, setting its state to :attr:`TransientState.IN_TRANSITION` under a lock shared with other
+    instances, then release the lock before calling the decorated method. Concurrent transitions of a claimed instance
+    raise a :exc:`StateError` instead of running twice, and so do transitions of the same instance nested in the
+    decorated method. Transitions that do not change state only read the state, and take no lock.
+
+    If the argument ``journal`` is a :class:`Journal`, each successful transition is recorded in the journal.
+
+    If the argument ``timers`` is a :class:`TimingWheel`, the wheel fires the transitions declared with a ``timeout``,
+    see :class:`~afsm.transition`, and instances are scheduled in their initial state when created.
+
+    If the argument ``population`` is a :class:`Population`, instances are tracked in the population by state, from
+    their initial state when created, so that the live instances in a state can be counted and iterated over.
+
+    If the initial state or the states of the transitions include composite states or their sub-states, see
+    :class:`State`, the class is hierarchical. Instances store their active configuration as a bit set, so checking the
+    expected states of a transition remains a single bitwise operation, and a transition expecting a composite state is
+    allowed in any of its sub-states. A transition leaves the states of the region containing its new state, and any
+    states they contain, leaving orthogonal regions unchanged. The current state of an instance is then a
+    :class:`frozenset` of its active states. A hierarchical class requires an initial state, and can neither be compact
+    nor have a journal. Classes whose states are neither composite nor sub-states do not pay for this support.
 
     Example:
         See :class:`~afsm.transition`.
@@ -131,6 +339,7 @@ class StateMixin:
     @classmethod
     def __init_subclass__(cls, **kwargs: Any) -> None:
         initial_state_attr = StateField.INITIAL_STATE.value
+        options_attr = StateField.CLASS_OPTIONS.value
 
         # Retrieve the initial state stored in the original class when `attrs` or `dataclass` is replacing the original
         # class with its slotted version, see https://www.attrs.org/en/stable/glossary.html#term-slotted-classes.
@@ -138,8 +347,57 @@ class StateMixin:
 
         # Store the initial state on the class. The state is either specified in `kwargs` or it is the state originally
         # stored in the class `attrs` or `dataclass` is replacing.
-        setattr(cls, initial_state_attr, kwargs.pop("initial_state", initial_state))
+        initial_state = kwargs.pop("initial_state", initial_state)
+        setattr(cls, initial_state_attr, initial_state)
+
+        # Likewise, store the class options, which are either specified in `kwargs` or inherited.
+        options: ClassOptions = getattr(cls, options_attr, DEFAULT_CLASS_OPTIONS)
+        methods = transitioning_methods(cls)
+        options = ClassOptions.of(
+            (
+                (transitioning_method.__transition__, transitioning_method.__wrapped__)
+                for transitioning_method in methods.values()
+            ),
+            initial_state,
+            result_retention=kwargs.pop("result_retention", options.result_retention),
+            compact=kwargs.pop("compact", options.compact),
+            serialize_async=kwargs.pop("serialize_async", options.serialize_async),
+            thread_safe=kwargs.pop("thread_safe", options.thread_safe),
+            journal=kwargs.pop("journal", options.journal),
+            timers=kwargs.pop("timers", options.timers),
+            population=kwargs.pop("population", options.population),
+            observers=options.observers,
+        )
+        setattr(cls, options_attr, options)
+        setattr(cls, StateField.INITIAL_VALUE.value, options.encode(initial_state))
+
+        if options.compact:
+            compact_state = property(
+                compact_state_getter((*options.states, TransientState.IN_TRANSITION)),
+                doc=StateMixin.current_state.__doc__,
+            )
+            setattr(cls, "current_state", compact_state)
+        elif options.hierarchy is not None:
+            active_states = property(options.hierarchy.state_getter(), doc=StateMixin.current_state.__doc__)
+            setattr(cls, "current_state", active_states)
+
+        # Track new instances in their initial state, and schedule their timed transitions, by wrapping the constructor
+        # the class defines or inherits, rather than the wrapper of a base class, whose options may differ.
+        new = base_new = getattr(cls.__new__, _BASE_NEW_ATTR, cls.__new__)
+
+        if options.population is not None:
+            new = populated_constructor(new)
+
+        if options.timeouts:
+            new = timed_constructor(new)
+
+        if new is not base_new:
+            setattr(new, _BASE_NEW_ATTR, base_new)
 
+        if new is not cls.__new__:
+            setattr(cls, "__new__", staticmethod(new))
+
+        defer_preparation(cls, methods, options)
         super().__init_subclass__(**kwargs)
 
     def __new__(cls, *_: Any, **__: Any) -> Any:
@@ -147,7 +405,90 @@ class StateMixin:
 
         # Use `object.__setattr__()` for compatibility with frozen/immutable `attrs` or `dataclass` classes.
         # See https://www.attrs.org/en/stable/init.html#post-init.
-        object.__setattr__(instance, StateField.STATE.value, getattr(cls, StateField.INITIAL_STATE.value))
-        object.__setattr__(instance, StateField.RETURN_VALUES.value, {})
+        object.__setattr__(instance, StateField.STATE.value, getattr(cls, StateField.INITIAL_VALUE.value))
+
+        # Results of idempotent transitions are allocated when the first result is stored.
+        object.__setattr__(instance, StateField.RETURN_VALUES.value, None)
 
         return instance
+
+    @property
+    def current_state(self) -> Optional[State]:
+        """
+        The current state of the instance.
+        """
+        return getattr(self, StateField.STATE.value)  # type: ignore[no-any-return]
+
+    def dispatch(self, event: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Call the transitioning method that handles an event in the current state of the instance. Handlers are looked
+        up in a table of the class, keyed by state and event, so dispatching costs a single lookup.
+
+        Arguments:
+            event: the name of the event, as declared by :class:`~afsm.transition`.
+            args: the positional arguments of the transitioning method.
+            kwargs: the keyword arguments of the transitioning method.
+
+        Returns:
+            The result of the transitioning method.
+
+        Raises:
+            :exc:`StateError`: if no transitioning method handles the event in the current state.
+        """
+        handler = getattr(self, _EVENT_HANDLERS_ATTR).get((getattr(self, _STATE_ATTR), event))
+
+        if handler is None:
+            raise StateError(type(self), TransitionTable.of(type(self)).event_states(event), self.current_state)
+
+        return handler[0](self, *args, **kwargs)
+
+    @classmethod
+    def create_many(cls: Type[_Machine], count: int, *args: Any, **kwargs: Any) -> List[_Machine]:
+        """
+        Create instances of the class in bulk. The first instance is created by calling the class, and the others are
+        copies of it, see :meth:`clone`, so ``__init__()`` is only called once, and each other instance costs little
+        more than allocating it. The copies share all attributes of the first instance other than its containers, such
+        as mutable objects, identifiers or handles that ``__init__()`` creates: call the class for distinct attributes.
+
+        Arguments:
+            count: the number of instances.
+            args: the positional arguments of the class, for the first instance.
+            kwargs: the keyword arguments of the class, for the first instance.
+
+        Returns:
+            The instances, in their initial state unless the first instance transitioned while initialized.
+        """
+        if count < 1:
+            return []
+
+        prototype = cls(*args, **kwargs)
+        return [prototype, *clone_many(prototype, count - 1, _constructor(cls))]
+
+    def clone(self: _Machine) -> _Machine:
+        """
+        Return a copy of the instance, created without calling ``__init__()``, in the same state and with a copy of the
+        results retained or memoized by its idempotent transitions, and of the results memoized by its guards.
+        Attributes that are mutable sequences, mappings or sets, such as lists, dictionaries or deques, are shallow
+        copies, and other attributes, including mutable objects, are shared with the instance. A copy of an instance of
+        a class with timed transitions is scheduled in its state.
+
+        Raises:
+            :exc:`ValueError`: if the instance is in :attr:`TransientState.IN_TRANSITION`.
+        """
+        return clone_many(self, 1, _constructor(type(self)))[0]
+
+
+def _constructor(cls: type) -> Callable[[], Any]:
+    """
+    Return a function that creates an instance of a class with the constructor :meth:`StateMixin.__new__` delegates to,
+    so that the state of the instance is not initialized.
+    """
+    return partial(super(StateMixin, cls).__new__, cls)  # type: ignore[misc]
+
+
+# Set the state and the results through their slot descriptors, which is faster than `object.__setattr__()` and, like
+# it, compatible with frozen/immutable `attrs` or `dataclass` classes.
+_set_state: Callable[[Any, Any], None] = getattr(StateMixin, StateField.STATE.value).__set__
+_set_results: Callable[[Any, Optional[Dict[Any, Any]]], None] = getattr(
+    StateMixin, StateField.RETURN_VALUES.value
+).__set__
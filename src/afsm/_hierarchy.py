@@ -0,0 +1,341 @@
+"""
+This module defines the hierarchy of a state machine with composite states and orthogonal regions, whose instances store
+their active configuration as a bit set.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple, Type
+
+from afsm._state import State, StateField, TransientState, state_parent, state_regions
+
+if TYPE_CHECKING:  # pragma: no cover
+    from afsm._table import TransitionTable
+
+# A transitioning method and its `try_()` function.
+_Handler = Tuple[Callable[..., Any], Callable[..., Any]]
+
+# The value of the handlers of a configuration and an event that are not resolved yet.
+_UNRESOLVED: Any = object()
+
+
+class Configuration(FrozenSet[State]):
+    """
+    The active states of an instance of a hierarchical state machine: a :class:`frozenset` of its active states, which
+    are the active state of each active region and the composite states that contain them. Converted to a string, the
+    states are listed in the order they are declared, each composite state followed by its sub-states.
+    """
+
+    __slots__ = ("_ordered",)
+
+    def __init__(self, states: Tuple[State, ...]) -> None:
+        super().__init__()
+        self._ordered = states
+
+    def __str__(self) -> str:
+        return ", ".join(map(str, self._ordered))
+
+
+class EventHandlers(Dict[Tuple[Any, str], Optional[_Handler]]):
+    """
+    The transitioning methods of a hierarchical state machine class, and their ``try_()`` functions, keyed by active
+    configuration and event name. The method handling an event in a configuration is resolved when first looked up,
+    then stored, so that only the configurations instances are in are indexed, rather than every configuration, whose
+    number grows exponentially with the number of regions. The method expecting the innermost active state handles the
+    event, or the first declared among those expecting states at the same depth.
+
+    Arguments:
+        decode: the function that returns the active states of an active configuration.
+        handlers: each transitioning method and its ``try_()`` function, with its precedence, keyed by the state it
+                  expects and the event it handles.
+    """
+
+    def __init__(
+        self,
+        decode: Callable[[int], Any],
+        handlers: Mapping[Tuple[Optional[State], str], Tuple[Tuple[int, int], _Handler]],
+    ) -> None:
+        super().__init__()
+        self._decode = decode
+        self._handlers = handlers
+        self._events = frozenset(event for _, event in handlers)
+
+    def get(self, key: Tuple[Any, str], default: Any = None) -> Any:
+        """
+        Return the method handling an event in an active configuration, and its ``try_()`` function, or ``default`` if
+        no method handles it.
+        """
+        handler = dict.get(self, key, _UNRESOLVED)
+
+        if handler is _UNRESOLVED:
+            handler = self._resolve(*key)
+
+        return default if handler is None else handler
+
+    def _resolve(self, configuration: int, event: str) -> Optional[_Handler]:
+        # Events that no method handles are not stored, so that looking them up does not grow the table.
+        if event not in self._events:
+            return None
+
+        decoded = self._decode(configuration)
+        active = (decoded,) if decoded is TransientState.IN_TRANSITION else (None, *decoded)
+        handlers = self._handlers
+        candidates = [handlers[state, event] for state in active if (state, event) in handlers]
+        handler = max(candidates, key=itemgetter(0))[1] if candidates else None
+        self[configuration, event] = handler
+        return handler
+
+
+class Hierarchy:
+    """
+    The states of a hierarchical state machine, which are the members of the region containing its initial state at the
+    top level and, recursively, of the regions of each composite state. Each state owns a bit, so that the active
+    configuration of an instance is a bit set of its active states, and checking whether any of the states a transition
+    expects is active, at any depth, is a single bitwise operation.
+
+    Arguments:
+        root: the region at the top level of the hierarchy.
+
+    Attributes:
+        states: the states of the hierarchy, each composite state followed by its sub-states.
+    """
+
+    __slots__ = ("states", "_bits", "_depths", "_entries", "_decoded")
+
+    def __init__(self, root: Type[State]) -> None:
+        self.states: Tuple[State, ...] = tuple(_descendants(root))
+        self._bits: Dict[State, int] = {state: 1 << index for index, state in enumerate(self.states)}
+        self._depths: Dict[State, int] = {}
+        self._entries: Dict[State, Callable[[int], int]] = {}
+
+        # Instances claimed by a thread-safe transition have no active state.
+        self._decoded: Dict[int, Any] = {0: TransientState.IN_TRANSITION}
+
+        for state in self.states:
+            parent = state_parent(state)
+            self._depths[state] = 0 if parent is None else self._depths[parent] + 1
+
+    def bit(self, state: State) -> int:
+        """
+        Return the bit of a state in active configurations.
+        """
+        return self._bits[state]
+
+    def configuration(self, state: State) -> int:
+        """
+        Return the active configuration entered from no state by a transition to a state.
+        """
+        return self.entry(state)(0)
+
+    def entry(self, state: State) -> Callable[[int], int]:
+        """
+        Return the function that computes the active configuration entered by a transition to a state, given the active
+        configuration before the transition.
+
+        The transition leaves the region containing the new state at the deepest level whose composite state is active,
+        then enters each composite state down to the new state, the new state itself, and the first state of each other
+        region of the states it enters. Regions orthogonal to the ones it leaves are unchanged.
+        """
+        entry = self._entries.get(state)
+
+        if entry is None:
+            entry = self._entries[state] = self._compute_entry(state)
+
+        return entry
+
+    def decode(self, configuration: int) -> Any:
+        """
+        Return the :class:`Configuration` for the bit set of its active states, or :attr:`TransientState.IN_TRANSITION`
+        for an instance claimed by a thread-safe transition.
+        """
+        decoded = self._decoded.get(configuration)
+
+        if decoded is None:
+            decoded = self._decoded[configuration] = Configuration(
+                tuple(state for state in self.states if self._bits[state] & configuration)
+            )
+
+        return decoded
+
+    def state_getter(self) -> Callable[[Any], Any]:
+        """
+        Return a getter of the active states of an instance, which stores its active configuration as a bit set.
+        """
+        state_attr = StateField.STATE.value
+        decode = self.decode
+
+        def current_state(instance: Any) -> Any:
+            return decode(getattr(instance, state_attr))
+
+        return current_state
+
+    def event_handlers(self, table: TransitionTable, methods: Mapping[str, Callable[..., Any]]) -> EventHandlers:
+        """
+        Index the transitioning methods of a class by the states and events they handle, to be resolved for each active
+        configuration when first looked up.
+
+        Arguments:
+            table: the transition table of the class.
+            methods: the transitioning methods of the class, keyed by name.
+
+        Returns:
+            Each transitioning method and its ``try_()`` function, keyed by active configuration and event name.
+        """
+        order = {name: index for index, name in enumerate(table.transitions)}
+        handlers: Dict[Tuple[Optional[State], str], Tuple[Tuple[int, int], _Handler]] = {}
+
+        # Transitions that expect no state handle events in every configuration, with the lowest precedence.
+        for state, events in _events_by_state(table).items():
+            for event, name in events:
+                method = methods[name]
+                precedence = (self._depths.get(state, -1), -order[name])  # type: ignore[arg-type]
+                handlers[state, event] = (precedence, (method, method.try_))  # type: ignore[attr-defined]
+
+        return EventHandlers(self.decode, handlers)
+
+    def _compute_entry(self, state: State) -> Callable[[int], int]:
+        path = [state]
+
+        parent = state_parent(state)
+
+        while parent is not None:
+            path.append(parent)
+            parent = state_parent(parent)
+
+        path.reverse()
+
+        # Each step applies if the composite state containing the region it leaves is active, the deepest step first.
+        steps: List[Tuple[int, int, int]] = []
+
+        for depth, entered_state in enumerate(path):
+            active = 0 if depth == 0 else self._bits[path[depth - 1]]
+            steps.append((active, ~self._region_mask(type(entered_state)), self._entered(path[depth:])))
+
+        (_, _, top), *nested = steps
+        nested.reverse()
+
+        def enter(configuration: int) -> int:
+            for active, kept, entered in nested:
+                if configuration & active:
+                    return configuration & kept | entered
+
+            return top
+
+        return enter
+
+    def _entered(self, path: List[State]) -> int:
+        """
+        Return the bits of the states entered along a path, down to a new state, and of the first state of each region
+        of these states that the path does not enter.
+        """
+        entered = 0
+
+        for index, node in enumerate(path):
+            below = path[index + 1] if index + 1 < len(path) else None
+
+            for region in state_regions(node):
+                if not isinstance(below, region):
+                    entered |= self._default_configuration(region)
+
+            entered |= self._bits[node]
+
+        return entered
+
+    def _default_configuration(self, region: Type[State]) -> int:
+        first = next(iter(region))
+        configuration = self._bits[first]
+
+        for sub_region in state_regions(first):
+            configuration |= self._default_configuration(sub_region)
+
+        return configuration
+
+    def _region_mask(self, region: Type[State]) -> int:
+        """
+        Return the bits of the states of a region and, recursively, of the regions of its states.
+        """
+        mask = 0
+
+        for state in region:
+            mask |= self._bits[state]
+
+            for sub_region in state_regions(state):
+                mask |= self._region_mask(sub_region)
+
+        return mask
+
+
+def _events_by_state(table: TransitionTable) -> Dict[Optional[State], List[Tuple[str, str]]]:
+    """
+    Return the events handled in each state of a transition table, and the names of their handlers.
+    """
+    unchecked = frozenset(table._unchecked)  # pylint: disable=protected-access
+    events: Dict[Optional[State], List[Tuple[str, str]]] = {}
+
+    # Transitions that expect no state are listed in every state of the table, but are only indexed once.
+    for (state, event), name in table._events.items():  # pylint: disable=protected-access
+        if state is None or state is TransientState.IN_TRANSITION or name not in unchecked:
+            events.setdefault(state, []).append((event, name))
+
+    return events
+
+
+def hierarchy_of(initial_state: Optional[State], states: Iterable[Optional[State]]) -> Optional[Hierarchy]:
+    """
+    Return the hierarchy of a state machine, given its initial state and the states its transitions expect or reach,
+    or ``None`` if none of these states is composite or a sub-state, in which case the machine is flat.
+
+    Raises:
+        :exc:`ValueError`: if the machine is hierarchical, but has no initial state or its transitions use states
+                           outside the hierarchy containing its initial state.
+    """
+    known: Set[State] = {state for state in (initial_state, *states) if state is not None}
+
+    if not any(state_parent(state) is not None or state_regions(state) for state in known):
+        return None
+
+    if initial_state is None:
+        raise ValueError("A hierarchical state machine requires an initial state")
+
+    root, parent = initial_state, state_parent(initial_state)
+
+    while parent is not None:
+        root, parent = parent, state_parent(parent)
+
+    hierarchy = _hierarchy(type(root), tuple(_descendants(type(root))))
+    outside = known.difference(hierarchy.states)
+
+    if outside:
+        raise ValueError(f"States {', '.join(sorted(map(str, outside)))} are outside the hierarchy of {root}")
+
+    return hierarchy
+
+
+def active_states(state: Any) -> Iterable[State]:
+    """
+    Return the active states, given the state of a flat state machine or the active states of a hierarchical one.
+    """
+    if state is None:
+        return ()
+
+    states: Iterable[State] = (state,) if isinstance(state, State) else state
+    return states
+
+
+@lru_cache(maxsize=None)
+def _hierarchy(root: Type[State], states: Tuple[State, ...]) -> Hierarchy:  # pylint: disable=unused-argument
+    """
+    Return the hierarchy with the given region at the top level, shared by all machines whose initial state it contains,
+    so that their class options compare equal and their inherited transitioning methods are not recompiled. The cache
+    is keyed on the states of the hierarchy too, so that a region defined after a lookup yields a new hierarchy.
+    """
+    return Hierarchy(root)
+
+
+def _descendants(region: Type[State]) -> Iterable[State]:
+    for state in region:
+        yield state
+
+        for sub_region in state_regions(state):
+            yield from _descendants(sub_region)
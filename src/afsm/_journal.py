@@ -0,0 +1,343 @@
+"""
+This module defines the journal of transitions, an append-only file to which transitions are recorded in batches.
+"""
+from __future__ import annotations
+
+import sys
+from collections import deque
+from json import dumps, loads
+from threading import Event, Lock, Thread
+from time import time_ns
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from afsm._fsm import _set_state
+from afsm._options import ClassOptions
+from afsm._state import State, StateField
+from afsm._table import TransitionTable
+
+# A buffered record: the time in nanoseconds since the epoch, the key and class of the instance, the name of the
+# transitioning method, and the states before and after the transition.
+_Record = Tuple[int, Hashable, type, str, Optional[State], Optional[State]]
+
+
+class JournalRecord(NamedTuple):
+    """
+    A transition read from a :class:`Journal` file.
+    """
+
+    time: int
+    """The time of the transition, in nanoseconds since the epoch."""
+    class_name: str
+    """The fully qualified name of the class of the instance."""
+    key: Any
+    """The key of the instance, with JSON arrays decoded as tuples, so that tuple keys remain hashable."""
+    method: str
+    """The name of the transitioning method."""
+    from_state: Optional[str]
+    """The name of the state of the instance before the transition, qualified by its class, as in ``State.NAME``."""
+    to_state: Optional[str]
+    """The name of the state of the instance after the transition, qualified by its class, as in ``State.NAME``."""
+
+
+class Journal:  # pylint: disable=too-many-instance-attributes
+    """
+    An append-only journal of the transitions of state machines, for auditing or recovering their states after a
+    crash. Each successful transition of a class that has a journal, specified with the ``journal`` argument of the
+    class definition statement, is recorded with the time, the key of the instance, the transitioning method and the
+    states before and after the transition. Transitions rejected or raising an exception are not recorded, and neither
+    are idempotent transitions that return a retained result.
+
+    Transitions append their records to an in-memory buffer, which is written to the journal file in a single batch
+    when it reaches ``buffer_size`` records, or every ``flush_interval`` seconds by a background thread. Records are
+    written one per line, as tab-separated fields, with keys encoded as JSON and states qualified by their class.
+    Records still buffered when the journal is closed are written, but those buffered when the process crashes are
+    lost. Records that cannot be formatted or written stay buffered until the next flush. Errors of flushes triggered by
+    transitions, which are already complete, or by the background thread are reported to ``on_error`` rather than
+    raised.
+
+    Example:
+        >>> from enum import auto
+        >>> from operator import attrgetter
+        >>> from tempfile import TemporaryDirectory
+        >>> from afsm import Journal, State, StateMixin, transition
+        ...
+        >>> class MachineState(State):
+        ...     INITIAL = auto()
+        ...     FINAL = auto()
+        ...
+        >>> directory = TemporaryDirectory()
+        >>> journal = Journal(f"{directory.name}/machines.journal", key=attrgetter("name"))
+        >>> class AFiniteStateMachine(StateMixin, initial_state=MachineState.INITIAL, journal=journal):
+        ...     def __init__(self, name):
+        ...         self.name = name
+        ...
+        ...     @transition(from_=MachineState.INITIAL, to_=MachineState.FINAL)
+        ...     def to_final_state(self):
+        ...         pass
+        ...
+        >>> AFiniteStateMachine("first").to_final_state()
+        >>> journal.close()
+        >>> machines = {"first": AFiniteStateMachine("first"), "second": AFiniteStateMachine("second")}
+        >>> Journal.replay(journal.path, machines)
+        1
+        >>> [str(machine.current_state) for machine in machines.values()]
+        ['FINAL', 'INITIAL']
+        >>> directory.cleanup()
+
+    Arguments:
+        path: the path of the journal file, to which records are appended.
+        key: a function returning the key of an instance, which identifies the instance across restarts. Keys must be
+             serializable to JSON. Keys that are tuples, encoded as JSON arrays, are read back as tuples.
+        buffer_size: the number of buffered records that triggers writing them to the file.
+        flush_interval: if not ``None``, the interval in seconds at which a background thread writes buffered records
+                        to the file.
+        on_error: the function called with the exception when writing buffered records fails, other than in
+                  :meth:`flush` or :meth:`close`. By default, the exception is reported to :func:`sys.excepthook`.
+
+    Attributes:
+        path: the path of the journal file.
+        buffer_size: the number of buffered records that triggers writing them to the file.
+
+    Raises:
+        :exc:`ValueError`: if ``buffer_size`` or ``flush_interval`` is not positive.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments # The options of the journal, all but the first two are optional
+        self,
+        path: str,
+        key: Callable[[Any], Hashable],
+        buffer_size: int = 4096,
+        flush_interval: Optional[float] = None,
+        on_error: Optional[Callable[[BaseException], Any]] = None,
+    ) -> None:
+        if buffer_size < 1 or (flush_interval is not None and flush_interval <= 0):
+            raise ValueError("The buffer size and the flush interval must be positive")
+
+        self.path = path
+        self.buffer_size = buffer_size
+        self._key = key
+        self._on_error = on_error
+
+        # Appending to and popping from a deque are atomic, so recording a transition takes no lock.
+        self._buffer: Deque[_Record] = deque()
+        self._file_lock = Lock()
+        self._file = open(path, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+        self._closed = Event()
+
+        if flush_interval is not None:
+            Thread(target=self._write_periodically, args=(flush_interval,), daemon=True).start()
+
+    def __enter__(self) -> Journal:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def record(self, instance: Any, method: str, from_state: Optional[State], to_state: Optional[State]) -> None:
+        """
+        Record a transition of an instance, which transitioning methods call after setting the new state.
+
+        Arguments:
+            instance: the instance.
+            method: the name of the transitioning method.
+            from_state: the state of the instance before the transition.
+            to_state: the state of the instance after the transition.
+        """
+        buffer = self._buffer
+        buffer.append((time_ns(), self._key(instance), type(instance), method, from_state, to_state))
+
+        if len(buffer) >= self.buffer_size:
+            self._flush_or_report()
+
+    def flush(self) -> None:
+        """
+        Write the buffered records to the journal file. Records that cannot be formatted or written stay buffered.
+
+        Raises:
+            :exc:`Exception`: the exception raised when formatting or writing the records, such as an :exc:`OSError`.
+        """
+        with self._file_lock:
+            buffer = self._buffer
+
+            # Records of transitions after the journal is closed are discarded, so that they do not accumulate.
+            if self._file.closed:
+                buffer.clear()
+                return
+
+            # Transitions keep appending records without the lock, so the records are dequeued, then put back in front
+            # of those appended meanwhile if they cannot be written. Replaying a record written twice is harmless.
+            popleft = buffer.popleft
+            records = [popleft() for _ in range(len(buffer))]
+
+            try:
+                self._file.writelines(_format(records))
+                self._file.flush()
+            except BaseException:
+                buffer.extendleft(reversed(records))
+                raise
+
+    def close(self) -> None:
+        """
+        Stop the background thread, if any, write the buffered records and close the journal file. Transitions recorded
+        afterwards are never written.
+        """
+        # The background thread stops when it next wakes up, and cannot write while the buffer is flushed.
+        self._closed.set()
+
+        try:
+            self.flush()
+        finally:
+            with self._file_lock:
+                self._file.close()
+
+    @staticmethod
+    def read(path: str) -> Iterator[JournalRecord]:
+        """
+        Read the records of a journal file, streaming them in the order they were written.
+
+        Arguments:
+            path: the path of the journal file.
+        """
+        with open(path, encoding="utf-8") as journal_file:
+            for line in journal_file:
+                time, class_name, encoded_key, method, from_state, to_state = line.rstrip("\n").split("\t")
+                key = loads(encoded_key)
+
+                if isinstance(key, list):
+                    key = _tuple(key)
+
+                yield JournalRecord(int(time), class_name, key, method, from_state or None, to_state or None)
+
+    @staticmethod
+    def replay(path: str, machines: Mapping[Any, Any]) -> int:
+        """
+        Replay the records of a journal file on the given machines, setting the state of each machine to the state
+        reached by its latest recorded transition. Transitioning methods are not called, and the results they retained
+        are left unchanged, other than those that transitions drop when leaving a state, such as memoized guard results.
+        Records of other keys, or of other classes, are skipped.
+
+        Arguments:
+            path: the path of the journal file.
+            machines: the machines, keyed in the same way as by the journal.
+
+        Returns:
+            The number of records replayed.
+        """
+        decoders: Dict[type, Tuple[str, Dict[Optional[str], Any], ClassOptions]] = {}
+        replayed = 0
+
+        for record in Journal.read(path):
+            machine = machines.get(record.key)
+
+            if machine is None:
+                continue
+
+            class_ = type(machine)
+            decoder = decoders.get(class_)
+
+            if decoder is None:
+                decoder = decoders[class_] = _decoder(class_)
+
+            class_name, values, options = decoder
+
+            if record.class_name == class_name and record.to_state in values:
+                value = values[record.to_state]
+                options.leave(machine, value)
+                _set_state(machine, value)
+                replayed += 1
+
+        return replayed
+
+    def _write_periodically(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            self._flush_or_report()
+
+    def _flush_or_report(self) -> None:
+        try:
+            self.flush()
+        except Exception as exception:  # pylint: disable=broad-except
+            if self._on_error is not None:
+                self._on_error(exception)
+            else:
+                sys.excepthook(type(exception), exception, exception.__traceback__)
+
+
+def _format(records: Iterable[_Record]) -> List[str]:
+    """
+    Format buffered records as lines of the journal file. The names of classes and states are formatted once for each
+    batch of records, and integer keys, the most common, are formatted without encoding them to JSON.
+    """
+    names: Dict[Any, str] = {None: ""}
+    lines: List[str] = []
+
+    for time, key, class_, method, from_state, to_state in records:
+        class_name = names.get(class_)
+
+        if class_name is None:
+            class_name = names[class_] = f"{class_.__module__}.{class_.__qualname__}"
+
+        from_name = names.get(from_state)
+
+        if from_name is None:
+            from_name = names[from_state] = _state_name(from_state)  # type: ignore[arg-type]
+
+        to_name = names.get(to_state)
+
+        if to_name is None:
+            to_name = names[to_state] = _state_name(to_state)  # type: ignore[arg-type]
+
+        encoded_key = str(key) if type(key) is int else dumps(key)  # pylint: disable=unidiomatic-typecheck
+        lines.append(f"{time}\t{class_name}\t{encoded_key}\t{method}\t{from_name}\t{to_name}\n")
+
+    return lines
+
+
+def _state_name(state: State) -> str:
+    """
+    Return the name of a state qualified by the name of its class, as members of different classes can share names.
+    """
+    return f"{type(state).__qualname__}.{state.name}"
+
+
+def _tuple(items: List[Any]) -> Tuple[Any, ...]:
+    """
+    Return a JSON array decoded as a list, and the arrays it contains, as tuples.
+    """
+    return tuple(_tuple(item) if isinstance(item, list) else item for item in items)
+
+
+def _decoder(cls: type) -> Tuple[str, Dict[Optional[str], Any], ClassOptions]:
+    """
+    Return the fully qualified name of a state machine class, the values stored on its instances for each state keyed
+    by the name of the state qualified by its class, and the options of the class.
+    """
+    options: ClassOptions = getattr(cls, StateField.CLASS_OPTIONS.value)
+    values: Dict[Optional[str], Any] = {
+        _state_name(state): options.encode(state) for state in TransitionTable.of(cls).states
+    }
+
+    # Only machines that store states themselves can be in no state, before an initial state is set.
+    if not options.compact:
+        values[None] = None
+
+    return f"{cls.__module__}.{cls.__qualname__}", values, options
@@ -0,0 +1,281 @@
+"""
+This module defines the observers that are notified of transitions, for example to collect metrics.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import replace
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+from weakref import WeakKeyDictionary
+
+from afsm._fsm import StateMixin
+from afsm._options import DEFAULT_CLASS_OPTIONS, ClassOptions
+from afsm._prepare import is_prepared, recompile, transitioning_methods
+from afsm._state import State, StateField
+
+
+class Observer:
+    """
+    A base class for observers of transitions. An observer registered with :func:`observe` is notified when the
+    transitioning methods of the observed classes succeed, are rejected, or raise an exception. Notifications are
+    delivered by the thread running the transition, before the transitioning method returns or raises.
+
+    Observed transitioning methods are recompiled to notify their observers and time the decorated methods, while those
+    of classes without observers are compiled without any instrumentation, so they cost nothing more than before.
+    Idempotent transitions that return a retained result are not notified.
+
+    Example:
+        >>> from enum import auto
+        >>> from afsm import State, StateMixin, TransitionMetrics, observe, transition
+        ...
+        >>> class MachineState(State):
+        ...     INITIAL = auto()
+        ...     FINAL = auto()
+        ...
+        >>> class AFiniteStateMachine(StateMixin, initial_state=MachineState.INITIAL):
+        ...     @transition(from_=MachineState.INITIAL, to_=MachineState.FINAL)
+        ...     def to_final_state(self):
+        ...         pass
+        ...
+        >>> metrics = TransitionMetrics()
+        >>> observe(metrics, AFiniteStateMachine)
+        >>> AFiniteStateMachine().to_final_state()
+        >>> metrics.transitions[AFiniteStateMachine, MachineState.INITIAL, MachineState.FINAL]
+        1
+    """
+
+    def transitioned(  # pylint: disable=too-many-arguments # One argument per detail of the notification
+        self, class_: type, method: str, from_state: Optional[State], to_state: Optional[State], duration: int
+    ) -> None:
+        """
+        Notify the observer that a transitioning method succeeded, or returned the result of its exception handler.
+
+        Arguments:
+            class_: the class of the instance.
+            method: the name of the transitioning method.
+            from_state: the state of the instance before the transition.
+            to_state: the state of the instance after the transition, the same as before if the state did not change.
+            duration: the time the decorated method took, including its exception handler, in nanoseconds.
+        """
+
+    def rejected(self, class_: type, method: str, state: Optional[State]) -> None:
+        """
+        Notify the observer that a transitioning method was called in an unexpected state, before a
+        :exc:`~afsm.StateError` is raised.
+
+        Arguments:
+            class_: the class of the instance.
+            method: the name of the transitioning method.
+            state: the current state of the instance.
+        """
+
+    def failed(  # pylint: disable=too-many-arguments # One argument per detail of the notification
+        self, class_: type, method: str, state: Optional[State], exception: Exception, duration: int
+    ) -> None:
+        """
+        Notify the observer that the decorated method raised an exception, before the exception is passed to the
+        exception handler, if any, or propagated.
+
+        Arguments:
+            class_: the class of the instance.
+            method: the name of the transitioning method.
+            state: the current state of the instance.
+            exception: the raised exception.
+            duration: the time the decorated method took until it raised the exception, in nanoseconds.
+        """
+
+
+class LatencyHistogram:
+    """
+    A histogram of durations in nanoseconds, whose buckets double in width. The bucket at index ``i`` counts durations
+    of ``i`` bits, that is from ``2 ** (i - 1)`` up to ``2 ** i`` nanoseconds, excluded.
+
+    Attributes:
+        buckets: the number of durations in each bucket.
+        count: the number of durations recorded.
+        total: the sum of the durations recorded, in nanoseconds.
+    """
+
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * 65
+        self.count = 0
+        self.total = 0
+
+    def record(self, duration: int) -> None:
+        """
+        Record a duration in nanoseconds.
+        """
+        self.buckets[duration.bit_length()] += 1
+        self.count += 1
+        self.total += duration
+
+    def mean(self) -> float:
+        """
+        Return the mean of the recorded durations in nanoseconds, or zero if none was recorded.
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, fraction: float) -> int:
+        """
+        Return an upper bound of a quantile of the recorded durations in nanoseconds, which is the upper bound of the
+        bucket the quantile falls in, or zero if no duration was recorded.
+
+        Arguments:
+            fraction: the fraction of durations below the quantile, between 0 and 1. For example, 0.99 for the 99th
+                      percentile.
+        """
+        rank = fraction * self.count
+        cumulative = 0
+
+        for index, bucket in enumerate(self.buckets):
+            cumulative += bucket
+
+            if bucket and cumulative >= rank:
+                return 1 << index
+
+        return 0
+
+
+class TransitionMetrics(Observer):
+    """
+    An :class:`Observer` that counts transitions by class and by pair of states, rejections and exceptions by class,
+    method and state, and records histograms of the durations of the decorated methods by class and method.
+
+    Counts are always exact, as notifications are recorded under a lock of the observer, even when transitions run in
+    several threads. Under heavy load, durations can be sampled, so that only one in ``sample_every`` notifications of
+    each observer records its duration in a histogram.
+
+    Arguments:
+        sample_every: the sampling interval of durations. If 1, every duration is recorded.
+
+    Attributes:
+        transitions: the number of transitions, keyed by class, previous state and new state.
+        rejections: the number of rejections, keyed by class, method name and current state.
+        exceptions: the number of exceptions raised by decorated methods, keyed by class, method name and current state.
+        latencies: the :class:`LatencyHistogram` of the sampled durations of decorated methods, keyed by class and
+                   method name.
+
+    Raises:
+        :exc:`ValueError`: if ``sample_every`` is not positive.
+    """
+
+    def __init__(self, sample_every: int = 1) -> None:
+        if sample_every < 1:
+            raise ValueError("The sampling interval must be positive")
+
+        self.sample_every = sample_every
+        self.transitions: Counter[Tuple[type, Optional[State], Optional[State]]] = Counter()
+        self.rejections: Counter[Tuple[type, str, Optional[State]]] = Counter()
+        self.exceptions: Counter[Tuple[type, str, Optional[State]]] = Counter()
+        self.latencies: Dict[Tuple[type, str], LatencyHistogram] = {}
+        self._countdown = sample_every
+        self._lock = Lock()
+
+    def transitioned(  # pylint: disable=too-many-arguments # One argument per detail of the notification
+        self, class_: type, method: str, from_state: Optional[State], to_state: Optional[State], duration: int
+    ) -> None:
+        with self._lock:
+            self.transitions[class_, from_state, to_state] += 1
+            self._countdown -= 1
+
+            if not self._countdown:
+                self._record(class_, method, duration)
+
+    def rejected(self, class_: type, method: str, state: Optional[State]) -> None:
+        with self._lock:
+            self.rejections[class_, method, state] += 1
+
+    def failed(  # pylint: disable=too-many-arguments # One argument per detail of the notification
+        self, class_: type, method: str, state: Optional[State], exception: Exception, duration: int
+    ) -> None:
+        with self._lock:
+            self.exceptions[class_, method, state] += 1
+            self._countdown -= 1
+
+            if not self._countdown:
+                self._record(class_, method, duration)
+
+    def _record(self, class_: type, method: str, duration: int) -> None:
+        self._countdown = self.sample_every
+        histogram = self.latencies.get((class_, method))
+
+        if histogram is None:
+            histogram = self.latencies[class_, method] = LatencyHistogram()
+
+        histogram.record(duration)
+
+
+# The observers registered for each class, which also observe its subclasses.
+_observers: WeakKeyDictionary[type, Tuple[Observer, ...]] = WeakKeyDictionary()
+
+
+def observe(observer: Observer, cls: Type[StateMixin] = StateMixin) -> None:
+    """
+    Register an observer of the transitions of a class and its subclasses, including those defined later.
+
+    Arguments:
+        observer: the observer, any object with the methods of :class:`Observer`.
+        cls: the observed :class:`StateMixin` subclass. If :class:`StateMixin` itself, the observer is global and
+             observes all state machines.
+    """
+    _observers[cls] = (*_observers.get(cls, ()), observer)
+    _update(cls)
+
+
+def unobserve(observer: Observer, cls: Type[StateMixin] = StateMixin) -> None:
+    """
+    Unregister an observer of the transitions of a class and its subclasses.
+
+    Arguments:
+        observer: an observer registered with :func:`observe`.
+        cls: the class the observer was registered for.
+
+    Raises:
+        :exc:`ValueError`: if the observer is not registered for the class.
+    """
+    observers: List[Observer] = list(_observers.get(cls, ()))
+
+    if observer not in observers:
+        raise ValueError(f"{observer!r} does not observe '{cls.__name__}'")
+
+    observers.remove(observer)
+    _observers[cls] = tuple(observers)
+    _update(cls)
+
+
+def _update(cls: type) -> None:
+    """
+    Update the observers in the options of a class and its subclasses, and recompile their transitioning methods.
+    """
+    options_attr = StateField.CLASS_OPTIONS.value
+
+    for class_ in _subclasses(cls):
+        options: ClassOptions = getattr(class_, options_attr, DEFAULT_CLASS_OPTIONS)
+        observers = tuple(observer for base in reversed(class_.__mro__) for observer in _observers.get(base, ()))
+
+        if options.observers != observers:
+            options = replace(options, observers=observers)
+            setattr(class_, options_attr, options)
+
+            # Classes that are not prepared yet compile their transitioning methods with their options when prepared.
+            if is_prepared(class_):
+                recompile(class_, transitioning_methods(class_), options)
+
+
+def _subclasses(cls: type) -> Iterator[type]:
+    """
+    Return a class and all its subclasses, each once.
+    """
+    seen = set()
+    classes = [cls]
+
+    while classes:
+        class_ = classes.pop()
+
+        if class_ not in seen:
+            seen.add(class_)
+            classes.extend(class_.__subclasses__())
+            yield class_
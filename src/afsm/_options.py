@@ -0,0 +1,258 @@
+"""
+This module defines the options of a state machine class, which determine how its transitioning methods are compiled.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from functools import reduce
+from operator import or_
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Mapping, Optional, Tuple, final
+
+from afsm._cache import GUARDS_KEY, Retention
+from afsm._hierarchy import Hierarchy, hierarchy_of
+from afsm._state import State, StateField, TransientState, state_index
+
+if TYPE_CHECKING:  # pragma: no cover
+    from afsm._fsm import Transition
+    from afsm._journal import Journal
+    from afsm._observe import Observer
+    from afsm._population import Population
+    from afsm._table import TransitionTable
+    from afsm._timer import TimingWheel
+
+# The arguments that make a dataclass slotted, if supported.
+try:
+    # pylint: disable-next=unexpected-keyword-arg,useless-suppression # Only unexpected before Python 3.10
+    dataclass(eq=False, frozen=True, slots=True)  # type: ignore[call-overload]
+    SLOTTED = {"slots": True}
+except TypeError:  # Python < 3.10 does not support slotted dataclasses
+    SLOTTED = {}
+
+
+class StateBits(Dict[Optional[State], int]):
+    """
+    The bits of the states of a state machine in bit masks of states, keyed by state. Any other state, such as
+    :attr:`TransientState.IN_TRANSITION` or a state of an unrelated machine, has no bit.
+    """
+
+    def __missing__(self, state: Optional[State]) -> int:
+        return 0
+
+
+@final
+@dataclass(frozen=True, **SLOTTED)  # pylint: disable=unexpected-keyword-arg,useless-suppression
+class ClassOptions:  # pylint: disable=too-many-instance-attributes # One field per option of the class statement
+    """
+    The options of a :class:`StateMixin` subclass that determine how its transitioning methods are compiled.
+    """
+
+    result_retention: Retention = Retention.STRONG
+    compact: bool = False
+    serialize_async: bool = False
+    thread_safe: bool = False
+    observers: Tuple[Observer, ...] = ()
+    journal: Optional[Journal] = None
+    timers: Optional[TimingWheel] = None
+    population: Optional[Population] = None
+    timeouts: Mapping[State, Tuple[Tuple[float, str], ...]] = field(default_factory=dict)
+    states: Tuple[State, ...] = ()
+    hierarchy: Optional[Hierarchy] = None
+    leave_mask: int = 0
+    cleared_on_leave: Mapping[int, Tuple[Callable[..., Any], ...]] = field(default_factory=dict)
+    clear_guards: bool = False
+    bits: Mapping[Optional[State], int] = field(default_factory=StateBits)
+
+    @classmethod
+    def of(
+        cls,
+        transitions: Iterable[Tuple[Transition[Any], Callable[..., Any]]],
+        initial_state: Optional[State],
+        **options: Any,
+    ) -> ClassOptions:
+        """
+        Create the options of a class, given its initial state and pairs of transitions declared on, or inherited by,
+        the class and their decorated methods.
+
+        Raises:
+            :exc:`ValueError`: if the class is compact, but has no initial state or uses states of different classes, or
+                               if the class is hierarchical, but is compact, has a journal, has no initial state or
+                               uses states outside its hierarchy, or if the class has timed transitions but no
+                               timing wheel.
+        """
+        transitions = tuple(transitions)
+        states = [
+            state
+            for transition_, _ in transitions
+            for state in (*transition_._from_states(), transition_.to_)  # pylint: disable=protected-access
+        ]
+        hierarchy = hierarchy_of(initial_state, states)
+
+        # Complete the options before creating them, as replacing fields of a dataclass is slow.
+        if hierarchy is not None:
+            if options.get("compact") or options.get("journal") is not None:
+                raise ValueError("A hierarchical state machine can neither be compact nor have a journal")
+
+            options["hierarchy"] = hierarchy
+        elif options.get("compact"):
+            options["states"] = state_members(initial_state, (transition_ for transition_, _ in transitions))
+        else:
+            options["bits"] = state_bits((initial_state, *states))
+
+        class_options = cls(**options)
+
+        cleared_on_leave: Dict[int, Tuple[Callable[..., Any], ...]] = {}
+        timeouts: Dict[State, Tuple[Tuple[float, str], ...]] = {}
+
+        for transition_, method in transitions:
+            if transition_.timeout is not None:
+                for state in transition_._from_states():  # pylint: disable=protected-access
+                    timeouts[state] = (*timeouts.get(state, ()), (transition_.timeout, method.__name__))
+
+            if transition_._retention(class_options) is Retention.CLEAR_ON_LEAVE:  # pylint: disable=protected-access
+                bit = class_options.bit(transition_.to_)  # type: ignore[arg-type]
+                cleared_on_leave[bit] = (*cleared_on_leave.get(bit, ()), method)
+
+        if timeouts and class_options.timers is None:
+            raise ValueError("A state machine with timed transitions requires a timing wheel")
+
+        clear_guards = any(transition_.cache_guard for transition_, _ in transitions)
+
+        if not (cleared_on_leave or timeouts or clear_guards):
+            return class_options
+
+        return replace(
+            class_options,
+            leave_mask=reduce(or_, cleared_on_leave, 0),
+            cleared_on_leave=cleared_on_leave,
+            timeouts=timeouts,
+            clear_guards=clear_guards,
+        )
+
+    def encode(self, state: Optional[State]) -> Any:
+        """
+        Return the value stored on an instance for a state, which is the index of the state if the class is compact.
+        The transient state of a compact class follows its other states. If the class is hierarchical, the value is the
+        active configuration entered by a transition to the state, and the transient state has no active state.
+        """
+        if self.hierarchy is not None and state is not None:
+            return 0 if state is TransientState.IN_TRANSITION else self.hierarchy.configuration(state)
+
+        if not self.compact or state is None:
+            return state
+
+        if state is TransientState.IN_TRANSITION:
+            return len(self.states)
+
+        return state_index(state)
+
+    def bit(self, state: State) -> int:
+        """
+        Return the bit for a state in bit masks of states, which is at the index of the state if the class is compact,
+        at the index of the state within its hierarchy if the class is hierarchical, or at the index of the state among
+        the states of the class otherwise.
+        """
+        if self.hierarchy is not None:
+            return self.hierarchy.bit(state)
+
+        return 1 << state_index(state) if self.compact else self.bits[state]
+
+    def leave(self, instance: Any, value: Any) -> None:
+        """
+        Drop the results of an instance that must not outlive the state it leaves, before the value stored for its state
+        is replaced with the given value outside a transition: the memoized results of guards, and the results retained
+        until leaving the state, see :attr:`Retention.CLEAR_ON_LEAVE`. Transitioning methods drop them when they set the
+        new state.
+        """
+        results: Optional[Dict[Any, Any]] = getattr(instance, StateField.RETURN_VALUES.value, None)
+
+        if not results:
+            return
+
+        if self.clear_guards:
+            results.pop(GUARDS_KEY, None)
+
+        if self.leave_mask:
+            left = self._mask(getattr(instance, StateField.STATE.value)) & ~self._mask(value) & self.leave_mask
+
+            for bit, methods in self.cleared_on_leave.items():
+                if bit & left:
+                    for method in methods:
+                        results.pop(method, None)
+
+    def _mask(self, value: Any) -> int:
+        # A hierarchical instance stores its active configuration, which is already a bit mask.
+        if self.hierarchy is not None:
+            configuration: int = value
+            return configuration
+
+        return 1 << int(value) if self.compact else self.bits[value]
+
+
+DEFAULT_CLASS_OPTIONS = ClassOptions()
+
+
+def machine_states(cls: type) -> Tuple[State, ...]:
+    """
+    Return the states of a state machine class, ordered by their index within their :class:`State` class.
+
+    Arguments:
+        cls: a subclass of :class:`StateMixin`.
+
+    Raises:
+        :exc:`ValueError`: if the class has no initial state or uses states of different classes.
+    """
+    options: ClassOptions = getattr(cls, StateField.CLASS_OPTIONS.value)
+
+    if options.compact:
+        return options.states
+
+    table: TransitionTable = getattr(cls, StateField.TRANSITION_TABLE.value)
+    return state_members(getattr(cls, StateField.INITIAL_STATE.value), table.transitions.values())
+
+
+def state_bits(states: Iterable[Optional[State]]) -> StateBits:
+    """
+    Number the bits of the given states in order, ignoring duplicates and ``None``, so that the bit masks of the states
+    of a machine are only as wide as the number of its states, regardless of how many states are defined.
+    """
+    return StateBits(
+        (state, 1 << index) for index, state in enumerate(dict.fromkeys(state for state in states if state is not None))
+    )
+
+
+def state_members(initial_state: Optional[State], transitions: Iterable[Transition[Any]]) -> Tuple[State, ...]:
+    """
+    Return the members of the :class:`State` class of a state machine, given its initial state and its transitions.
+
+    Raises:
+        :exc:`ValueError`: if there is no initial state, or the transitions use states of different classes.
+    """
+    if initial_state is None:
+        raise ValueError("A state machine encoded with integer codes requires an initial state")
+
+    state_class = type(initial_state)
+    states = {
+        state
+        for transition_ in transitions
+        for state in (*transition_._from_states(), transition_.to_)  # pylint: disable=protected-access
+        if state is not None
+    }
+
+    # Members of a state class cannot be subclassed, so being an instance of it is being of that exact class.
+    if any(not isinstance(state, state_class) for state in states):
+        raise ValueError(f"A state machine encoded with integer codes requires only '{state_class.__name__}' states")
+
+    return tuple(state_class)
+
+
+def compact_state_getter(states: Tuple[State, ...]) -> Callable[[Any], State]:
+    """
+    Return a getter of the current state of an instance that stores its state as an index into the given states.
+    """
+    state_attr = StateField.STATE.value
+
+    def current_state(instance: Any) -> State:
+        index: int = getattr(instance, state_attr)
+        return states[index]
+
+    return current_state
@@ -0,0 +1,156 @@
+"""
+This module defines the population of state machines, a registry of the live instances of classes in each state.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Callable, DefaultDict, Dict, Iterator, Tuple
+from weakref import ref
+
+from afsm._hierarchy import active_states
+from afsm._state import State, StateField
+
+
+class _Member(ref):  # type: ignore[type-arg] # pylint: disable=too-few-public-methods
+    """
+    A weak reference to a tracked instance, which also holds the address of the instance and its active states, so that
+    moving the instance to other states does not allocate another reference.
+    """
+
+    __slots__ = ("key", "states")
+
+    def __init__(self, instance: Any, callback: Callable[[_Member], None]) -> None:
+        super().__init__(instance, callback)  # type: ignore[call-arg]
+        self.key = id(instance)
+        self.states: Tuple[State, ...] = ()
+
+
+class Population:
+    """
+    A registry of the live instances of state machines in each state, kept up to date by the instances of classes
+    specified with the ``population`` argument of the class definition statement. A single population can be shared by
+    many classes.
+
+    Instances are tracked in their initial state when created, and moved to their new state by each transition that
+    changes state, so counting the instances in a state takes constant time, and iterating over them only visits the
+    instances in that state. Instances are held by weak references, and drop out of the population when garbage
+    collected, so instances of slotted classes must support weak references. Instances claimed by thread-safe
+    transitions are counted in their previous state until they reach their new state. Classes without a population do
+    not pay for this tracking.
+
+    Example:
+        >>> from enum import auto
+        >>> from afsm import Population, State, StateMixin, transition
+        ...
+        >>> class ConnectionState(State):
+        ...     OPEN = auto()
+        ...     CLOSING = auto()
+        ...
+        >>> connections = Population()
+        >>> class Connection(StateMixin, initial_state=ConnectionState.OPEN, population=connections):
+        ...     @transition(from_=ConnectionState.OPEN, to_=ConnectionState.CLOSING)
+        ...     def close(self):
+        ...         pass
+        ...
+        >>> first, second = Connection(), Connection()
+        >>> first.close()
+        >>> connections.count(ConnectionState.OPEN), connections.count(ConnectionState.CLOSING)
+        (1, 1)
+        >>> list(connections.members(ConnectionState.CLOSING)) == [first]
+        True
+        >>> del first
+        >>> connections.count(ConnectionState.CLOSING)
+        0
+    """
+
+    def __init__(self) -> None:
+        self._tracked: Dict[int, _Member] = {}
+        self._members: DefaultDict[State, Dict[int, _Member]] = defaultdict(dict)
+
+    def __len__(self) -> int:
+        """
+        Return the number of live instances tracked by the population.
+        """
+        return len(self._tracked)
+
+    def count(self, state: State) -> int:
+        """
+        Return the number of live instances in a state.
+        """
+        members = self._members.get(state)
+        return 0 if members is None else len(members)
+
+    def counts(self) -> Dict[State, int]:
+        """
+        Return the number of live instances in each state that has any.
+        """
+        return {state: len(members) for state, members in tuple(self._members.items()) if members}
+
+    def members(self, state: State) -> Iterator[Any]:
+        """
+        Return an iterator over the live instances in a state, in the order they entered it. The instances are those in
+        the state when this method is called, excluding those collected in the meantime.
+        """
+        members = self._members.get(state)
+
+        if members is None:
+            return iter(())
+
+        return (instance for instance in map(_Member.__call__, tuple(members.values())) if instance is not None)
+
+    def move(self, instance: Any, state: Any) -> None:
+        """
+        Move an instance to its new state, or states if its class is hierarchical, which transitioning methods call
+        after setting the new state. Instances that are not tracked yet are tracked in that state.
+
+        Arguments:
+            instance: the instance.
+            state: the state, or active states, of the instance after the transition.
+        """
+        key = id(instance)
+        member = self._tracked.get(key)
+
+        if member is None:
+            member = self._tracked[key] = _Member(instance, self._collect)
+
+        # Each operation on the dictionaries is atomic, and only the thread running a transition of an instance moves
+        # it, so no lock is needed.
+        for left in member.states:
+            self._members[left].pop(key, None)
+
+        member.states = tuple(active_states(state))
+
+        for entered in member.states:
+            self._members[entered][key] = member
+
+    def track(self, instance: Any) -> None:
+        """
+        Track an instance in its current state. Instances are tracked when created, cloned, transitioned or stored from
+        a :class:`~afsm.Fleet`, but not when restored from a :class:`~afsm.Snapshot` or replayed from a
+        :class:`~afsm.Journal`, which set their states without transitions.
+
+        Arguments:
+            instance: the instance, whose class has this population.
+        """
+        self.move(instance, instance.current_state)
+
+    def _collect(self, member: _Member) -> None:
+        # Called when a tracked instance is garbage collected, before its address can be reused.
+        self._tracked.pop(member.key, None)
+
+        for state in member.states:
+            self._members[state].pop(member.key, None)
+
+
+def populated_constructor(new: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Return a constructor of instances of classes with a population, which creates instances with another constructor,
+    then tracks them in their initial state.
+    """
+
+    def __new__(cls: type, *args: Any, **kwargs: Any) -> Any:
+        instance = new(cls, *args, **kwargs)
+        getattr(cls, StateField.CLASS_OPTIONS.value).population.track(instance)
+        return instance
+
+    return __new__
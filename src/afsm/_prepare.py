@@ -0,0 +1,205 @@
+"""
+This module defines how state machine classes are prepared lazily, compiling their transitioning methods and indexing
+their transitions when first accessed rather than when the classes are defined.
+"""
+from __future__ import annotations
+
+from dataclasses import replace
+from threading import RLock
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+from afsm._options import DEFAULT_CLASS_OPTIONS, ClassOptions, state_bits
+from afsm._state import StateField
+from afsm._table import TransitionTable, event_handlers
+
+if TYPE_CHECKING:  # pragma: no cover
+    from afsm._fsm import Transition
+
+# Classes are prepared once, by the first thread accessing their transitioning methods, table or event handlers.
+_PREPARE_LOCK = RLock()
+
+_CLASS_OPTIONS_ATTR = StateField.CLASS_OPTIONS.value
+_EVENT_HANDLERS_ATTR = StateField.EVENT_HANDLERS.value
+
+
+class LazyTransitioningMethod:
+    """
+    A transitioning method that is compiled when first accessed, so that defining classes with many transitions does
+    not compile their transitioning methods until they are used. Accessing it through a state machine class, or an
+    instance of one, prepares the class, which replaces it with the compiled method for the class. Otherwise, it is
+    compiled with the default class options.
+    """
+
+    __slots__ = ("__transition__", "__wrapped__", "_name", "_owner", "_compiled")
+    __class_options__ = None
+
+    def __init__(self, transition_: Transition[Any], method: Callable[..., Any]) -> None:
+        self.__transition__ = transition_
+        self.__wrapped__ = method
+        self._name: str = method.__name__
+        self._owner: Optional[type] = None
+        self._compiled: Optional[Callable[..., Any]] = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._owner = owner
+        self._name = name
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        method = self._method(type(instance) if owner is None else owner)
+        return method if instance is None else method.__get__(instance, owner)
+
+    def __call__(self, instance: Any, *args: Any, **kwargs: Any) -> Any:
+        return self._method(self._owner)(instance, *args, **kwargs)
+
+    def _method(self, owner: Optional[type]) -> Callable[..., Any]:
+        if owner is not None:
+            declaring = next((class_ for class_ in owner.__mro__ if self._name in vars(class_)), None)
+
+            # A method overridden in the class it is accessed through, such as by `super()` from the override, is the
+            # method of the class declaring it. A method assigned to a class once created, under another name than the
+            # one of its function, is declared by no class, and is compiled with the default class options.
+            if declaring is None:
+                owner = None
+            elif vars(declaring)[self._name] is not self:
+                declaring = next((class_ for class_ in owner.__mro__ if vars(class_).get(self._name) is self), None)
+                owner = declaring if hasattr(declaring, _CLASS_OPTIONS_ATTR) else None
+
+        # Only subclasses of `StateMixin` have class options, the mixin itself and other classes do not.
+        if owner is not None and hasattr(owner, _CLASS_OPTIONS_ATTR):
+            prepare(owner)
+            return getattr(owner, self._name)  # type: ignore[no-any-return]
+
+        if self._compiled is None:
+            transition_ = self.__transition__
+            bits = state_bits((*transition_._from_states(), transition_.to_))  # pylint: disable=protected-access
+            self._compiled = transition_._compile(  # pylint: disable=protected-access
+                self.__wrapped__, replace(DEFAULT_CLASS_OPTIONS, bits=bits)
+            )
+
+        return self._compiled
+
+
+class LazyClassAttribute:
+    """
+    An attribute of a state machine class that is computed when first accessed, through the class or any of its
+    instances, then stored on the class in place of this descriptor.
+    """
+
+    __slots__ = ("_name", "_compute")
+
+    def __init__(self, name: str, compute: Callable[[type], Any]) -> None:
+        self._name = name
+        self._compute = compute
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        cls = type(instance) if owner is None else owner
+
+        # Compute the attribute once, even if several threads access it at the same time.
+        with _PREPARE_LOCK:
+            if vars(cls).get(self._name) is self:
+                setattr(cls, self._name, self._compute(cls))
+
+        return getattr(cls, self._name)
+
+
+def prepare(cls: type) -> None:
+    """
+    Compile the transitioning methods of a class, unless the class is already prepared.
+    """
+    getattr(cls, _EVENT_HANDLERS_ATTR)
+
+
+def defer_preparation(cls: type, methods: Dict[str, Any], options: ClassOptions) -> None:
+    """
+    Defer indexing the transitions of a class and compiling its transitioning methods until they are first accessed.
+    The transitions of classes that handle events are indexed immediately, to report conflicting handlers early.
+    """
+    # Inherited methods compiled for other options, by a prepared base class, are replaced with lazy ones, otherwise
+    # accessing them through the class would find the methods of the base class rather than prepare the class.
+    for name, transitioning_method in methods.items():
+        if not isinstance(transitioning_method, LazyTransitioningMethod) and (
+            transitioning_method.__class_options__ != options
+        ):
+            lazy_method = LazyTransitioningMethod(transitioning_method.__transition__, transitioning_method.__wrapped__)
+            lazy_method.__set_name__(cls, name)
+            setattr(cls, name, lazy_method)
+
+    setattr(cls, _EVENT_HANDLERS_ATTR, LAZY_EVENT_HANDLERS)
+    setattr(cls, StateField.TRANSITION_TABLE.value, LAZY_TRANSITION_TABLE)
+
+    if any(transitioning_method.__transition__.event for transitioning_method in methods.values()):
+        TransitionTable.of(cls)
+
+
+def is_prepared(cls: type) -> bool:
+    """
+    Return ``True`` if the transitioning methods of a class are compiled.
+    """
+    return isinstance(vars(cls).get(_EVENT_HANDLERS_ATTR), dict)
+
+
+def transitioning_methods(cls: type) -> Dict[str, Any]:
+    """
+    Return the transitioning methods declared on, or inherited by, a class, keyed by name, whether they are compiled
+    for the options of a class or not compiled yet.
+    """
+    members: Dict[str, Any] = {}
+
+    # The members of `object`, the last class of every MRO, are never transitioning methods.
+    for class_ in reversed(cls.__mro__[:-1]):
+        members.update(vars(class_))
+
+    return {
+        name: member
+        for name, member in members.items()
+        if isinstance(member, LazyTransitioningMethod)
+        or isinstance(getattr(member, "__class_options__", None), ClassOptions)
+    }
+
+
+def recompile(cls: type, methods: Dict[str, Any], options: ClassOptions) -> None:
+    """
+    Recompile the transitioning methods declared on, or inherited by, a class if their options differ from the options
+    of the class, then index the recompiled methods by the states and events they handle.
+    """
+    for name, transitioning_method in methods.items():
+        if transitioning_method.__class_options__ != options:
+            transition_: Transition[Any] = transitioning_method.__transition__
+            compiled_method = transition_._compile(  # pylint: disable=protected-access
+                transitioning_method.__wrapped__, options
+            )
+            setattr(cls, name, compiled_method)
+
+    table = TransitionTable.of(cls)
+    compiled = {name: getattr(cls, name) for name in methods}
+
+    handlers: Dict[Tuple[Any, str], Any]
+
+    if options.hierarchy is not None:
+        handlers = options.hierarchy.event_handlers(table, compiled)
+    else:
+        handlers = event_handlers(table, compiled, options.encode)
+
+    setattr(cls, _EVENT_HANDLERS_ATTR, handlers)
+
+
+def _transition_table(cls: type) -> TransitionTable:
+    """
+    Index the transitions of a class by state, so that the transitions allowed in a state are known without calling
+    them.
+    """
+    options: ClassOptions = getattr(cls, _CLASS_OPTIONS_ATTR)
+    transitions = {name: method.__transition__ for name, method in transitioning_methods(cls).items()}
+    return TransitionTable(transitions, getattr(cls, StateField.INITIAL_STATE.value), options.thread_safe)
+
+
+def _event_handlers(cls: type) -> Any:
+    """
+    Compile the transitioning methods of a class, and return them indexed by the states and events they handle.
+    """
+    recompile(cls, transitioning_methods(cls), getattr(cls, _CLASS_OPTIONS_ATTR))
+    return vars(cls)[_EVENT_HANDLERS_ATTR]
+
+
+LAZY_TRANSITION_TABLE = LazyClassAttribute(StateField.TRANSITION_TABLE.value, _transition_table)
+LAZY_EVENT_HANDLERS = LazyClassAttribute(_EVENT_HANDLERS_ATTR, _event_handlers)
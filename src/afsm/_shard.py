@@ -0,0 +1,293 @@
+"""
+This module defines an executor that shards state machines across worker processes, storing their states in shared
+memory.
+"""
+from __future__ import annotations
+
+import os
+from array import array
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from types import TracebackType
+from typing import Any, Callable, Dict, Generic, Iterable, List, Literal, NamedTuple, Optional, Tuple, Type, TypeVar
+
+from afsm._fsm import StateMixin, _constructor, _set_results, _set_state
+from afsm._options import ClassOptions, machine_states
+from afsm._snapshot import _CODE_TYPES
+from afsm._state import State, StateField, state_index
+
+_Machine = TypeVar("_Machine", bound=StateMixin)
+
+# A transition run by an executor: the key of a machine, the name of a transitioning method and its arguments.
+_Transition = Tuple[int, str, Tuple[Any, ...]]
+
+
+class _Shard(NamedTuple):
+    """
+    What a worker needs to create the machines it owns and to attach to the shared memory storing their states.
+    """
+
+    machine_class: type
+    factory: Optional[Callable[[int], Any]]
+    name: str
+    size: int
+    type_code: Literal["B", "H", "I"]
+
+
+class ShardedExecutor(Generic[_Machine]):
+    """
+    An executor that partitions state machines of the same :class:`StateMixin` subclass across worker processes, so
+    that transitions run on all the cores of a host. Machines are identified by an integer key, and each machine is
+    owned by the worker of its key modulo the number of processes, which creates it when it first transitions and keeps
+    it for the lifetime of the executor.
+
+    The states of all the machines are stored as integer codes, which are the indices of the states within their
+    :class:`State` class, in an array in :mod:`multiprocessing.shared_memory`. Only the worker owning a machine writes
+    its code, after each transition, while any process reads the states of all the machines without communicating with
+    the workers, either through the executor, or by attaching to the shared memory block named :attr:`name` and casting
+    it to the format of :attr:`codes`.
+
+    Transitions are sent to the workers in a single batch per worker, and run with the ``try_()`` function of their
+    transitioning method, so transitions rejected in the current state of a machine return
+    :attr:`Rejection.REJECTED` rather than raising. Machines are created by the workers without calling their
+    ``__init__()`` method, unless a factory is given. The machine class, the factory, the arguments and the results of
+    the transitions must be picklable, and asynchronous transitions are not supported.
+
+    Example:
+        >>> from enum import auto
+        >>> from afsm import ShardedExecutor, State, StateMixin, transition
+        ...
+        >>> class MachineState(State):
+        ...     INITIAL = auto()
+        ...     FINAL = auto()
+        ...
+        >>> class AFiniteStateMachine(StateMixin, initial_state=MachineState.INITIAL):
+        ...     @transition(from_=MachineState.INITIAL, to_=MachineState.FINAL)
+        ...     def to_final_state(self, value):
+        ...         return value * 2
+        ...
+        >>> with ShardedExecutor(AFiniteStateMachine, 4, processes=2) as executor:  # doctest: +SKIP
+        ...     executor.run([(0, "to_final_state", (1,)), (1, "to_final_state", (2,)), (0, "to_final_state", (3,))])
+        ...     executor.count(MachineState.FINAL)
+        ...
+        [2, 4, <Rejection.REJECTED: 'rejected'>]
+        2
+
+    Arguments:
+        machine_class: the class of the machines. The class must have an initial state, and all its states must be
+                       members of the same :class:`State` class.
+        size: the number of machines, keyed from ``0`` to ``size - 1``, all in the initial state.
+        processes: the number of worker processes, :func:`os.cpu_count` by default.
+        factory: a function creating the machine with a given key in a worker, whose state is then replaced by the state
+                 stored in shared memory.
+        context: the :mod:`multiprocessing` start method of the workers, the default start method of the platform by
+                 default.
+
+    Attributes:
+        machine_class: the class of the machines.
+        states: the states of the machines, indexed by integer code.
+        codes: the integer codes of the states of the machines, a :class:`memoryview` of the shared memory.
+        name: the name of the shared memory block.
+        processes: the number of worker processes.
+
+    Raises:
+        :exc:`ValueError`: if the machine class has no initial state, or uses states of different classes.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments # The options of the workers, all but the class are optional
+        self,
+        machine_class: Type[_Machine],
+        size: int,
+        processes: Optional[int] = None,
+        factory: Optional[Callable[[int], _Machine]] = None,
+        context: Optional[str] = None,
+    ) -> None:
+        self.machine_class = machine_class
+        self.states = machine_states(machine_class)
+        self.processes = processes or os.cpu_count() or 1
+        initial_state: State = getattr(machine_class, StateField.INITIAL_STATE.value)
+        type_code = next(code for width, code in _CODE_TYPES.items() if len(self.states) < 1 << (8 * width))
+        initial_codes = array(type_code, [state_index(initial_state)]) * size
+        length = len(initial_codes) * initial_codes.itemsize
+
+        # Shared memory blocks cannot be empty.
+        self._memory = SharedMemory(create=True, size=max(length, 1))
+        self.codes = self._memory.buf[:length].cast(type_code)
+        self.codes[:] = memoryview(initial_codes)
+
+        multiprocessing: Any = get_context(context)
+        self._connections: List[Any] = []
+        self._workers: List[Any] = []
+
+        for _ in range(self.processes):
+            connection, worker_connection = multiprocessing.Pipe()
+            self._workers.append(
+                multiprocessing.Process(
+                    target=_work,
+                    args=(_Shard(machine_class, factory, self.name, size, type_code), worker_connection),
+                    daemon=True,
+                )
+            )
+            self._workers[-1].start()
+            worker_connection.close()
+            self._connections.append(connection)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def name(self) -> str:
+        """
+        The name of the shared memory block.
+        """
+        return self._memory.name
+
+    def __enter__(self) -> ShardedExecutor[_Machine]:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def run(self, transitions: Iterable[_Transition]) -> List[Any]:
+        """
+        Run transitions on the machines, in parallel across workers. The transitions of each machine run in the order
+        they are given.
+
+        Arguments:
+            transitions: the transitions, as tuples of the key of a machine, the name of a transitioning method, and
+                         the arguments of the method.
+
+        Returns:
+            The results of the transitions, in the order they are given, :attr:`Rejection.REJECTED` for those rejected
+            in the current state of their machine.
+
+        Raises:
+            :exc:`IndexError`: if a key is out of range, in which case no transition runs.
+            :exc:`Exception`: the first exception raised by a transitioning method, after all the other transitions
+                              have run.
+        """
+        batches: List[List[_Transition]] = [[] for _ in range(self.processes)]
+        positions: List[List[int]] = [[] for _ in range(self.processes)]
+
+        for position, transition_ in enumerate(transitions):
+            key = transition_[0]
+
+            if not 0 <= key < len(self.codes):
+                raise IndexError(f"Machine key {key} is out of range")
+
+            batches[key % self.processes].append(transition_)
+            positions[key % self.processes].append(position)
+
+        for connection, batch in zip(self._connections, batches):
+            if batch:
+                connection.send(batch)
+
+        results: List[Any] = [None] * sum(map(len, positions))
+        failures: List[Tuple[int, BaseException]] = []
+
+        for connection, batch_positions in zip(self._connections, positions):
+            if batch_positions:
+                batch_results, batch_failures = connection.recv()
+
+                for position, result in zip(batch_positions, batch_results):
+                    results[position] = result
+
+                failures.extend((batch_positions[index], exception) for index, exception in batch_failures)
+
+        if failures:
+            raise min(failures, key=lambda failure: failure[0])[1]
+
+        return results
+
+    def state(self, key: int) -> State:
+        """
+        Return the state of the machine with a key, read from shared memory.
+        """
+        return self.states[self.codes[key]]
+
+    def count(self, state: State) -> int:
+        """
+        Return the number of machines in a state, read from shared memory.
+        """
+        return self.codes.tolist().count(state_index(state))
+
+    def close(self) -> None:
+        """
+        Stop the workers, discarding their machines, and release the shared memory.
+        """
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except OSError:  # The worker has already exited
+                pass
+
+        for worker, connection in zip(self._workers, self._connections):
+            worker.join()
+            connection.close()
+
+        self.codes.release()
+        self._memory.close()
+        self._memory.unlink()
+
+
+def _work(shard: _Shard, connection: Any) -> None:  # pylint: disable=too-many-locals # Names are resolved once
+    """
+    Run the batches of transitions received from an executor on the machines owned by a worker, storing the codes of
+    their states in shared memory after each transition, until the executor closes.
+    """
+    machine_class, factory = shard.machine_class, shard.factory
+    memory = SharedMemory(shard.name)
+    codes = memory.buf[: shard.size * array(shard.type_code).itemsize].cast(shard.type_code)
+    states = machine_states(machine_class)
+    options: ClassOptions = getattr(machine_class, StateField.CLASS_OPTIONS.value)
+    compact = options.compact
+    state_attr = StateField.STATE.value
+    new = _constructor(machine_class)
+    machines: Dict[int, Any] = {}
+    methods: Dict[str, Callable[..., Any]] = {}
+    receive: Callable[[], Optional[List[Tuple[int, str, Tuple[Any, ...]]]]] = connection.recv
+
+    try:
+        for batch in iter(receive, None):
+            results: List[Any] = []
+            failures: List[Tuple[int, BaseException]] = []
+
+            for index, (key, method_name, args) in enumerate(batch):
+                machine = machines.get(key)
+
+                if machine is None:
+                    machine = machines[key] = new() if factory is None else factory(key)
+                    stored = codes[key] if compact else states[codes[key]]
+
+                    # Machines created without a factory bypass `StateMixin.__new__()`, which initializes their results.
+                    if factory is None:
+                        _set_results(machine, None)
+                    else:
+                        options.leave(machine, stored)
+
+                    _set_state(machine, stored)
+
+                method = methods.get(method_name)
+
+                if method is None:
+                    method = methods[method_name] = getattr(machine_class, method_name).try_
+
+                try:
+                    results.append(method(machine, *args))
+                except Exception as exception:  # pylint: disable=broad-except
+                    results.append(None)
+                    failures.append((index, exception))
+
+                value = getattr(machine, state_attr)
+                codes[key] = value if compact else state_index(value)
+
+            connection.send((results, failures))
+    finally:
+        codes.release()
+        memory.close()
+        connection.close()
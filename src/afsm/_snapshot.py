@@ -0,0 +1,335 @@
+"""
+This module defines snapshots of the states of many state machines, written to and memory-mapped from binary files.
+"""
+from __future__ import annotations
+
+from array import array
+from hashlib import blake2b
+from itertools import repeat
+from mmap import ACCESS_READ, mmap
+from operator import attrgetter
+from pickle import HIGHEST_PROTOCOL, dumps, loads  # nosec B403
+from struct import Struct
+from sys import byteorder
+from types import TracebackType
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Literal, Optional, Sequence, Type, TypeVar
+
+from afsm._cache import ResultRef
+from afsm._fsm import StateMixin, _constructor, _set_results, _set_state
+from afsm._options import ClassOptions, machine_states
+from afsm._prepare import transitioning_methods
+from afsm._state import State, StateField, TransientState
+
+_Machine = TypeVar("_Machine", bound=StateMixin)
+
+# The header of a snapshot: magic bytes, format version, width of the integer codes in bytes, whether the integers are
+# little-endian, the number of states of the machine class, the number of machines, the offset of the results, zero if
+# the snapshot has no results, and a digest of the names of the states in the order of their codes.
+_HEADER = Struct("<4sBB?xIQQ8s")
+_MAGIC = b"AFSM"
+_VERSION = 1
+
+# The type codes of the `array` of integer codes, by width in bytes, and of the offsets of the serialized results.
+_CODE_TYPES: Dict[int, Literal["B", "H", "I"]] = {1: "B", 2: "H", 4: "I"}
+_OFFSET_TYPE: Literal["Q"] = "Q"
+
+
+class Snapshot(Generic[_Machine]):
+    """
+    A snapshot of the states of many state machines of the same :class:`StateMixin` subclass, in a binary file that is
+    memory-mapped when read. States are stored as fixed-width integer codes, which are the indices of the states within
+    their :class:`State` class, so writing and reading a snapshot costs little more than copying its bytes. Optionally,
+    a snapshot also stores the results retained or memoized by the idempotent transitions of each machine, serialized
+    with :mod:`pickle`.
+
+    Machines are restored without calling their ``__init__()`` method, either one at a time by index, or all at once.
+    Restoring a machine reads only its own code and results from the file.
+
+    Warning:
+        Restoring the results of a snapshot unpickles them, so only restore snapshots written by a trusted source.
+
+    Example:
+        >>> from enum import auto
+        >>> from tempfile import TemporaryDirectory
+        >>> from afsm import Snapshot, State, StateMixin, transition
+        ...
+        >>> class MachineState(State):
+        ...     INITIAL = auto()
+        ...     FINAL = auto()
+        ...
+        >>> class AFiniteStateMachine(StateMixin, initial_state=MachineState.INITIAL):
+        ...     @transition(from_=MachineState.INITIAL, to_=MachineState.FINAL, is_idempotent=True)
+        ...     def to_final_state(self):
+        ...         return "done"
+        ...
+        >>> machines = [AFiniteStateMachine() for _ in range(3)]
+        >>> machines[1].to_final_state()
+        'done'
+        >>> with TemporaryDirectory() as directory:
+        ...     Snapshot.write(f"{directory}/machines.afsm", AFiniteStateMachine, machines, results=True)
+        ...     with Snapshot(f"{directory}/machines.afsm", AFiniteStateMachine) as snapshot:
+        ...         restored = snapshot.restore()
+        ...
+        >>> [str(machine.current_state) for machine in restored]
+        ['INITIAL', 'FINAL', 'INITIAL']
+        >>> restored[1].to_final_state()
+        'done'
+
+    Arguments:
+        path: the path of the snapshot file.
+        machine_class: the class of the machines in the snapshot. The class must have an initial state, and all its
+                       states must be members of the same :class:`State` class.
+
+    Attributes:
+        machine_class: the class of the machines in the snapshot.
+        states: the states of the machines, indexed by integer code.
+        codes: the integer codes of the states of the machines, a :class:`memoryview` of the memory-mapped file.
+
+    Raises:
+        :exc:`ValueError`: if the file is not a snapshot written on a platform with the same byte order, or its states
+                           do not match those of the machine class.
+    """
+
+    def __init__(self, path: str, machine_class: Type[_Machine]) -> None:
+        self.machine_class = machine_class
+        self.states = machine_states(machine_class)
+        self._compact: bool = getattr(machine_class, StateField.CLASS_OPTIONS.value).compact
+        self._methods = {name: method.__wrapped__ for name, method in transitioning_methods(machine_class).items()}
+
+        with open(path, "rb") as snapshot_file:
+            self._mmap = mmap(snapshot_file.fileno(), 0, access=ACCESS_READ)
+
+        try:
+            magic, version, width, little_endian, state_count, count, results_offset, digest = _HEADER.unpack_from(
+                self._mmap
+            )
+
+            if magic != _MAGIC or version != _VERSION or width not in _CODE_TYPES:
+                raise ValueError(f"'{path}' is not a snapshot of state machines")
+
+            if little_endian != (byteorder == "little"):
+                raise ValueError(f"'{path}' was written on a platform with a different byte order")
+
+            if state_count != len(self.states):
+                raise ValueError(
+                    f"'{path}' has {state_count} states, '{machine_class.__name__}' has {len(self.states)}"
+                )
+
+            if digest != _digest(self.states):
+                raise ValueError(f"'{path}' has states other than those of '{machine_class.__name__}'")
+
+            view = memoryview(self._mmap)
+            self.codes = view[_HEADER.size : _HEADER.size + count * width].cast(_CODE_TYPES[width])
+            self._offsets: Optional[memoryview] = None
+
+            if results_offset:
+                offsets_end = results_offset + (count + 1) * array(_OFFSET_TYPE).itemsize
+                self._offsets = view[results_offset:offsets_end].cast(_OFFSET_TYPE)
+
+            view.release()
+        except BaseException:
+            self._mmap.close()
+            raise
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> _Machine:
+        if index < 0:
+            index += len(self.codes)
+
+        return self._restore(self.codes[index], self._results(index))
+
+    def __iter__(self) -> Iterator[_Machine]:
+        for index in range(len(self.codes)):
+            yield self[index]
+
+    def __enter__(self) -> Snapshot[_Machine]:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    @classmethod
+    def write(
+        cls, path: str, machine_class: Type[_Machine], machines: Sequence[_Machine], results: bool = False
+    ) -> None:
+        """
+        Write a snapshot of the states of the given machines, and optionally of their results, to a file.
+
+        Results retained with :attr:`Retention.WEAK` are not written, and neither are results memoized in a cache
+        shared by all instances of the class.
+
+        Arguments:
+            path: the path of the snapshot file, which is overwritten if it exists.
+            machine_class: the class of the machines.
+            machines: the machines, in the order they are restored.
+            results: if ``True``, the results of the idempotent transitions of each machine are also written.
+
+        Raises:
+            :exc:`ValueError`: if a machine is in :attr:`TransientState.IN_TRANSITION`.
+        """
+        states = machine_states(machine_class)
+        codes = _codes(machine_class, machines, len(states))
+        results_offset = 0
+        blobs: List[bytes] = []
+
+        # The serialized results are preceded by their offsets, aligned to their width.
+        if results:
+            results_offset = -(-(_HEADER.size + len(codes) * codes.itemsize) // 8) * 8
+            names = {method.__wrapped__: name for name, method in transitioning_methods(machine_class).items()}
+            blobs = [_serialize(machine, names) for machine in machines]
+
+        with open(path, "wb") as snapshot_file:
+            snapshot_file.write(
+                _HEADER.pack(
+                    _MAGIC,
+                    _VERSION,
+                    codes.itemsize,
+                    byteorder == "little",
+                    len(states),
+                    len(codes),
+                    results_offset,
+                    _digest(states),
+                )
+            )
+            codes.tofile(snapshot_file)
+
+            if results:
+                offsets = array(_OFFSET_TYPE, [0] * (len(blobs) + 1))
+                position = results_offset + offsets.itemsize * len(offsets)
+
+                for index, blob in enumerate(blobs):
+                    offsets[index] = position
+                    position += len(blob)
+
+                offsets[len(blobs)] = position
+                snapshot_file.write(bytes(results_offset - snapshot_file.tell()))
+                offsets.tofile(snapshot_file)
+                snapshot_file.writelines(blobs)
+
+    def state(self, index: int) -> State:
+        """
+        Return the state of the machine at an index in the snapshot, without restoring the machine.
+        """
+        return self.states[self.codes[index]]
+
+    def restore(self) -> List[_Machine]:
+        """
+        Restore all the machines in the snapshot, in the order they were written, without calling ``__init__()``.
+        """
+        cls = self.machine_class
+        codes = self.codes.tolist()
+        values: Iterable[Any] = codes if self._compact else map(self.states.__getitem__, codes)
+        results: Iterable[Optional[Dict[Any, Any]]] = (
+            repeat(None, len(codes)) if self._offsets is None else map(self._results, range(len(codes)))
+        )
+
+        # Create the machines in a single loop with the constructor and the descriptors resolved once, as bulk restores
+        # of millions of machines are bounded by the cost of each iteration.
+        new = _constructor(cls)
+        set_state = _set_state
+        set_results = _set_results
+        machines: List[_Machine] = []
+        append = machines.append
+
+        for value, result in zip(values, results):
+            instance = new()
+            set_state(instance, value)
+            set_results(instance, result)
+            append(instance)
+
+        return machines
+
+    def close(self) -> None:
+        """
+        Release the memory-mapped file. Restored machines remain valid.
+        """
+        self.codes.release()
+
+        if self._offsets is not None:
+            self._offsets.release()
+
+        self._mmap.close()
+
+    def _restore(self, code: int, results: Optional[Dict[Any, Any]]) -> _Machine:
+        # Bypass `StateMixin.__new__()`, which would set the initial state only for it to be replaced.
+        instance: _Machine = _constructor(self.machine_class)()
+        value: Any = code if self._compact else self.states[code]
+        _set_state(instance, value)
+        _set_results(instance, results)
+        return instance
+
+    def _results(self, index: int) -> Optional[Dict[Any, Any]]:
+        offsets = self._offsets
+
+        if offsets is None or offsets[index] == offsets[index + 1]:
+            return None
+
+        serialized: Dict[str, Any] = loads(self._mmap[offsets[index] : offsets[index + 1]])  # nosec B301
+        methods = self._methods
+
+        if not serialized.keys() <= methods.keys():
+            unknown = ", ".join(sorted(serialized.keys() - methods.keys()))
+            raise ValueError(f"'{self.machine_class.__name__}' has no transitioning methods {unknown}")
+
+        return {methods[name]: result for name, result in serialized.items()}
+
+
+def _codes(machine_class: type, machines: Sequence[StateMixin], state_count: int) -> array[int]:
+    """
+    Return the integer codes of the states of the given machines, in the smallest unsigned integers that fit the codes
+    of all the states of their class.
+
+    Raises:
+        :exc:`ValueError`: if a machine is in :attr:`TransientState.IN_TRANSITION`.
+    """
+    options: ClassOptions = getattr(machine_class, StateField.CLASS_OPTIONS.value)
+    state_attr = StateField.STATE.value
+    type_code = next(code for width, code in _CODE_TYPES.items() if state_count < 1 << (8 * width))
+
+    # The codes of compact machines are their stored states, while other machines store the states themselves.
+    if options.compact:
+        codes = array(type_code, map(attrgetter(state_attr), machines))
+        claimed = options.thread_safe and state_count in codes
+    else:
+        codes = array(type_code, map(attrgetter(f"{state_attr}._index"), machines))
+        claimed = options.thread_safe and any(
+            machine.current_state is TransientState.IN_TRANSITION for machine in machines
+        )
+
+    if claimed:
+        raise ValueError("Machines in transition cannot be written to a snapshot")
+
+    return codes
+
+
+def _digest(states: Iterable[State]) -> bytes:
+    """
+    Return a digest of the names of the given states, in order, so that snapshots are only restored as machines whose
+    states have the same codes, rather than merely as many states.
+    """
+    return blake2b("\n".join(state.name for state in states).encode(), digest_size=8).digest()
+
+
+def _serialize(machine: StateMixin, names: Dict[Callable[..., Any], str]) -> bytes:
+    """
+    Serialize the results of a machine keyed by the names of their transitioning methods, or return empty bytes if it
+    has none. Weakly retained results are skipped, and so are the locks held among the results.
+    """
+    results: Optional[Dict[Any, Any]] = getattr(machine, StateField.RETURN_VALUES.value)
+
+    if not results:
+        return b""
+
+    serialized: Dict[str, Any] = {
+        names[method]: result
+        for method, result in results.items()
+        if method in names and type(result) is not ResultRef  # pylint: disable=unidiomatic-typecheck
+    }
+    return dumps(serialized, HIGHEST_PROTOCOL) if serialized else b""
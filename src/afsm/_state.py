@@ -1,13 +1,67 @@
 """
 This module defines the state elements for a finite state machine.
 """
+from __future__ import annotations
 
-from enum import Enum, unique
-from typing import Iterable
+from enum import Enum, EnumMeta, auto, unique
+from typing import (
+    TYPE_CHECKING,
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Protocol,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from afsm._cache import CacheInfo
+    from afsm._fsm import Transition
+    from afsm._options import ClassOptions
+
+_Result = TypeVar("_Result")
+
+
+class _StateType(EnumMeta):
+    """
+    The metaclass for :class:`State`. When a state class is created, each of its members is assigned its index within
+    the class, which is used as a compact integer code for the state.
+
+    A state class created with a ``parent`` state is a region of that composite state, and its members are the
+    sub-states of the parent.
+    """
+
+    @classmethod
+    def __prepare__(mcs, cls: str, bases: Tuple[type, ...], **kwargs: Any) -> Dict[str, Any]:  # type: ignore[override]
+        kwargs.pop("parent", None)
+        return super().__prepare__(cls, bases, **kwargs)
+
+    def __new__(mcs, *args: Any, parent: Optional["State"] = None, **kwargs: Any) -> Any:
+        if parent is not None and not isinstance(parent, State):
+            raise TypeError(f"The parent of a region must be a state, not {parent!r}")
+
+        cls = super().__new__(mcs, *args, **kwargs)
+
+        member: Any
+
+        for index, member in enumerate(cls):
+            member._index = index
+            member._parent = parent
+            member._regions = ()
+
+        if parent is not None and len(cls):
+            setattr(parent, "_regions", (*state_regions(parent), cls))
+
+        return cls
 
 
 @unique
-class State(Enum):
+class State(Enum, metaclass=_StateType):
     """
     A base :class:`~Enum` used to define states for a state machine. This class enforces enumeration members uniqueness.
 
@@ -26,6 +80,24 @@ class State(Enum):
         >>> class MachineState(State):
         ...     INITIAL = auto()    # INITIAL.value is set to "INITIAL"
         ...     FINAL = auto()      # FINAL.value is set to "FINAL"
+
+    A state class defined with a ``parent`` state is a region of that composite state. A composite state can have
+    several regions, which are orthogonal: while the composite state is active, exactly one state of each of its regions
+    is active too. Entering a composite state enters the first state of each of its regions, unless a transition enters
+    a sub-state directly.
+
+        >>> class OrderState(State):
+        ...     NEW = auto()
+        ...     FULFILLING = auto()
+        ...     DONE = auto()
+        ...
+        >>> class PaymentState(State, parent=OrderState.FULFILLING):
+        ...     PAYMENT_PENDING = auto()
+        ...     PAID = auto()
+        ...
+        >>> class ShippingState(State, parent=OrderState.FULFILLING):
+        ...     PACKING = auto()
+        ...     SHIPPED = auto()
     """
 
     @staticmethod
@@ -36,19 +108,158 @@ class State(Enum):
         return str(self.name)
 
 
+# Members are singletons compared by identity, so hash them by identity, which is faster than hashing their names. The
+# hash is set once the class is created, as linters take attributes assigned in the body of an enumeration for members.
+setattr(State, "__hash__", object.__hash__)
+
+
+# The attributes the metaclass assigns to each state are read through these functions, as linters take attributes
+# declared in the body of an enumeration for members.
+def state_index(state: State) -> int:
+    """
+    Return the index of a state within its :class:`State` class, which is its compact integer code.
+    """
+    index: int = getattr(state, "_index")
+    return index
+
+
+def state_parent(state: State) -> Optional[State]:
+    """
+    Return the composite state a state is a sub-state of, or ``None`` if its class is not a region.
+    """
+    parent: Optional[State] = getattr(state, "_parent")
+    return parent
+
+
+def state_regions(state: State) -> Tuple[Type[State], ...]:
+    """
+    Return the regions of a composite state, in the order they were defined, which are empty for a simple state.
+    """
+    regions: Tuple[Type[State], ...] = getattr(state, "_regions")
+    return regions
+
+
+class TransientState(State):
+    """
+    The states an instance is in only while one of its transitions is running, in classes defined with ``thread_safe``.
+    These states are never expected by a transition.
+
+    Attributes:
+        IN_TRANSITION: the instance is claimed by a thread running a transition, and will reach the new state of the
+                       transition, or return to its previous state, when the decorated method returns.
+    """
+
+    IN_TRANSITION = auto()
+
+
 class StateError(Exception):
     """
     An exception raised when in invalid state transition occurs.
+
+    The exception only stores its arguments when raised, and formats its message when converted to a string, so that
+    rejecting a transition costs little more than raising the exception. Transitions can also be attempted without
+    raising, see :class:`Rejection`. The exception can also be created with a message only, like any other exception,
+    in which case it has no class, expected states or actual state.
+
+    Arguments:
+        class_: the class of the instance.
+        expected_states: the states the transition expected.
+        actual_state: the state of the instance.
     """
 
-    def __init__(self, class_: type, expected_states: Iterable[State], actual_state: State) -> None:
-        message = (
-            f"Actual state for '{class_.__name__}' does not match expected state(s)"
-            f"\nExpected states: {'or '.join(map(str, expected_states))}"
-            f"\nActual state: {str(actual_state)}"
+    @property
+    def class_(self) -> Optional[type]:
+        """
+        The class of the instance, or ``None`` if the exception was created with a message only.
+        """
+        return self.args[0] if len(self.args) > 2 else None
+
+    @property
+    def expected_states(self) -> Tuple[State, ...]:
+        """
+        The states the transition expected, which are empty if the exception was created with a message only.
+        """
+        expected_states: Tuple[State, ...] = self.args[1] if len(self.args) > 2 else ()
+        return expected_states
+
+    @property
+    def actual_state(self) -> Union[State, AbstractSet[State], None]:
+        """
+        The state of the instance, which is the set of its active states for hierarchical state machines, or ``None`` if
+        the exception was created with a message only.
+        """
+        return self.args[2] if len(self.args) > 2 else None
+
+    def __str__(self) -> str:
+        if self.class_ is None:
+            return super().__str__()
+
+        return (
+            f"Actual state for '{self.class_.__name__}' does not match expected state(s)"
+            f"\nExpected states: {' or '.join(map(str, self.expected_states))}"
+            f"\nActual state: {self.actual_state}"
         )
 
-        super().__init__(message)
+
+class GuardError(StateError):
+    """
+    A :exc:`StateError` raised when a transition is called in an expected state, but one of its guards does not hold.
+
+    Arguments:
+        class_: the class of the instance.
+        expected_states: the states the transition expected.
+        actual_state: the state of the instance.
+        guard: the guard that does not hold.
+    """
+
+    @property
+    def guard(self) -> Optional[Callable[[Any], Any]]:
+        """
+        The guard that does not hold, or ``None`` if the exception was created with a message only.
+        """
+        return self.args[3] if len(self.args) > 3 else None
+
+    def __str__(self) -> str:
+        if self.class_ is None:
+            return Exception.__str__(self)
+
+        return (
+            f"Guard '{getattr(self.guard, '__qualname__', self.guard)}' of a transition for '{self.class_.__name__}'"
+            f" does not hold\nActual state: {self.actual_state}"
+        )
+
+
+@unique
+class Rejection(Enum):
+    """
+    An :class:`~Enum` whose single member is returned, instead of raising a :exc:`StateError`, by the ``try_()``
+    function of a transitioning method called in an unexpected state. ``try_()`` takes the instance as its first
+    argument, followed by the arguments of the method.
+
+    Example:
+        >>> from enum import auto
+        >>> from afsm import Rejection, State, StateMixin, transition
+        ...
+        >>> class MachineState(State):
+        ...     INITIAL = auto()
+        ...     FINAL = auto()
+        ...
+        >>> class AFiniteStateMachine(StateMixin, initial_state=MachineState.INITIAL):
+        ...     @transition(from_=MachineState.INITIAL, to_=MachineState.FINAL)
+        ...     def to_final_state(self):
+        ...         return "final"
+        ...
+        >>> afsm = AFiniteStateMachine()
+        >>> AFiniteStateMachine.to_final_state.try_(afsm)
+        'final'
+        >>> AFiniteStateMachine.to_final_state.try_(afsm) is Rejection.REJECTED
+        True
+
+    Attributes:
+        REJECTED: the transition was rejected, the method was not called and the state did not change.
+    """
+
+    REJECTED = "rejected"
 
 
 @unique
@@ -61,3 +272,33 @@ class StateField(Enum):
     STATE = "_state"
     INITIAL_STATE = "_initial_state"
     RETURN_VALUES = "_return_values"
+    INITIAL_VALUE = "_initial_value"
+    CLASS_OPTIONS = "_class_options"
+    TRANSITION_TABLE = "_transition_table"
+    EVENT_HANDLERS = "_event_handlers"
+
+
+class TransitioningMethod(Protocol[_Result]):
+    """
+    The type of the methods decorated with :class:`~afsm.transition`, which return the result of the decorated method,
+    and of the functions and attributes they are given once compiled:
+
+    - ``try_()`` takes the instance and the arguments of the method, and returns :attr:`Rejection.REJECTED` instead of
+      raising a :exc:`StateError`.
+    - ``cache_info()`` and ``cache_clear()``, which only idempotent methods memoizing their results have, return the
+      statistics of, and clear, the results memoized by the given instance, or by all instances if they share them.
+    - ``guard_clear()``, which only methods memoizing the results of their guards have, clears those memoized by the
+      given instance.
+    """
+
+    __name__: str
+    __qualname__: str
+    __transition__: Transition[Any]
+    __class_options__: ClassOptions
+    try_: Callable[..., Union[_Result, Rejection]]
+    cache_info: Callable[..., CacheInfo]
+    cache_clear: Callable[..., None]
+    guard_clear: Callable[[Any], None]
+
+    def __call__(self, *args: Any, **kwargs: Any) -> _Result:
+        ...  # pragma: no cover
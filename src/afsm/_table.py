@@ -0,0 +1,283 @@
+"""
+This module defines the table of the transitions of a state machine class, which is computed when the class is created.
+"""
+from __future__ import annotations
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from afsm._hierarchy import Configuration
+from afsm._state import Rejection, State, StateField, TransientState
+
+if TYPE_CHECKING:  # pragma: no cover
+    from afsm._fsm import StateMixin, Transition
+
+# Attribute names read when dispatching events, resolved once rather than on each dispatch.
+_STATE_ATTR = StateField.STATE.value
+_EVENT_HANDLERS_ATTR = StateField.EVENT_HANDLERS.value
+
+
+class TransitionTable:
+    """
+    The transitions declared on, or inherited by, a :class:`StateMixin` subclass, indexed by state. The table of each
+    class is computed when the class is created, so querying which transitions an instance allows in its current state
+    takes constant time, and so does checking whether a transition is allowed.
+
+    A transition is allowed in a state if calling it in that state does not raise a :exc:`StateError`: the state is
+    one of its expected states, it expects no state, or it is idempotent and the state is its new state. An instance of
+    a hierarchical state machine allows the transitions allowed in any of its active states.
+
+    Example:
+        >>> from enum import auto
+        >>> from afsm import State, StateMixin, TransitionTable, transition
+        ...
+        >>> class MachineState(State):
+        ...     INITIAL = auto()
+        ...     OPEN = auto()
+        ...     CLOSED = auto()
+        ...
+        >>> class AFiniteStateMachine(StateMixin, initial_state=MachineState.INITIAL):
+        ...     @transition(from_=MachineState.INITIAL, to_=MachineState.OPEN)
+        ...     def open(self):
+        ...         pass
+        ...
+        ...     @transition(from_=MachineState.OPEN, to_=MachineState.CLOSED)
+        ...     def close(self):
+        ...         pass
+        ...
+        >>> table = TransitionTable.of(AFiniteStateMachine)
+        >>> table.available(AFiniteStateMachine().current_state)
+        ('open',)
+        >>> table.allows(MachineState.OPEN, "open")
+        False
+        >>> sorted(map(str, table.reachable(MachineState.OPEN)))
+        ['CLOSED', 'OPEN']
+
+    Arguments:
+        transitions: the transitions of the class, keyed by the name of their transitioning method.
+        initial_state: the initial state of the class.
+        thread_safe: if ``True``, the class claims instances during transitions, in which case the transitions that
+                     change state are not allowed in :attr:`TransientState.IN_TRANSITION`.
+
+    Attributes:
+        transitions: the transitions of the class, keyed by the name of their transitioning method.
+        states: the states of the class, which are its initial state and the states its transitions expect or reach.
+
+    Raises:
+        :exc:`ValueError`: if several transitioning methods handle the same event in the same state.
+    """
+
+    __slots__ = ("transitions", "states", "_available", "_allowed", "_unchecked", "_reachable", "_events")
+
+    def __init__(
+        self, transitions: Mapping[str, Transition[Any]], initial_state: Optional[State], thread_safe: bool = False
+    ) -> None:
+        self.transitions = transitions
+        available: Dict[Optional[State], List[str]] = {}
+        unchecked: List[str] = []
+        edges: Dict[Optional[State], Set[State]] = {}
+        targets: Set[State] = set()
+        state: Optional[State]
+
+        for name, transition_ in transitions.items():
+            from_states = transition_._from_states()
+            to_state = transition_.to_
+            allowing = from_states
+
+            if not from_states:
+                unchecked.append(name)
+            elif transition_.is_idempotent and to_state is not None and to_state not in from_states:
+                allowing = (*from_states, to_state)
+
+            for state in allowing:
+                available.setdefault(state, []).append(name)
+
+            if to_state is not None:
+                targets.add(to_state)
+
+                for state in from_states or (None,):
+                    edges.setdefault(state, set()).add(to_state)
+
+        self.states = frozenset(state for state in (*available, *targets, initial_state) if state is not None)
+
+        # Transitions that expect no state are allowed in every state, and are listed in declaration order.
+        order = {name: index for index, name in enumerate(transitions)}
+        self._available: Dict[Optional[State], Tuple[str, ...]] = {
+            state: tuple(sorted((*available.get(state, ()), *unchecked), key=order.__getitem__))
+            for state in (*self.states, None)
+        }
+        self._unchecked = tuple(unchecked)
+
+        if thread_safe:
+            self._available[TransientState.IN_TRANSITION] = tuple(
+                name for name in unchecked if transitions[name].to_ is None
+            )
+
+        self._allowed: Dict[Optional[State], FrozenSet[str]] = {
+            state: frozenset(names) for state, names in self._available.items()
+        }
+        self._reachable = _reachable_states(self.states, edges)
+        self._events = _event_names(transitions, self._available)
+
+    @classmethod
+    def of(cls, machine_class: type) -> TransitionTable:
+        """
+        Return the transition table of a :class:`StateMixin` subclass.
+        """
+        return getattr(machine_class, StateField.TRANSITION_TABLE.value)  # type: ignore[no-any-return]
+
+    def available(self, state: Any) -> Tuple[str, ...]:
+        """
+        Return the names of the transitioning methods allowed in a state, or in any of the active states of an instance
+        of a hierarchical state machine, in declaration order. Guards are not evaluated, see :meth:`allows`.
+        """
+        available = self._available.get(state)
+
+        if available is not None:
+            return available
+
+        if isinstance(state, Configuration):
+            names = {name for active in state for name in self.available(active)}
+            return tuple(name for name in self.transitions if name in names)
+
+        return self._unchecked
+
+    def allows(self, state: Any, name: str) -> bool:
+        """
+        Return ``True`` if the transitioning method with the given name is allowed in a state, or in any of the active
+        states of an instance of a hierarchical state machine. The guards of the transition are not evaluated, as they
+        take an instance, so a transition allowed in a state can still raise a :exc:`~afsm.GuardError`.
+        """
+        allowed = self._allowed.get(state)
+
+        if allowed is not None:
+            return name in allowed
+
+        if isinstance(state, Configuration):
+            return any(self.allows(active, name) for active in state)
+
+        return name in self._unchecked
+
+    def event_states(self, event: str) -> Tuple[State, ...]:
+        """
+        Return the states in which the transitions of the table handle an event, in declaration order.
+        """
+        return tuple(
+            dict.fromkeys(
+                state
+                for transition_ in self.transitions.values()
+                if transition_.event == event
+                for state in transition_._from_states()  # pylint: disable=protected-access
+            )
+        )
+
+    def reachable(self, state: Optional[State]) -> FrozenSet[State]:
+        """
+        Return the states an instance in a state can be in after any number of transitions, including the state itself.
+        """
+        if state is None or state in self._reachable:
+            return self._reachable[state]
+
+        return self._reachable[None].union((state,))
+
+
+def event_handlers(
+    table: TransitionTable, methods: Mapping[str, Callable[..., Any]], encode: Callable[[Optional[State]], Any]
+) -> Dict[Tuple[Any, str], Tuple[Callable[..., Any], Callable[..., Any]]]:
+    """
+    Index the transitioning methods of a class by the states, as stored on instances, and the events they handle.
+
+    Arguments:
+        table: the transition table of the class.
+        methods: the transitioning methods of the class, keyed by name.
+        encode: the function that returns the value stored on an instance for a state.
+
+    Returns:
+        Each transitioning method and its ``try_()`` function, keyed by state value and event name.
+    """
+    handlers: Dict[Tuple[Any, str], Tuple[Callable[..., Any], Callable[..., Any]]] = {}
+
+    for (state, event), name in table._events.items():  # pylint: disable=protected-access
+        method = methods[name]
+        handlers[encode(state), event] = (method, method.try_)  # type: ignore[attr-defined]
+
+    return handlers
+
+
+def dispatch_many(events: Iterable[Tuple[StateMixin, str, Iterable[Any]]]) -> Iterator[Any]:
+    """
+    Dispatch events to state machines, possibly of different classes, as with :meth:`StateMixin.dispatch`, but
+    streaming the results rather than raising a :exc:`StateError` for events that are not handled.
+
+    Arguments:
+        events: triples of an instance, the name of an event, and the positional arguments of its handler.
+
+    Returns:
+        An iterator of the result of each handler, in order, or :attr:`Rejection.REJECTED` for each event that is not
+        handled in the state of its instance when dispatched.
+    """
+    rejected = Rejection.REJECTED
+
+    for instance, event, args in events:
+        handler = getattr(instance, _EVENT_HANDLERS_ATTR).get((getattr(instance, _STATE_ATTR), event))
+        yield rejected if handler is None else handler[1](instance, *args)
+
+
+def _event_names(
+    transitions: Mapping[str, Transition[Any]], available: Mapping[Optional[State], Tuple[str, ...]]
+) -> Dict[Tuple[Optional[State], str], str]:
+    """
+    Return the names of the transitioning methods that handle each event in each state, keyed by state and event.
+
+    Raises:
+        :exc:`ValueError`: if several transitioning methods handle the same event in the same state.
+    """
+    names: Dict[Tuple[Optional[State], str], str] = {}
+
+    for state, allowed in available.items():
+        for name in allowed:
+            event = transitions[name].event
+
+            if event is not None and names.setdefault((state, event), name) != name:
+                raise ValueError(f"Both '{names[state, event]}' and '{name}' handle event '{event}' in state {state}")
+
+    return names
+
+
+def _reachable_states(
+    states: Iterable[State], edges: Mapping[Optional[State], Set[State]]
+) -> Dict[Optional[State], FrozenSet[State]]:
+    """
+    Compute the states reachable from each state, given the new states of the transitions from each state. The new
+    states of transitions that expect no state are keyed by ``None`` and reachable from every state.
+    """
+    anywhere = edges.get(None, set())
+    reachable: Dict[Optional[State], FrozenSet[State]] = {}
+
+    for start in (*states, None):
+        seen: Set[State] = set() if start is None else {start}
+        pending = [*anywhere, *edges.get(start, ())]
+
+        while pending:
+            state = pending.pop()
+
+            if state not in seen:
+                seen.add(state)
+                pending.extend(edges.get(state, ()))
+                pending.extend(anywhere)
+
+        reachable[start] = frozenset(seen)
+
+    return reachable
@@ -0,0 +1,359 @@
+"""
+This module defines the timing wheel that fires the timed transitions of state machines.
+"""
+from __future__ import annotations
+
+import sys
+from inspect import isawaitable
+from math import ceil, floor
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from afsm._hierarchy import active_states
+from afsm._state import Rejection, State, StateField, TransientState
+
+# The key of the timers of an instance, keyed by state, in the results mapping.
+TIMERS_KEY = object()
+
+
+class _Timer:  # pylint: disable=too-few-public-methods
+    """
+    A timed transition scheduled for an instance, which is cancelled by flagging it and releasing its instance, and
+    dropped from the wheel when its slot is next processed or compacted.
+    """
+
+    __slots__ = ("deadline", "instance", "name", "cancelled")
+
+    def __init__(self, deadline: int, instance: Any, name: str) -> None:
+        self.deadline = deadline
+        self.instance = instance
+        self.name = name
+        self.cancelled = False
+
+
+class TimingWheel:  # pylint: disable=too-many-instance-attributes
+    """
+    A hashed timing wheel that fires the timed transitions of state machines, declared with the ``timeout`` argument
+    of :class:`~afsm.transition`, in classes specified with the ``timers`` argument of the class definition statement.
+    A single wheel can be shared by many classes and millions of instances.
+
+    Time is divided into ticks, and each timer is appended to the slot of the tick it expires at, modulo the number of
+    slots, so scheduling and cancelling a timer take constant time regardless of how many timers are pending. When the
+    wheel advances, it only visits the slots of the ticks that elapsed, firing the timers that expired and keeping
+    those due in a later revolution. Timers fire at most one tick after they expire.
+
+    When an instance enters a state, the timed transitions expecting that state are scheduled, and when it leaves the
+    state they are cancelled. Transitions that re-enter a state reschedule its timers. A timer fires its transition
+    through the ``try_()`` function of the transitioning method, without arguments. A synchronous transition rejected
+    while another transition claims the instance, or by a guard, is fired again at the next tick, until it is allowed
+    or the instance leaves the state. Otherwise, a transition rejected in the current state of the instance is ignored.
+
+    The wheel advances when :meth:`advance` is called, every tick in a background thread started with :meth:`start`,
+    or every tick in an :mod:`asyncio` task running :meth:`run`. Scheduled timers hold a reference to their instance.
+
+    Cancelled timers release their instance at once, and stay in their slot until it is next processed, or until most
+    timers of the slot are cancelled, when the slot is compacted. Instances re-entering a state many times per
+    revolution of the wheel therefore keep at most about twice as many timers in a slot as are pending in it.
+
+    Warning:
+        The background thread fires timed transitions concurrently with the transitions other threads call, so classes
+        whose instances are also transitioned outside that thread must be defined with ``thread_safe``. Otherwise, a
+        timed transition and another transition of the same instance can both pass their state check, and the state
+        the instance ends in depends on which completes last.
+
+    Example:
+        >>> from enum import auto
+        >>> from afsm import State, StateMixin, TimingWheel, transition
+        ...
+        >>> class SessionState(State):
+        ...     OPEN = auto()
+        ...     EXPIRED = auto()
+        ...
+        >>> now = 0.0
+        >>> wheel = TimingWheel(tick=60, clock=lambda: now)
+        >>> class Session(StateMixin, initial_state=SessionState.OPEN, timers=wheel):
+        ...     @transition(from_=SessionState.OPEN, to_=SessionState.EXPIRED, timeout=30 * 60)
+        ...     def expire(self):
+        ...         pass
+        ...
+        >>> session = Session()
+        >>> now = 29 * 60
+        >>> wheel.advance()
+        []
+        >>> str(session.current_state)
+        'OPEN'
+        >>> now = 30 * 60
+        >>> wheel.advance()
+        []
+        >>> str(session.current_state)
+        'EXPIRED'
+
+    Arguments:
+        tick: the duration of a tick, in seconds, which is the resolution of the timers.
+        slots: the number of slots of the wheel. Timers expiring in more ticks than slots stay in their slot for as many
+               revolutions of the wheel.
+        clock: the function returning the current time in seconds, :func:`time.monotonic` by default.
+        on_error: the function called with the instance and the exception when a timed transition raises an
+                  exception. By default, the exception is reported to :func:`sys.excepthook`.
+
+    Attributes:
+        tick: the duration of a tick, in seconds.
+
+    Raises:
+        :exc:`ValueError`: if ``tick`` or ``slots`` is not positive.
+    """
+
+    def __init__(
+        self,
+        tick: float = 1.0,
+        slots: int = 512,
+        clock: Callable[[], float] = monotonic,
+        on_error: Optional[Callable[[Any, BaseException], Any]] = None,
+    ) -> None:
+        if tick <= 0 or slots < 1:
+            raise ValueError("The tick and the number of slots must be positive")
+
+        self.tick = tick
+        self._clock = clock
+        self._on_error = on_error
+        self._slots: List[List[_Timer]] = [[] for _ in range(slots)]
+        # The number of timers cancelled in each slot since it was last processed or compacted.
+        self._cancelled = [0] * slots
+        self._lock = Lock()
+        self._stopped = Event()
+
+        # The last tick processed, so the wheel starts with the current tick.
+        self._current = floor(clock() / tick)
+
+    def __len__(self) -> int:
+        """
+        Return the number of timers in the wheel, including cancelled timers not yet dropped.
+        """
+        return sum(map(len, self._slots))
+
+    def reschedule(  # pylint: disable=too-many-arguments # Called with positional arguments by transitioning methods
+        self,
+        timeouts: Mapping[State, Tuple[Tuple[float, str], ...]],
+        instance: Any,
+        from_state: Any,
+        to_state: Any,
+        target_state: Optional[State],
+    ) -> None:
+        """
+        Cancel the timers of the states an instance leaves, and schedule the timers of the states it enters, which
+        transitioning methods call after setting the new state. States that remain active keep their timers, unless
+        they are the new state of the transition, which the instance re-enters.
+
+        Arguments:
+            timeouts: the timeouts and names of the timed transitions of the class, keyed by the state they expect.
+            instance: the instance.
+            from_state: the state, or active states, of the instance before the transition.
+            to_state: the state, or active states, of the instance after the transition.
+            target_state: the new state of the transition.
+        """
+        left = active_states(from_state)
+        entered = active_states(to_state)
+        results: Optional[Dict[Any, Any]] = getattr(instance, StateField.RETURN_VALUES.value)
+        timers: Optional[Dict[State, List[_Timer]]] = None if results is None else results.get(TIMERS_KEY)
+
+        if timers:
+            for state in left:
+                if state not in entered or state is target_state:
+                    self._cancel(timers.pop(state, ()))
+
+        for state in entered:
+            delays = timeouts.get(state)
+
+            if delays and (state not in left or state is target_state):
+                if timers is None:
+                    timers = _allocate_timers(instance)
+
+                timers[state] = [self._schedule(delay, instance, name) for delay, name in delays]
+
+    def track(self, instance: Any) -> None:
+        """
+        Cancel the timers of an instance, and schedule the timed transitions of its current states. Instances are
+        tracked when created or stored from a :class:`~afsm.Fleet`, but not when restored from a :class:`~afsm.Snapshot`
+        or replayed from a :class:`~afsm.Journal`, which set their states without transitions.
+
+        Arguments:
+            instance: the instance, whose class has this timing wheel.
+        """
+        results: Optional[Dict[Any, Any]] = getattr(instance, StateField.RETURN_VALUES.value)
+        timers: Optional[Dict[State, List[_Timer]]] = None if results is None else results.pop(TIMERS_KEY, None)
+
+        self._cancel(timer for state_timers in (timers or {}).values() for timer in state_timers)
+
+        options = getattr(type(instance), StateField.CLASS_OPTIONS.value)
+        self.reschedule(options.timeouts, instance, None, instance.current_state, None)
+
+    def advance(self) -> List[Awaitable[Any]]:
+        """
+        Process the ticks elapsed since the wheel last advanced, firing the timers that expired.
+
+        Returns:
+            The awaitables returned by asynchronous timed transitions, which the caller must await.
+        """
+        target = floor(self._clock() / self.tick)
+        slot_count = len(self._slots)
+        awaitables: List[Awaitable[Any]] = []
+        deferred: List[_Timer] = []
+
+        # After a long pause, each slot is processed once, firing all the timers that expired in the meantime.
+        with self._lock:
+            start = self._current + 1
+            lagging = target - self._current > slot_count
+
+        for tick in range(max(start, target - slot_count + 1), target + 1):
+            threshold = target if lagging else tick
+
+            with self._lock:
+                index = tick % slot_count
+                timers = self._slots[index]
+                self._slots[index] = [timer for timer in timers if timer.deadline > threshold and not timer.cancelled]
+                self._cancelled[index] = 0
+                self._current = tick
+
+            for timer in timers:
+                if timer.deadline <= threshold and not timer.cancelled:
+                    self._fire(timer, awaitables, deferred)
+
+        # Deferred timers are retried at the next tick, rather than again among the ticks processed now.
+        with self._lock:
+            for timer in deferred:
+                if not timer.cancelled:
+                    timer.deadline = self._current + 1
+                    self._slots[timer.deadline % slot_count].append(timer)
+
+        return awaitables
+
+    def start(self) -> None:
+        """
+        Start a background thread that advances the wheel every tick, until :meth:`stop` is called. The thread only
+        fires synchronous transitions, and reports asynchronous ones as errors. The transitions it fires race with those
+        called by other threads, unless their classes are defined with ``thread_safe``.
+        """
+        self._stopped.clear()
+        Thread(target=self._advance_periodically, daemon=True).start()
+
+    def stop(self) -> None:
+        """
+        Stop the background thread, when it next wakes up.
+        """
+        self._stopped.set()
+
+    async def run(self) -> None:
+        """
+        Advance the wheel every tick, until cancelled, running asynchronous timed transitions as tasks.
+        """
+        # Every state machine class imports this module, so `asyncio` is only imported by wheels run in an event loop.
+        from asyncio import ensure_future, sleep  # pylint: disable=import-outside-toplevel
+
+        tasks: Set[Any] = set()
+
+        def done(task: Any) -> None:
+            tasks.discard(task)
+
+            if not task.cancelled() and task.exception() is not None:
+                self._report(None, task.exception())
+
+        while True:
+            for awaitable in self.advance():
+                task = ensure_future(awaitable)
+                tasks.add(task)
+                task.add_done_callback(done)
+
+            await sleep(self.tick)
+
+    def _schedule(self, delay: float, instance: Any, name: str) -> _Timer:
+        # Timers expire at the first tick at or after their deadline, and never in a tick already processed.
+        deadline = ceil((self._clock() + delay) / self.tick)
+
+        with self._lock:
+            timer = _Timer(max(deadline, self._current + 1), instance, name)
+            self._slots[timer.deadline % len(self._slots)].append(timer)
+
+        return timer
+
+    def _cancel(self, timers: Iterable[_Timer]) -> None:
+        with self._lock:
+            for timer in timers:
+                timer.cancelled = True
+                timer.instance = None
+                index = timer.deadline % len(self._slots)
+                self._cancelled[index] += 1
+
+                # Compacting a slot once most of its timers are cancelled takes amortized constant time per timer.
+                if self._cancelled[index] * 2 > len(self._slots[index]):
+                    self._slots[index] = [timer for timer in self._slots[index] if not timer.cancelled]
+                    self._cancelled[index] = 0
+
+    def _fire(self, timer: _Timer, awaitables: List[Awaitable[Any]], deferred: List[_Timer]) -> None:
+        # The timer may be cancelled by another thread after its slot was processed.
+        instance = timer.instance
+
+        if instance is None:
+            return
+
+        try:
+            result = getattr(type(instance), timer.name).try_(instance)
+        except Exception as exception:  # pylint: disable=broad-except
+            self._report(instance, exception)
+        else:
+            if isawaitable(result):
+                awaitables.append(result)
+            elif result is Rejection.REJECTED and _deferred(instance, timer.name):
+                deferred.append(timer)
+
+    def _report(self, instance: Any, exception: BaseException) -> None:
+        if self._on_error is not None:
+            self._on_error(instance, exception)
+        else:
+            sys.excepthook(type(exception), exception, exception.__traceback__)
+
+    def _advance_periodically(self) -> None:
+        while not self._stopped.wait(self.tick):
+            for awaitable in self.advance():
+                getattr(awaitable, "close", lambda: None)()
+                self._report(None, TypeError("Asynchronous timed transitions require running the wheel with run()"))
+
+
+def timed_constructor(new: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Return a constructor of instances of classes with timed transitions, which creates instances with another
+    constructor, then schedules the timed transitions of their initial state.
+    """
+
+    def __new__(cls: type, *args: Any, **kwargs: Any) -> Any:
+        instance = new(cls, *args, **kwargs)
+        getattr(cls, StateField.CLASS_OPTIONS.value).timers.track(instance)
+        return instance
+
+    return __new__
+
+
+def _deferred(instance: Any, name: str) -> bool:
+    """
+    Return ``True`` if a timed transition rejected for an instance is only deferred, because another transition claims
+    the instance, or because a guard rejected it in one of the states it expects.
+    """
+    options = getattr(type(instance), StateField.CLASS_OPTIONS.value)
+
+    if getattr(instance, StateField.STATE.value) == options.encode(TransientState.IN_TRANSITION):
+        return True
+
+    expected_states = getattr(type(instance), name).__transition__._from_states()  # pylint: disable=protected-access
+    return not set(active_states(instance.current_state)).isdisjoint(expected_states)
+
+
+def _allocate_timers(instance: Any) -> Dict[State, List[_Timer]]:
+    results: Optional[Dict[Any, Any]] = getattr(instance, StateField.RETURN_VALUES.value)
+
+    if results is None:
+        results = {}
+        # Use `object.__setattr__()` for compatibility with frozen/immutable `attrs` or `dataclass` classes.
+        object.__setattr__(instance, StateField.RETURN_VALUES.value, results)
+
+    timers: Dict[State, List[_Timer]] = results.setdefault(TIMERS_KEY, {})
+    return timers
@@ -1,8 +1,51 @@
 # pylint: disable=missing-module-docstring,missing-function-docstring,unused-argument
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, cast
+from unittest.mock import Mock
 
-from pytest import Config
+from attr import frozen, mutable
+from pytest import Config, FixtureRequest, fixture
+
+try:
+    # pylint: disable-next=unexpected-keyword-arg,useless-suppression # Only unexpected before Python 3.10
+    _slotted_dataclasses = [dataclass(slots=True), dataclass(frozen=True, slots=True)]  # type: ignore[call-overload]
+    _slotted_dataclasses_ids = ["dataclass:mutable,slots", "dataclass:frozen,slots"]
+
+except TypeError:  # Python < 3.10 does not support slotted dataclasses
+    _slotted_dataclasses = []
+    _slotted_dataclasses_ids = []
 
 
 def pytest_make_parametrize_id(config: Config, val: object, argname: str) -> Optional[str]:
     return f"{argname}:{val}" if isinstance(val, (int, bool)) else None
+
+
+@fixture(
+    params=(
+        lambda cls: cls,
+        mutable(slots=False),
+        mutable(slots=True),
+        frozen(slots=False),
+        frozen(slots=True),
+        dataclass(frozen=False),
+        dataclass(frozen=True),
+        *_slotted_dataclasses,
+    ),
+    ids=(
+        "undecorated",
+        "attrs:mutable,dict",
+        "attrs:mutable,slots",
+        "attrs:frozen,dict",
+        "attrs:frozen,slots",
+        "dataclass:frozen,dict",
+        "dataclass:mutable,dict",
+        *_slotted_dataclasses_ids,
+    ),
+)
+def class_decorator(request: FixtureRequest) -> Callable[..., Any]:
+    return cast(Callable[..., Any], request.param)
+
+
+@fixture
+def identity_function() -> Mock:
+    return Mock(side_effect=lambda value: value)
@@ -1,24 +1,14 @@
-# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring,too-few-public-methods
-from dataclasses import dataclass
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from asyncio import run, sleep
 from enum import auto
 from typing import Any, Callable, Optional, cast
 from unittest.mock import Mock
 
-from attr import frozen, mutable
-from pytest import FixtureRequest, fixture, raises
+from pytest import FixtureRequest, fixture, mark, raises
 
-from afsm import State, StateError, StateMixin, transition
+from afsm import Rejection, State, StateError, StateMixin, transition
 from afsm._state import StateField
 
-try:
-    # pylint: disable-next=unexpected-keyword-arg
-    _slotted_dataclasses = [dataclass(slots=True), dataclass(frozen=True, slots=True)]  # type: ignore[call-overload]
-    _slotted_dataclasses_ids = ["dataclass:mutable,slots", "dataclass:frozen,slots"]
-
-except TypeError:  # Python < 3.10 does not support slotted dataclasses
-    _slotted_dataclasses = []
-    _slotted_dataclasses_ids = []
-
 
 class _State(State):
     INITIAL = auto()
@@ -26,40 +16,15 @@ class _State(State):
     FINAL = auto()
 
 
-class TestFiniteStateMachine:
-    @fixture(
-        params=(
-            lambda cls: cls,
-            mutable(slots=False),
-            mutable(slots=True),
-            frozen(slots=False),
-            frozen(slots=True),
-            dataclass(frozen=False),
-            dataclass(frozen=True),
-            *_slotted_dataclasses,
-        ),
-        ids=(
-            "undecorated",
-            "attrs:mutable,dict",
-            "attrs:mutable,slots",
-            "attrs:frozen,dict",
-            "attrs:frozen,slots",
-            "dataclass:frozen,dict",
-            "dataclass:mutable,dict",
-            *_slotted_dataclasses_ids,
-        ),
-    )
-    def class_decorator(self, request: FixtureRequest) -> Callable[..., Any]:
-        return cast(Callable[..., Any], request.param)
+class _OtherState(State):
+    OTHER = auto()
 
+
+class TestFiniteStateMachine:
     @fixture(params=(None, _State.INITIAL), ids=("initial_state:None", "initial_state:INITIAL"))
     def initial_state(self, request: FixtureRequest) -> Optional[State]:
         return cast(Optional[State], request.param)
 
-    @fixture
-    def identity_function(self) -> Mock:
-        return Mock(side_effect=lambda value: value)
-
     class TestInstanceCreation:
         def with_initial_state_succeeds(
             self, class_decorator: Callable[..., Any], initial_state: Optional[State]
@@ -74,6 +39,7 @@ class TestFiniteStateMachine:
 
             # Then
             assert getattr(afsm, StateField.STATE.value) is initial_state
+            assert afsm.current_state is initial_state
 
         def without_initial_state_succeeds(self, class_decorator: Callable[..., Any]) -> None:
             # Given
@@ -153,6 +119,103 @@ class TestFiniteStateMachine:
             identity_function.assert_called_once_with("blue")
             assert result == "blue"
 
+        def from_one_of_many_states_succeeds(
+            self, class_decorator: Callable[..., Any], identity_function: Mock
+        ) -> None:
+            # Given
+            @class_decorator
+            class AFSM(StateMixin, initial_state=_State.NEXT):
+                @transition(from_=(_State.INITIAL, _State.NEXT), to_=_State.FINAL)
+                def to_final_state(self, value: str) -> str:
+                    return cast(str, identity_function(value))
+
+            afsm = AFSM()
+
+            # When
+            result = afsm.to_final_state(value="blue")
+
+            # Then
+            assert getattr(afsm, StateField.STATE.value) is _State.FINAL
+            identity_function.assert_called_once_with("blue")
+            assert result == "blue"
+
+        def from_states_of_generator_fails(self, class_decorator: Callable[..., Any]) -> None:
+            # Given
+            @class_decorator
+            class AFSM(StateMixin, initial_state=_State.FINAL):
+                @transition(from_=(state for state in (_State.INITIAL, _State.NEXT)), to_=_State.FINAL)
+                def to_final_state(self) -> None:
+                    pass
+
+            afsm = AFSM()
+
+            # Then
+            with raises(StateError) as error:
+                # When
+                afsm.to_final_state()
+
+            assert error.value.expected_states == (_State.INITIAL, _State.NEXT)
+
+        def from_invalid_state_with_unexpected_arguments_fails(self, class_decorator: Callable[..., Any]) -> None:
+            # Given
+            @class_decorator
+            class AFSM(StateMixin, initial_state=_State.FINAL):
+                @transition(from_=_State.INITIAL, to_=_State.NEXT)
+                def to_next_state(self, value: str) -> str:
+                    return value
+
+            afsm = AFSM()
+
+            # Then
+            with raises(TypeError):
+                # When
+                afsm.to_next_state("blue", "red")  # pylint: disable=too-many-function-args # One argument too many
+
+            with raises(StateError):
+                afsm.to_next_state("blue")
+
+        def from_unset_state_fails(self, class_decorator: Callable[..., Any]) -> None:
+            # Given
+            @class_decorator
+            class AFSM(StateMixin):
+                @transition(from_=_State.INITIAL, to_=_State.NEXT)
+                def to_next_state(self) -> None:
+                    pass
+
+            afsm = AFSM()
+
+            # Then
+            with raises(StateError):
+                # When
+                afsm.to_next_state()
+
+            assert getattr(afsm, StateField.STATE.value) is None
+
+        def with_states_of_different_classes_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+            # Given
+            @class_decorator
+            class AFSM(StateMixin, initial_state=_State.INITIAL):
+                @transition(from_=_State.INITIAL, to_=_OtherState.OTHER)
+                def to_other_state(self) -> None:
+                    pass
+
+                @transition(from_=_OtherState.OTHER, to_=_State.FINAL)
+                def to_final_state(self) -> None:
+                    pass
+
+            afsm = AFSM()
+
+            # When
+            afsm.to_other_state()
+            afsm.to_final_state()
+
+            # Then
+            assert afsm.current_state is _State.FINAL
+            assert sorted(getattr(AFSM, StateField.CLASS_OPTIONS.value).bits.values()) == [1, 2, 4]
+
+            with raises(StateError):
+                afsm.to_other_state()
+
         def from_invalid_state_fails(self, class_decorator: Callable[..., Any], identity_function: Mock) -> None:
             # Given
             @class_decorator
@@ -176,6 +239,64 @@ class TestFiniteStateMachine:
             identity_function.assert_called_once_with("blue")
             assert result == "blue"
 
+        def raises_state_error_from_invalid_state(self, class_decorator: Callable[..., Any]) -> None:
+            # Given
+            @class_decorator
+            class AFSM(StateMixin, initial_state=_State.FINAL):
+                @transition(from_=(_State.INITIAL, _State.NEXT), to_=_State.FINAL)
+                def to_final_state(self) -> None:
+                    pass
+
+            afsm = AFSM()
+
+            # Then
+            with raises(StateError) as error:
+                # When
+                afsm.to_final_state()
+
+            assert (error.value.class_, error.value.expected_states, error.value.actual_state) == (
+                AFSM,
+                (_State.INITIAL, _State.NEXT),
+                _State.FINAL,
+            )
+            assert "Expected states: INITIAL or NEXT\nActual state: FINAL" in str(error.value)
+
+        def raises_state_error_with_message_only(self) -> None:
+            # Then
+            with raises(StateError) as error:
+                # When
+                raise StateError("message")
+
+            assert (error.value.class_, error.value.expected_states, error.value.actual_state) == (None, (), None)
+            assert str(error.value) == "message"
+
+        @mark.parametrize("thread_safe", (False, True), ids=("thread_safe:False", "thread_safe:True"))
+        def returns_rejection_from_invalid_state(
+            self, class_decorator: Callable[..., Any], identity_function: Mock, thread_safe: bool
+        ) -> None:
+            # Given
+            @class_decorator
+            class AFSM(StateMixin, initial_state=_State.INITIAL, thread_safe=thread_safe):
+                @transition(from_=_State.INITIAL, to_=_State.NEXT)
+                def to_next_state(self, value: str) -> str:
+                    return cast(str, identity_function(value))
+
+                @transition()
+                def to_same_state(self) -> None:
+                    pass
+
+            afsm = AFSM()
+
+            # When
+            first_result = AFSM.to_next_state.try_(afsm, "blue")
+            second_result = AFSM.to_next_state.try_(afsm, "orange")
+
+            # Then
+            assert (first_result, second_result) == ("blue", Rejection.REJECTED)
+            identity_function.assert_called_once_with("blue")
+            assert afsm.current_state is _State.NEXT
+            assert AFSM.to_same_state.try_ is AFSM.to_same_state
+
         def returns_cached_result_from_idempotent_state(
             self, class_decorator: Callable[..., Any], identity_function: Mock
         ) -> None:
@@ -231,3 +352,127 @@ class TestFiniteStateMachine:
             # Then
             handle_exception.assert_called_once_with(afsm, exception, "blue", "green", third_colour="yellow")
             assert result == "orange"
+
+    class TestCompactState:
+        def with_compact_state_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+            # Given
+            @class_decorator
+            class AFSM(StateMixin, initial_state=_State.INITIAL, compact=True):
+                @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+                def to_next_state(self, value: str) -> str:
+                    return value
+
+                @transition(from_=(_State.INITIAL, _State.NEXT), to_=_State.FINAL)
+                def to_final_state(self) -> None:
+                    pass
+
+            afsm = AFSM()
+
+            # When
+            first_result = afsm.to_next_state("blue")
+            second_result = afsm.to_next_state("orange")
+            next_state, compact_next_state = afsm.current_state, getattr(afsm, StateField.STATE.value)
+            afsm.to_final_state()
+
+            # Then
+            assert (first_result, second_result) == ("blue", "blue")
+            assert (next_state, compact_next_state) == (_State.NEXT, 1)
+            assert afsm.current_state is _State.FINAL
+
+        def from_invalid_compact_state_fails(self, class_decorator: Callable[..., Any]) -> None:
+            # Given
+            @class_decorator
+            class AFSM(StateMixin, initial_state=_State.NEXT, compact=True):
+                @transition(from_=_State.INITIAL, to_=_State.NEXT)
+                def to_next_state(self) -> None:
+                    pass
+
+            afsm = AFSM()
+
+            # Then
+            with raises(StateError, match="Actual state: NEXT"):
+                # When
+                afsm.to_next_state()
+
+        def without_initial_state_fails(self) -> None:
+            # Then
+            with raises(ValueError):
+                # When
+                class AFSM(StateMixin, compact=True):  # pylint: disable=unused-variable
+                    pass
+
+        def with_states_of_different_classes_fails(self) -> None:
+            # Then
+            with raises(ValueError):
+                # When
+                class AFSM(StateMixin, initial_state=_State.INITIAL, compact=True):  # pylint: disable=unused-variable
+                    @transition(from_=_State.INITIAL, to_=_OtherState.OTHER)
+                    def to_other_state(self) -> None:
+                        pass
+
+    class TestAsyncTransition:
+        def to_next_state_succeeds(self, class_decorator: Callable[..., Any], identity_function: Mock) -> None:
+            # Given
+            @class_decorator
+            class AFSM(StateMixin, initial_state=_State.INITIAL):
+                @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+                async def to_next_state(self, value: str) -> str:
+                    await sleep(0)
+                    return cast(str, identity_function(value))
+
+            afsm = AFSM()
+
+            # When
+            coroutine = afsm.to_next_state("blue")
+            state_before_await = afsm.current_state
+            first_result = run(coroutine)
+            second_result = run(afsm.to_next_state("orange"))
+
+            # Then
+            assert state_before_await is _State.INITIAL
+            assert afsm.current_state is _State.NEXT
+            identity_function.assert_called_once_with("blue")
+            assert (first_result, second_result) == ("blue", "blue")
+
+        def raises_on_unhandled_exception(self, class_decorator: Callable[..., Any]) -> None:
+            # Given
+            @class_decorator
+            class AFSM(StateMixin, initial_state=_State.INITIAL):
+                @transition(from_=_State.INITIAL, to_=_State.NEXT)
+                async def to_next_state(self, value: str) -> str:
+                    await sleep(0)
+                    raise ValueError(value)
+
+            afsm = AFSM()
+
+            # Then
+            with raises(ValueError, match="red"):
+                # When
+                run(afsm.to_next_state("red"))
+
+            assert afsm.current_state is _State.INITIAL
+
+        def calls_async_handler_on_handled_exception(self, class_decorator: Callable[..., Any]) -> None:
+            # Given
+            exception = ValueError("red")
+            handle_exception = Mock(return_value="orange")
+
+            async def handle_exception_async(*args: Any) -> str:
+                await sleep(0)
+                return cast(str, handle_exception(*args))
+
+            @class_decorator
+            class AFSM(StateMixin, initial_state=_State.INITIAL):
+                @transition(from_=_State.INITIAL, to_=_State.NEXT, on_exception=handle_exception_async)
+                async def to_next_state(self, value: str) -> str:
+                    raise exception
+
+            afsm = AFSM()
+
+            # When
+            result = run(afsm.to_next_state("blue"))
+
+            # Then
+            handle_exception.assert_called_once_with(afsm, exception, "blue")
+            assert result == "orange"
+            assert afsm.current_state is _State.NEXT
@@ -0,0 +1,275 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring,too-few-public-methods
+from asyncio import run
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+from enum import auto
+from threading import Event, Thread
+from typing import Any, Callable, DefaultDict, Deque, List, Tuple, cast
+
+from attr import attrib, frozen, mutable
+from pytest import FixtureRequest, fixture, raises
+
+from afsm import Retention, State, StateMixin, TimingWheel, transition
+from afsm._options import SLOTTED
+from afsm._state import StateField
+
+
+def _attrs_list() -> Any:
+    return attrib(factory=list)
+
+
+def _dataclass_list() -> Any:
+    return field(default_factory=list)
+
+
+# pylint: disable-next=unexpected-keyword-arg,useless-suppression # Only unexpected before Python 3.10
+_slotted_dataclasses = [dataclass(**SLOTTED), dataclass(frozen=True, **SLOTTED)] if SLOTTED else []
+_slotted_dataclasses_ids = ["dataclass:mutable,slots", "dataclass:frozen,slots"] if SLOTTED else []
+
+
+class _State(State):
+    INITIAL = auto()
+    NEXT = auto()
+    FINAL = auto()
+
+
+class TestClone:
+    @fixture(
+        params=(
+            (mutable(slots=False), _attrs_list),
+            (mutable(slots=True), _attrs_list),
+            (frozen(slots=False), _attrs_list),
+            (frozen(slots=True), _attrs_list),
+            (dataclass(frozen=False), _dataclass_list),
+            (dataclass(frozen=True), _dataclass_list),
+            *((decorator, _dataclass_list) for decorator in _slotted_dataclasses),
+        ),
+        ids=(
+            "attrs:mutable,dict",
+            "attrs:mutable,slots",
+            "attrs:frozen,dict",
+            "attrs:frozen,slots",
+            "dataclass:mutable,dict",
+            "dataclass:frozen,dict",
+            *_slotted_dataclasses_ids,
+        ),
+    )
+    def class_decorator(self, request: FixtureRequest) -> Tuple[Callable[..., Any], Callable[[], Any]]:
+        return cast(Tuple[Callable[..., Any], Callable[[], Any]], request.param)
+
+    @fixture(params=(False, True), ids=("compact:False", "compact:True"))
+    def machine_class(
+        self, request: FixtureRequest, class_decorator: Tuple[Callable[..., Any], Callable[[], Any]]
+    ) -> Any:
+        decorator, list_field = class_decorator
+
+        @decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL, compact=request.param):
+            name: str
+            tags: List[str] = list_field()
+
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+            def to_next_state(self) -> str:
+                return f"{self.name} next"
+
+            @transition(from_=_State.NEXT, to_=_State.FINAL, is_idempotent=True, cache_size=2)
+            def to_final_state(self, suffix: str) -> str:
+                return f"{self.name} {suffix}"
+
+        return AFSM
+
+    def clone_succeeds(self, machine_class: Any) -> None:
+        # Given
+        afsm = machine_class("machine", ["tag"])
+        afsm.to_next_state()
+
+        # When
+        clone = afsm.clone()
+
+        # Then
+        assert clone.__class__ is machine_class
+        assert clone is not afsm
+        assert clone.current_state is _State.NEXT
+        assert clone.name == "machine"
+        assert clone.tags == afsm.tags and clone.tags is not afsm.tags
+        assert clone.to_next_state() == "machine next"
+
+    def clone_copies_results_succeeds(self, machine_class: Any) -> None:
+        # Given
+        afsm = machine_class("machine")
+        afsm.to_next_state()
+        afsm.to_final_state("first")
+
+        # When
+        clone = afsm.clone()
+        clone.to_final_state("second")
+
+        # Then
+        assert machine_class.to_final_state.cache_info(afsm).currsize == 1
+        assert machine_class.to_final_state.cache_info(clone).currsize == 2
+        assert clone.to_final_state("first") == "machine first"
+
+    def clone_without_results_succeeds(self, machine_class: Any) -> None:
+        # Given
+        afsm = machine_class("machine")
+
+        # When
+        clone = afsm.clone()
+
+        # Then
+        assert clone.current_state is _State.INITIAL
+        assert getattr(clone, StateField.RETURN_VALUES.value) is None
+
+    def create_many_succeeds(self, machine_class: Any) -> None:
+        # When
+        machines = machine_class.create_many(3, "machine", tags=["tag"])
+
+        # Then
+        assert len(machines) == 3
+        assert len({id(machine) for machine in machines}) == 3
+        assert all(machine.current_state is _State.INITIAL for machine in machines)
+        assert all(machine.name == "machine" and machine.tags == ["tag"] for machine in machines)
+
+        # When
+        machines[1].to_next_state()
+
+        # Then
+        assert [machine.current_state for machine in machines] == [_State.INITIAL, _State.NEXT, _State.INITIAL]
+
+    def create_many_copies_containers_succeeds(self, machine_class: Any) -> None:
+        # Given
+        name = "machine"
+
+        # When
+        machines = machine_class.create_many(2, name, tags=["tag"])
+        machines[0].tags.append("first")
+
+        # Then
+        assert machines[0].tags == ["tag", "first"]
+        assert machines[1].tags == ["tag"]
+        assert all(machine.name is name for machine in machines)
+
+    def create_none_succeeds(self, machine_class: Any) -> None:
+        # Then
+        assert not machine_class.create_many(0)
+
+
+class TestCloneOptions:
+    def create_many_copies_container_subclasses_succeeds(self) -> None:
+        # Given
+        @dataclass
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            queue: Deque[int] = field(default_factory=deque)
+            counts: DefaultDict[str, int] = field(default_factory=lambda: defaultdict(int))
+            ordered: "OrderedDict[str, int]" = field(default_factory=OrderedDict)
+
+        # When
+        machines = AFSM.create_many(3)
+        machines[1].counts["first"] += 1
+
+        # Then
+        for name, kind in (("queue", deque), ("counts", defaultdict), ("ordered", OrderedDict)):
+            assert len({id(getattr(machine, name)) for machine in machines}) == 3
+            assert all(getattr(machine, name).__class__ is kind for machine in machines)
+
+        assert [machine.counts["first"] for machine in machines] == [0, 1, 0]
+
+    def create_many_shares_attributes_succeeds(self) -> None:
+        # Given
+        @dataclass
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            handle: object = field(default_factory=object)
+            nested: List[List[str]] = field(default_factory=lambda: [[]])
+
+        # When
+        machines = AFSM.create_many(3)
+        machines[0].nested[0].append("first")
+
+        # Then
+        assert len({id(machine.handle) for machine in machines}) == 1
+        assert len({id(machine.nested) for machine in machines}) == 3
+        assert [machine.nested[0] for machine in machines] == [["first"]] * 3
+
+    def clone_without_lock_succeeds(self) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.INITIAL, serialize_async=True):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+            async def to_next_state(self) -> str:
+                return "next"
+
+        afsm = AFSM()
+        run(afsm.to_next_state())
+
+        # When
+        clone = afsm.clone()
+
+        # Then
+        assert len(getattr(afsm, StateField.RETURN_VALUES.value)) == 2
+        assert len(getattr(clone, StateField.RETURN_VALUES.value)) == 1
+        assert run(clone.to_next_state()) == "next"
+
+    def clone_weak_results_succeeds(self) -> None:
+        # Given
+        class Result:
+            pass
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, result_retention=Retention.WEAK):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+            def to_next_state(self) -> Result:
+                return result
+
+        result = Result()
+        afsm = AFSM()
+        afsm.to_next_state()
+
+        # When
+        clone = afsm.clone()
+
+        # Then
+        assert clone.to_next_state() is result
+
+    def clone_timed_machine_succeeds(self) -> None:
+        # Given
+        now = [0.0]
+        wheel = TimingWheel(tick=1, slots=8, clock=lambda: now[0])
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, timers=wheel):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, timeout=2)
+            def expire(self) -> None:
+                pass
+
+        afsm = AFSM()
+
+        # When
+        machines = [afsm.clone(), *AFSM.create_many(2)]
+        now[0] = 2
+        wheel.advance()
+
+        # Then
+        assert afsm.current_state is _State.NEXT
+        assert all(machine.current_state is _State.NEXT for machine in machines)
+
+    def clone_in_transition_fails(self) -> None:
+        # Given
+        started = Event()
+        release = Event()
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, thread_safe=True):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                started.set()
+                release.wait()
+
+        afsm = AFSM()
+        thread = Thread(target=afsm.to_next_state)
+        thread.start()
+        started.wait()
+
+        # Then
+        with raises(ValueError):
+            # When
+            afsm.clone()
+
+        release.set()
+        thread.join()
+        assert afsm.clone().current_state is _State.NEXT
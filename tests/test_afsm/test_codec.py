@@ -0,0 +1,155 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from enum import auto
+from typing import Any
+
+from pytest import fixture, importorskip, raises
+
+from afsm import State, StateCodec
+
+
+class _State(State):
+    OPEN = auto()
+    CLOSING = "closing-state"
+    CLOSED = 3
+
+
+class _Ambiguous(State):
+    LOWER = "value"
+    UPPER = "VALUE"
+
+
+class TestStateCodec:
+    @fixture
+    def codec(self) -> StateCodec[_State]:
+        return StateCodec.of(_State)
+
+    def of_returns_same_codec_succeeds(self, codec: StateCodec[_State]) -> None:
+        # Then
+        assert StateCodec.of(_State) is codec
+        assert codec.members == (_State.OPEN, _State.CLOSING, _State.CLOSED)
+        assert codec.names == ("OPEN", "CLOSING", "CLOSED")
+        assert codec.values == ("OPEN", "closing-state", 3)
+
+    def decode_succeeds(self, codec: StateCodec[_State]) -> None:
+        # Then
+        assert codec.decode(_State.CLOSED) is _State.CLOSED
+        assert codec.decode("OPEN") is _State.OPEN
+        assert codec.decode("open") is _State.OPEN
+        assert codec.decode("Open") is _State.OPEN
+        assert codec.decode(b"OPEN") is _State.OPEN
+        assert codec.decode("CLOSING") is _State.CLOSING
+        assert codec.decode("closing-state") is _State.CLOSING
+        assert codec.decode(bytearray(b"Closing-State")) is _State.CLOSING
+        assert codec.decode(3) is _State.CLOSED
+
+    def encode_succeeds(self, codec: StateCodec[_State]) -> None:
+        # Then
+        assert codec.encode(_State.OPEN) == 0
+        assert codec.encode("closing") == 1
+        assert codec.encode(3) == 2
+
+    def decode_unknown_key_fails(self, codec: StateCodec[_State]) -> None:
+        for key in ("unknown", b"\xff", 1, [], _Ambiguous.LOWER):
+            # Then
+            with raises(ValueError):
+                # When
+                codec.decode(key)
+
+    def ambiguous_case_succeeds(self) -> None:
+        # Given
+        codec = StateCodec.of(_Ambiguous)
+
+        # Then
+        assert codec.decode("value") is _Ambiguous.LOWER
+        assert codec.decode("VALUE") is _Ambiguous.UPPER
+        assert codec.decode("upper") is _Ambiguous.UPPER
+
+        with raises(ValueError):
+            codec.decode("Value")
+
+    def batch_succeeds(self, codec: StateCodec[_State]) -> None:
+        # Given
+        keys: Any = ["open", _State.CLOSED, b"closing", 3]
+
+        # Then
+        assert codec.encode_many(keys) == [0, 2, 1, 2]
+        assert codec.encode_many(iter(keys)) == [0, 2, 1, 2]
+        assert codec.decode_many(keys) == [_State.OPEN, _State.CLOSED, _State.CLOSING, _State.CLOSED]
+        assert codec.decode_many(iter(["OPEN", "OPEN"])) == [_State.OPEN, _State.OPEN]
+        assert codec.from_codes([2, 0]) == [_State.CLOSED, _State.OPEN]
+        assert codec.from_codes((1,), codec.names) == ["CLOSING"]
+        assert codec.from_codes([1, 2], codec.values) == ["closing-state", 3]
+
+    def from_negative_codes_fails(self, codec: StateCodec[_State]) -> None:
+        for codes in ([0, -1], (-3,), iter([2, -2])):
+            # Then
+            with raises(IndexError):
+                # When
+                codec.from_codes(codes)
+
+    def batch_with_unknown_key_fails(self, codec: StateCodec[_State]) -> None:
+        # Then
+        with raises(ValueError):
+            # When
+            codec.encode_many(["open", "unknown"])
+
+
+class TestStateCodecArrays:
+    @fixture
+    def numpy(self) -> Any:
+        return importorskip("numpy")
+
+    @fixture
+    def codec(self) -> StateCodec[_State]:
+        return StateCodec.of(_State)
+
+    def encode_array_succeeds(self, numpy: Any, codec: StateCodec[_State]) -> None:
+        # Given
+        keys = numpy.array([["open", "CLOSING"], ["closed", "closing-state"]])
+
+        # When
+        codes = codec.encode_many(keys)
+
+        # Then
+        assert codes.dtype == numpy.uint8
+        assert codes.tolist() == [[0, 1], [2, 1]]
+
+    def encode_bytes_array_succeeds(self, numpy: Any, codec: StateCodec[_State]) -> None:
+        # Then
+        assert codec.encode_many(numpy.array([b"OPEN", b"closed"])).tolist() == [0, 2]
+
+    def encode_object_array_succeeds(self, numpy: Any, codec: StateCodec[_State]) -> None:
+        # Given
+        keys = numpy.array(["open", 3, _State.CLOSING], dtype=object)
+
+        # Then
+        assert codec.encode_many(keys).tolist() == [0, 2, 1]
+        assert codec.decode_many(keys).tolist() == [_State.OPEN, _State.CLOSED, _State.CLOSING]
+
+    def encode_empty_array_succeeds(self, numpy: Any, codec: StateCodec[_State]) -> None:
+        # Then
+        assert codec.encode_many(numpy.array([], dtype=str)).tolist() == []
+
+    def from_codes_array_succeeds(self, numpy: Any, codec: StateCodec[_State]) -> None:
+        # Given
+        codes = numpy.array([2, 0, 1], dtype=numpy.uint8)
+
+        # Then
+        assert codec.from_codes(codes).tolist() == [_State.CLOSED, _State.OPEN, _State.CLOSING]
+        assert codec.from_codes(codes, codec.names).tolist() == ["CLOSED", "OPEN", "CLOSING"]
+        assert codec.from_codes(codes, codec.values).tolist() == [3, "OPEN", "closing-state"]
+
+    def from_negative_codes_array_fails(self, numpy: Any, codec: StateCodec[_State]) -> None:
+        # Given
+        codes = numpy.array([[0, 1], [2, -1]], dtype=numpy.int8)
+
+        # Then
+        with raises(IndexError):
+            # When
+            codec.from_codes(codes, codec.names)
+
+    def encode_array_with_unknown_key_fails(self, numpy: Any, codec: StateCodec[_State]) -> None:
+        # Then
+        with raises(ValueError):
+            # When
+            codec.encode_many(numpy.array(["open", "unknown"]))
@@ -0,0 +1,99 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from enum import auto
+from typing import Any, Callable
+
+from pytest import mark, raises
+
+from afsm import Rejection, State, StateError, StateMixin, dispatch_many, transition
+
+
+class _State(State):
+    INITIAL = auto()
+    NEXT = auto()
+    FINAL = auto()
+
+
+class TestEventDispatch:
+    @mark.parametrize("compact", (False, True), ids=("compact:False", "compact:True"))
+    def dispatch_succeeds(self, class_decorator: Callable[..., Any], compact: bool) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL, compact=compact):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True, event="open")
+            def open(self, value: str) -> str:
+                return value
+
+            @transition(from_=_State.INITIAL, to_=_State.FINAL, event="close")
+            def cancel(self) -> str:
+                return "cancelled"
+
+            @transition(from_=_State.NEXT, to_=_State.FINAL, event="close")
+            def close(self) -> str:
+                return "closed"
+
+        afsm = AFSM()
+
+        # When
+        results = [afsm.dispatch("open", "blue"), afsm.dispatch("open", value="orange"), afsm.dispatch("close")]
+
+        # Then
+        assert results == ["blue", "blue", "closed"]
+        assert afsm.current_state is _State.FINAL
+
+    def dispatch_unhandled_event_fails(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.NEXT):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, event="open")
+            def open(self) -> None:
+                pass
+
+        afsm = AFSM()
+
+        # Then
+        with raises(StateError) as error:
+            # When
+            afsm.dispatch("open")
+
+        assert (error.value.expected_states, error.value.actual_state) == ((_State.INITIAL,), _State.NEXT)
+
+    def dispatch_many_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, event="open")
+            def open(self, value: str) -> str:
+                return value
+
+            @transition(event="describe")
+            def describe(self) -> str:
+                return "described"
+
+        first_afsm, second_afsm = AFSM(), AFSM()
+
+        # When
+        results = dispatch_many(
+            [
+                (first_afsm, "open", ("blue",)),
+                (first_afsm, "open", ("orange",)),
+                (second_afsm, "describe", ()),
+                (second_afsm, "undeclared", ()),
+            ]
+        )
+
+        # Then
+        assert list(results) == ["blue", Rejection.REJECTED, "described", Rejection.REJECTED]
+        assert (first_afsm.current_state, second_afsm.current_state) == (_State.NEXT, _State.INITIAL)
+
+    def with_conflicting_handlers_fails(self) -> None:
+        # Then
+        with raises(ValueError):
+            # When
+            class AFSM(StateMixin, initial_state=_State.INITIAL):  # pylint: disable=unused-variable
+                @transition(from_=_State.INITIAL, to_=_State.NEXT, event="open")
+                def open(self) -> None:
+                    pass
+
+                @transition(from_=(_State.INITIAL, _State.NEXT), event="open")
+                def reopen(self) -> None:
+                    pass
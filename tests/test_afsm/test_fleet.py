@@ -0,0 +1,241 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from enum import auto
+from typing import Any, Type
+
+from pytest import importorskip, mark, raises
+
+from afsm import Fleet, Population, Retention, State, StateError, StateMixin, TimingWheel, transition
+
+importorskip("numpy")
+
+
+class _State(State):
+    INITIAL = auto()
+    NEXT = auto()
+    FINAL = auto()
+
+
+def _machine_class(compact: bool) -> Type[Any]:
+    class AFSM(StateMixin, initial_state=_State.INITIAL, compact=compact):
+        @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+        def to_next_state(self) -> None:
+            pass
+
+        @transition(from_=_State.NEXT, to_=_State.FINAL)
+        def to_final_state(self) -> None:
+            pass
+
+        @transition()
+        def to_same_state(self) -> None:
+            pass
+
+    return AFSM
+
+
+class TestFleet:
+    @mark.parametrize("compact", (False, True), ids=("compact:False", "compact:True"))
+    def with_initial_state_succeeds(self, compact: bool) -> None:
+        # Given
+        machine_class = _machine_class(compact)
+
+        # When
+        fleet = Fleet(machine_class, 3)
+
+        # Then
+        assert len(fleet) == 3
+        assert fleet.count(_State.INITIAL) == 3
+        assert fleet.state(0) is _State.INITIAL
+
+    @mark.parametrize("compact", (False, True), ids=("compact:False", "compact:True"))
+    def apply_to_selection_succeeds(self, compact: bool) -> None:
+        # Given
+        machine_class = _machine_class(compact)
+        fleet = Fleet(machine_class, 4)
+        fleet.apply("to_next_state", [0, 1, 2])
+
+        # When
+        rejected = fleet.apply(machine_class.to_final_state, slice(1, 4))
+
+        # Then
+        assert rejected.tolist() == [3]
+        assert [fleet.state(index) for index in range(4)] == [_State.NEXT, _State.FINAL, _State.FINAL, _State.INITIAL]
+
+    @mark.parametrize("compact", (False, True), ids=("compact:False", "compact:True"))
+    def apply_idempotent_transition_succeeds(self, compact: bool) -> None:
+        # Given
+        machine_class = _machine_class(compact)
+        fleet = Fleet(machine_class, 2)
+        fleet.apply("to_next_state", [0])
+
+        # When
+        rejected = fleet.apply("to_next_state")
+
+        # Then
+        assert rejected.tolist() == []
+        assert fleet.count(_State.NEXT) == 2
+
+    @mark.parametrize("compact", (False, True), ids=("compact:False", "compact:True"))
+    def apply_unconditional_transition_succeeds(self, compact: bool) -> None:
+        # Given
+        machine_class = _machine_class(compact)
+        fleet = Fleet(machine_class, 2)
+
+        # When
+        rejected = fleet.apply("to_same_state")
+
+        # Then
+        assert rejected.tolist() == []
+        assert fleet.count(_State.INITIAL) == 2
+
+    @mark.parametrize("compact", (False, True), ids=("compact:False", "compact:True"))
+    def apply_undecorated_method_fails(self, compact: bool) -> None:
+        # Given
+        machine_class = _machine_class(compact)
+        fleet = Fleet(machine_class, 2)
+
+        # Then
+        with raises(TypeError):
+            # When
+            fleet.apply("__init__")
+
+    @mark.parametrize("compact", (False, True), ids=("compact:False", "compact:True"))
+    def with_machines_succeeds(self, compact: bool) -> None:
+        # Given
+        machine_class = _machine_class(compact)
+        machines = [machine_class() for _ in range(3)]
+        machines[1].to_next_state()
+        fleet = Fleet.of(machine_class, machines)
+
+        # When
+        fleet.apply("to_final_state")
+        fleet.store(machines)
+
+        # Then
+        assert [machine.current_state for machine in machines] == [_State.INITIAL, _State.FINAL, _State.INITIAL]
+
+        with raises(StateError):
+            machines[1].to_final_state()
+
+    @mark.parametrize("compact", (False, True), ids=("compact:False", "compact:True"))
+    def store_tracked_machines_succeeds(self, compact: bool) -> None:
+        # Given
+        now = [0.0]
+        population = Population()
+        wheel = TimingWheel(tick=1, slots=8, clock=lambda: now[0])
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, compact=compact, population=population, timers=wheel):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+            @transition(from_=_State.NEXT, to_=_State.FINAL, timeout=5)
+            def to_final_state(self) -> None:
+                pass
+
+        machines = [AFSM() for _ in range(3)]
+        fleet = Fleet.of(AFSM, machines)
+        fleet.apply("to_next_state", [0, 1])
+
+        # When
+        fleet.store(machines)
+
+        # Then
+        assert population.counts() == {_State.INITIAL: 1, _State.NEXT: 2}
+
+        # When
+        now[0] = 5
+        wheel.advance()
+
+        # Then
+        assert [machine.current_state for machine in machines] == [_State.FINAL, _State.FINAL, _State.INITIAL]
+
+    @mark.parametrize("compact", (False, True), ids=("compact:False", "compact:True"))
+    def store_memoized_guard_results_succeeds(self, compact: bool) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.INITIAL, compact=compact):
+            def __init__(self) -> None:
+                self.ready = False
+
+            @transition(from_=_State.INITIAL, to_=_State.FINAL, guard=lambda afsm: afsm.ready, cache_guard=True)
+            def to_final_state(self) -> None:
+                pass
+
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+            @transition(from_=_State.NEXT, to_=_State.INITIAL)
+            def to_initial_state(self) -> None:
+                pass
+
+        afsm = AFSM()
+        afsm.to_final_state.try_(afsm)
+        afsm.ready = True
+        fleet = Fleet.of(AFSM, [afsm])
+
+        # When
+        fleet.apply("to_next_state")
+        fleet.store([afsm])
+        fleet.apply("to_initial_state")
+        fleet.store([afsm])
+        afsm.to_final_state()
+
+        # Then
+        assert afsm.current_state is _State.FINAL
+
+    @mark.parametrize("compact", (False, True), ids=("compact:False", "compact:True"))
+    def store_results_cleared_on_leave_succeeds(self, compact: bool) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.INITIAL, compact=compact):
+            @transition(
+                from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True, result_retention=Retention.CLEAR_ON_LEAVE
+            )
+            def open(self, value: str) -> str:
+                return value
+
+            @transition(from_=_State.NEXT, to_=_State.INITIAL)
+            def close(self) -> None:
+                pass
+
+        afsm = AFSM()
+        afsm.open("first")
+        fleet = Fleet.of(AFSM, [afsm])
+
+        # When
+        fleet.apply("close")
+        fleet.store([afsm])
+        fleet.apply("open")
+        fleet.store([afsm])
+
+        # Then
+        assert afsm.current_state is _State.NEXT
+        assert afsm.open("second") is None
+
+    @mark.parametrize("compact", (False, True), ids=("compact:False", "compact:True"))
+    def with_machine_in_transition_fails(self, compact: bool) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.INITIAL, thread_safe=True, compact=compact):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                Fleet.of(AFSM, [self])
+
+        # Then
+        with raises(ValueError):
+            # When
+            AFSM().to_next_state()
+
+    def apply_guarded_transition_fails(self) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, guard=lambda _: True)
+            def to_next_state(self) -> None:
+                pass
+
+        fleet = Fleet(AFSM, 2)
+
+        # Then
+        with raises(ValueError):
+            # When
+            fleet.apply("to_next_state")
+
+        assert fleet.count(_State.INITIAL) == 2
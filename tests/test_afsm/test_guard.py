@@ -0,0 +1,239 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from asyncio import run
+from enum import auto
+from typing import Any, Callable, List, cast
+
+from pytest import FixtureRequest, fixture, raises
+
+from afsm import GuardError, Rejection, State, StateError, StateMixin, TransientState, transition
+
+
+class _State(State):
+    INITIAL = auto()
+    APPROVED = auto()
+    REJECTED = auto()
+
+
+class TestGuard:
+    @fixture
+    def calls(self) -> List[str]:
+        return []
+
+    @fixture(
+        params=({}, {"compact": True}, {"thread_safe": True}),
+        ids=("default", "compact:True", "thread_safe:True"),
+    )
+    def machine_class(self, request: FixtureRequest, calls: List[str]) -> Callable[..., Any]:
+        def within_limit(instance: Any) -> bool:
+            calls.append("within_limit")
+            return cast(bool, instance.amount < instance.limit)
+
+        def positive(instance: Any) -> bool:
+            calls.append("positive")
+            return cast(bool, instance.amount > 0)
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, **request.param):
+            def __init__(self, amount: int, limit: int = 100) -> None:
+                self.amount = amount
+                self.limit = limit
+
+            @transition(from_=_State.INITIAL, to_=_State.APPROVED, guard=(positive, within_limit))
+            def approve(self) -> str:
+                calls.append("approve")
+                return "approved"
+
+            @transition(from_=_State.INITIAL, to_=_State.REJECTED)
+            def reject(self) -> None:
+                pass
+
+            @transition(from_=(_State.INITIAL, _State.APPROVED), to_=_State.INITIAL)
+            def reset(self) -> None:
+                pass
+
+            @transition(guard=within_limit, cache_guard=True)
+            def check(self) -> str:
+                return "checked"
+
+            @transition(from_=_State.INITIAL, to_=_State.APPROVED, guard=within_limit, cache_guard=True)
+            def approve_cached(self) -> str:
+                return "approved"
+
+        return cast(Callable[..., Any], AFSM)
+
+    def guard_holds_succeeds(self, machine_class: Any, calls: List[str]) -> None:
+        # Given
+        afsm = machine_class(10)
+
+        # When
+        result = afsm.approve()
+
+        # Then
+        assert result == "approved"
+        assert afsm.current_state is _State.APPROVED
+        assert calls == ["positive", "within_limit", "approve"]
+
+    def guard_does_not_hold_fails(self, machine_class: Any, calls: List[str]) -> None:
+        # Given
+        afsm = machine_class(0)
+
+        # Then
+        with raises(GuardError) as error:
+            # When
+            afsm.approve()
+
+        assert isinstance(error.value, StateError)
+        assert error.value.guard is not None and error.value.guard.__name__ == "positive"
+        assert error.value.actual_state is _State.INITIAL
+        assert "does not hold" in str(error.value)
+        assert afsm.current_state is _State.INITIAL
+        assert calls == ["positive"]
+
+    def raises_guard_error_with_message_only(self) -> None:
+        # Then
+        with raises(GuardError) as error:
+            # When
+            raise GuardError("message")
+
+        assert (error.value.class_, error.value.guard) == (None, None)
+        assert str(error.value) == "message"
+
+    def try_with_guard_not_holding_succeeds(self, machine_class: Any) -> None:
+        # Given
+        afsm = machine_class(200)
+
+        # When
+        result = machine_class.approve.try_(afsm)
+
+        # Then
+        assert result is Rejection.REJECTED
+        assert afsm.current_state is _State.INITIAL
+
+    def guard_in_unexpected_state_fails(self, machine_class: Any, calls: List[str]) -> None:
+        # Given
+        afsm = machine_class(10)
+        afsm.reject()
+
+        # Then
+        with raises(StateError) as error:
+            # When
+            afsm.approve()
+
+        assert not isinstance(error.value, GuardError)
+        assert not calls
+
+    def cached_guard_succeeds(self, machine_class: Any, calls: List[str]) -> None:
+        # Given
+        afsm = machine_class(10)
+
+        # When
+        afsm.check()
+        afsm.check()
+
+        # Then
+        assert calls == ["within_limit"]
+
+        # When
+        afsm.approve_cached()
+
+        # Then
+        assert calls == ["within_limit"]
+        assert afsm.current_state is _State.APPROVED
+
+    def cached_guard_after_state_change_succeeds(self, machine_class: Any, calls: List[str]) -> None:
+        # Given
+        afsm = machine_class(10)
+        afsm.check()
+        afsm.approve()
+        afsm.amount = 1000
+
+        # Then
+        with raises(GuardError):
+            # When
+            afsm.check()
+
+        assert calls == ["within_limit", "positive", "within_limit", "approve", "within_limit"]
+
+    def cached_guard_clear_succeeds(self, machine_class: Any, calls: List[str]) -> None:
+        # Given
+        afsm = machine_class(1000)
+        assert machine_class.check.try_(afsm) is Rejection.REJECTED
+        afsm.amount = 10
+
+        # When
+        machine_class.check.guard_clear(afsm)
+        result = afsm.check()
+
+        # Then
+        assert result == "checked"
+        assert calls == ["within_limit", "within_limit"]
+
+    def cached_guard_with_builtin_parameter_name_succeeds(self) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.APPROVED, guard=lambda _: True, cache_guard=True)
+            def approve(self, bool: int) -> int:  # pylint: disable=redefined-builtin # Shadows a builtin of the wrapper
+                return bool
+
+        afsm = AFSM()
+
+        # When
+        result = afsm.approve(1)
+
+        # Then
+        assert result == 1
+        assert afsm.current_state is _State.APPROVED
+
+    def async_guard_succeeds(self) -> None:
+        # Given
+        def allowed(instance: Any) -> bool:
+            return cast(bool, instance.allowed)
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, serialize_async=True):
+            def __init__(self, allowed: bool) -> None:
+                self.allowed = allowed
+
+            @transition(from_=_State.INITIAL, to_=_State.APPROVED, guard=allowed)
+            async def approve(self) -> str:
+                return "approved"
+
+        afsm = AFSM(False)
+
+        # Then
+        with raises(GuardError):
+            # When
+            run(afsm.approve())
+
+        # When
+        afsm.allowed = True
+
+        # Then
+        assert run(afsm.approve()) == "approved"
+
+    def raising_guard_in_thread_safe_machine_fails(self) -> None:
+        # Given
+        states: List[Any] = []
+
+        def failing(instance: Any) -> bool:
+            states.append(instance.current_state)
+            raise RuntimeError("Guard failed")
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, thread_safe=True):
+            @transition(from_=_State.INITIAL, to_=_State.APPROVED, guard=failing)
+            def approve(self) -> None:
+                pass
+
+        afsm = AFSM()
+
+        # Then
+        with raises(RuntimeError):
+            # When
+            afsm.approve()
+
+        assert states == [TransientState.IN_TRANSITION]
+        assert afsm.current_state is _State.INITIAL
+
+    def cache_guard_without_guard_fails(self) -> None:
+        # Then
+        with raises(ValueError):
+            # When
+            transition(from_=_State.INITIAL, cache_guard=True)
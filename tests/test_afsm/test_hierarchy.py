@@ -0,0 +1,390 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from asyncio import run
+from enum import auto
+from types import new_class
+from typing import AbstractSet, Any, Callable, Dict, Optional, cast
+
+from pytest import FixtureRequest, fixture, raises
+
+from afsm import (
+    Rejection,
+    Retention,
+    State,
+    StateError,
+    StateMixin,
+    TransientState,
+    TransitionTable,
+    dispatch_many,
+    transition,
+)
+
+
+class _Order(State):
+    NEW = auto()
+    FULFILLING = auto()
+    DONE = auto()
+
+
+class _Payment(State, parent=_Order.FULFILLING):
+    PENDING = auto()
+    PAID = auto()
+
+
+class _Shipping(State, parent=_Order.FULFILLING):
+    PACKING = auto()
+    SHIPPED = auto()
+
+
+class _Delivery(State, parent=_Shipping.SHIPPED):
+    IN_TRANSIT = auto()
+    DELIVERED = auto()
+
+
+class _Flat(State):
+    INITIAL = auto()
+
+
+def _active_states(machine: StateMixin) -> AbstractSet[State]:
+    active_states = machine.current_state
+    assert isinstance(active_states, frozenset)
+    return active_states
+
+
+class TestHierarchy:  # pylint: disable=too-many-public-methods # One method per test case
+    @fixture(params=(False, True), ids=("thread_safe:False", "thread_safe:True"))
+    def machine_class(self, request: FixtureRequest) -> Callable[..., Any]:
+        class AFSM(StateMixin, initial_state=_Order.NEW, thread_safe=request.param):
+            @transition(from_=_Order.NEW, to_=_Order.FULFILLING, event="start")
+            def start(self) -> None:
+                pass
+
+            @transition(
+                from_=_Payment.PENDING,
+                to_=_Payment.PAID,
+                is_idempotent=True,
+                result_retention=Retention.CLEAR_ON_LEAVE,
+                event="pay",
+            )
+            def pay(self, amount: int) -> int:
+                return amount
+
+            @transition(from_=_Shipping.PACKING, to_=_Shipping.SHIPPED, event="ship")
+            def ship(self) -> None:
+                pass
+
+            @transition(from_=_Delivery.IN_TRANSIT, to_=_Delivery.DELIVERED)
+            def deliver(self) -> None:
+                pass
+
+            @transition(from_=_Order.NEW, to_=_Delivery.DELIVERED)
+            def deliver_directly(self) -> None:
+                pass
+
+            @transition(from_=_Order.FULFILLING, to_=_Order.DONE, event="cancel")
+            def finish(self) -> None:
+                pass
+
+            @transition(from_=_Payment.PENDING, to_=_Order.NEW, event="cancel")
+            def cancel_payment(self) -> None:
+                pass
+
+        return cast(Callable[..., Any], AFSM)
+
+    def initial_configuration_succeeds(self, machine_class: Any) -> None:
+        # When
+        afsm = machine_class()
+
+        # Then
+        assert afsm.current_state == {_Order.NEW}
+        assert str(afsm.current_state) == "NEW"
+
+    def enter_composite_state_succeeds(self, machine_class: Any) -> None:
+        # Given
+        afsm = machine_class()
+
+        # When
+        afsm.start()
+
+        # Then
+        assert afsm.current_state == {_Order.FULFILLING, _Payment.PENDING, _Shipping.PACKING}
+        assert str(afsm.current_state) == "FULFILLING, PENDING, PACKING"
+
+    def transitions_in_orthogonal_regions_succeeds(self, machine_class: Any) -> None:
+        # Given
+        afsm = machine_class()
+        afsm.start()
+
+        # When
+        afsm.ship()
+        afsm.pay(10)
+        afsm.deliver()
+
+        # Then
+        assert afsm.current_state == {
+            _Order.FULFILLING,
+            _Payment.PAID,
+            _Shipping.SHIPPED,
+            _Delivery.DELIVERED,
+        }
+
+    def enter_nested_state_directly_succeeds(self, machine_class: Any) -> None:
+        # Given
+        afsm = machine_class()
+
+        # When
+        afsm.deliver_directly()
+
+        # Then
+        assert afsm.current_state == {_Order.FULFILLING, _Payment.PENDING, _Shipping.SHIPPED, _Delivery.DELIVERED}
+
+    def from_composite_state_succeeds(self, machine_class: Any) -> None:
+        # Given
+        afsm = machine_class()
+        afsm.start()
+        afsm.ship()
+
+        # When
+        afsm.finish()
+
+        # Then
+        assert afsm.current_state == {_Order.DONE}
+
+    def transition_table_succeeds(self, machine_class: Any) -> None:
+        # Given
+        afsm = machine_class()
+        table = TransitionTable.of(machine_class)
+
+        # When
+        afsm.start()
+
+        # Then
+        assert table.available(afsm.current_state) == ("pay", "ship", "finish", "cancel_payment")
+        assert table.allows(afsm.current_state, "ship")
+        assert table.allows(afsm.current_state, "finish")
+        assert not table.allows(afsm.current_state, "start")
+        assert not table.allows(afsm.current_state, "deliver")
+
+    def from_inactive_state_fails(self, machine_class: Any) -> None:
+        # Given
+        afsm = machine_class()
+        afsm.start()
+        afsm.ship()
+
+        # Then
+        with raises(StateError) as error:
+            # When
+            afsm.ship()
+
+        assert error.value.expected_states == (_Shipping.PACKING,)
+        assert error.value.actual_state == {
+            _Order.FULFILLING,
+            _Payment.PENDING,
+            _Shipping.SHIPPED,
+            _Delivery.IN_TRANSIT,
+        }
+        assert machine_class.ship.try_(afsm) is Rejection.REJECTED
+
+    def idempotent_transition_clears_result_on_leave_succeeds(self, machine_class: Any) -> None:
+        # Given
+        afsm = machine_class()
+        afsm.start()
+        assert afsm.pay(10) == 10
+        assert afsm.pay(20) == 10
+
+        # When
+        afsm.ship()
+
+        # Then
+        assert afsm.pay(30) == 10
+
+        # When
+        afsm.finish()
+
+        # Then
+        assert afsm._return_values == {}  # pylint: disable=protected-access
+
+    def dispatch_succeeds(self, machine_class: Any) -> None:
+        # Given
+        afsm = machine_class()
+
+        # When
+        afsm.dispatch("start")
+        afsm.dispatch("pay", 10)
+
+        # Then
+        assert afsm.current_state == {_Order.FULFILLING, _Payment.PAID, _Shipping.PACKING}
+        assert list(dispatch_many([(afsm, "pay", (20,)), (afsm, "start", ())])) == [10, Rejection.REJECTED]
+
+        with raises(StateError):
+            afsm.dispatch("start")
+
+    def dispatch_to_innermost_state_succeeds(self, machine_class: Any) -> None:
+        # Given
+        pending = machine_class()
+        pending.start()
+        paid = machine_class()
+        paid.start()
+        paid.pay(10)
+
+        # When
+        pending.dispatch("cancel")
+        paid.dispatch("cancel")
+
+        # Then
+        assert pending.current_state == {_Order.NEW}
+        assert paid.current_state == {_Order.DONE}
+
+    def dispatch_with_many_regions_succeeds(self) -> None:
+        # Given
+        class Device(State):
+            OFF = auto()
+            ON = auto()
+
+        def region(index: int) -> Any:
+            def members(namespace: Dict[str, Any]) -> None:
+                namespace["IDLE"] = f"IDLE_{index}"
+                namespace["BUSY"] = f"BUSY_{index}"
+
+            return new_class(f"Region{index}", (State,), {"parent": Device.ON}, members)
+
+        regions = [region(index) for index in range(24)]
+
+        class AFSM(StateMixin, initial_state=Device.OFF):
+            @transition(from_=Device.OFF, to_=Device.ON, event="toggle")
+            def switch_on(self) -> None:
+                pass
+
+            @transition(from_=regions[-1].IDLE, to_=regions[-1].BUSY, event="work")
+            def work(self) -> None:
+                pass
+
+            @transition(from_=Device.ON, to_=Device.OFF, event="toggle")
+            def switch_off(self) -> None:
+                pass
+
+        afsm = AFSM()
+
+        # When
+        afsm.dispatch("toggle")
+        afsm.dispatch("work")
+
+        # Then
+        assert regions[-1].BUSY in _active_states(afsm)
+        assert regions[0].IDLE in _active_states(afsm)
+
+        with raises(StateError):
+            afsm.dispatch("work")
+
+        afsm.dispatch("toggle")
+        assert _active_states(afsm) == {Device.OFF}
+
+    def region_defined_after_lookup_succeeds(self) -> None:
+        # Given
+        class Device(State):
+            OFF = auto()
+            ON = auto()
+
+        class Power(State, parent=Device.ON):
+            LOW = auto()
+            HIGH = auto()
+
+        class AFSM(StateMixin, initial_state=Device.OFF):
+            @transition(from_=Device.OFF, to_=Power.HIGH)
+            def switch_on(self) -> None:
+                pass
+
+        class Mode(State, parent=Device.ON):
+            MANUAL = auto()
+            AUTOMATIC = auto()
+
+        # When
+        class ASubFSM(AFSM):
+            @transition(from_=Mode.MANUAL, to_=Mode.AUTOMATIC)
+            def automate(self) -> None:
+                pass
+
+        afsm = ASubFSM()
+        afsm.switch_on()
+        afsm.automate()
+
+        # Then
+        assert _active_states(afsm) == {Device.ON, Power.HIGH, Mode.AUTOMATIC}
+
+    def async_transition_succeeds(self) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_Order.NEW, serialize_async=True):
+            @transition(from_=_Order.NEW, to_=_Payment.PAID)
+            async def pay(self) -> str:
+                return "paid"
+
+        afsm = AFSM()
+
+        # When
+        result = run(afsm.pay())
+
+        # Then
+        assert result == "paid"
+        assert _active_states(afsm) == {_Order.FULFILLING, _Payment.PAID, _Shipping.PACKING}
+
+    def thread_safe_transition_in_transition_succeeds(self) -> None:
+        # Given
+        states = []
+
+        class AFSM(StateMixin, initial_state=_Order.NEW, thread_safe=True):
+            @transition(from_=_Order.NEW, to_=_Order.FULFILLING)
+            def start(self) -> None:
+                states.append(self.current_state)
+
+        afsm = AFSM()
+
+        # When
+        afsm.start()
+
+        # Then
+        assert states == [TransientState.IN_TRANSITION]
+        assert _active_states(afsm) == {_Order.FULFILLING, _Payment.PENDING, _Shipping.PACKING}
+
+    def with_flat_states_succeeds(self) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_Flat.INITIAL):
+            pass
+
+        # Then
+        assert AFSM().current_state is _Flat.INITIAL
+
+    def with_nested_initial_state_succeeds(self) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_Shipping.SHIPPED):
+            pass
+
+        # Then
+        assert _active_states(AFSM()) == {_Order.FULFILLING, _Payment.PENDING, _Shipping.SHIPPED, _Delivery.IN_TRANSIT}
+
+    @fixture(params=(None, {"compact": True}), ids=("initial_state:None", "compact:True"))
+    def invalid_options(self, request: FixtureRequest) -> Optional[Dict[str, Any]]:
+        return cast(Optional[Dict[str, Any]], request.param)
+
+    def with_invalid_options_fails(self, invalid_options: Optional[Dict[str, Any]]) -> None:
+        # Then
+        with raises(ValueError):
+            # When
+            class AFSM(StateMixin, **(invalid_options or {"initial_state": None})):  # pylint: disable=unused-variable
+                @transition(from_=_Order.NEW, to_=_Payment.PAID)
+                def pay(self) -> None:
+                    pass
+
+    def with_state_outside_hierarchy_fails(self) -> None:
+        # Then
+        with raises(ValueError, match="outside"):
+            # When
+            class AFSM(StateMixin, initial_state=_Order.NEW):  # pylint: disable=unused-variable
+                @transition(from_=_Flat.INITIAL, to_=_Payment.PAID)
+                def pay(self) -> None:
+                    pass
+
+    def with_invalid_parent_fails(self) -> None:
+        # Then
+        with raises(TypeError):
+            # When
+            class Region(State, parent="parent"):  # pylint: disable=unused-variable
+                STATE = auto()
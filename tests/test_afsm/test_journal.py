@@ -0,0 +1,284 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from enum import auto
+from operator import attrgetter
+from pathlib import Path
+from time import sleep
+from typing import Any, Callable, Dict, Iterator, List, Tuple, cast
+
+from pytest import FixtureRequest, fixture, raises
+
+from afsm import Journal, JournalRecord, State, StateError, StateMixin, transition
+
+
+class _State(State):
+    INITIAL = auto()
+    NEXT = auto()
+    FINAL = auto()
+
+
+class _Phase(State):
+    NEXT = auto()
+
+
+class TestJournal:
+    @fixture
+    def journal(self, tmp_path: Path) -> Iterator[Journal]:
+        with Journal(str(tmp_path / "machines.journal"), key=attrgetter("name")) as journal:
+            yield journal
+
+    @fixture(params=(False, True), ids=("compact:False", "compact:True"))
+    def machine_class(self, request: FixtureRequest, journal: Journal) -> Callable[..., Any]:
+        class AFSM(StateMixin, initial_state=_State.INITIAL, compact=request.param, journal=journal):
+            def __init__(self, name: str) -> None:
+                self.name = name
+
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+            def to_next_state(self) -> None:
+                pass
+
+            @transition(from_=_State.NEXT, to_=_State.FINAL)
+            def to_final_state(self, value: str) -> None:
+                if value:
+                    raise ValueError(value)
+
+        return cast(Callable[..., Any], AFSM)
+
+    def record_succeeds(self, machine_class: Any, journal: Journal) -> None:
+        # Given
+        afsm = machine_class("first")
+        afsm.to_next_state()
+        afsm.to_next_state()
+
+        with raises(StateError):
+            machine_class("second").to_final_state("")
+
+        with raises(ValueError):
+            afsm.to_final_state("red")
+
+        # When
+        afsm.to_final_state("")
+        journal.flush()
+
+        # Then
+        class_name = f"{machine_class.__module__}.{machine_class.__qualname__}"
+        assert [record[1:] for record in Journal.read(journal.path)] == [
+            (class_name, "first", "to_next_state", "_State.INITIAL", "_State.NEXT"),
+            (class_name, "first", "to_final_state", "_State.NEXT", "_State.FINAL"),
+        ]
+        assert all(isinstance(record, JournalRecord) and record.time > 0 for record in Journal.read(journal.path))
+
+    def record_to_full_buffer_succeeds(self, tmp_path: Path) -> None:
+        # Given
+        journal = Journal(str(tmp_path / "machines.journal"), key=id, buffer_size=2)
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, journal=journal):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+        try:
+            # When
+            for _ in range(3):
+                AFSM().to_next_state()
+
+            # Then
+            assert len(list(Journal.read(journal.path))) == 2
+        finally:
+            journal.close()
+
+        assert len(list(Journal.read(journal.path))) == 3
+
+    def record_with_unserializable_key_succeeds(self, tmp_path: Path) -> None:
+        # Given
+        errors: List[BaseException] = []
+        journal = Journal(
+            str(tmp_path / "machines.journal"), key=attrgetter("name"), buffer_size=1, on_error=errors.append
+        )
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, journal=journal):
+            def __init__(self, name: Dict[str, Any]) -> None:
+                self.name = name
+
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+        name: Dict[str, Any] = {"first": object()}
+        afsm = AFSM(name)
+
+        try:
+            # When
+            afsm.to_next_state()
+
+            # Then
+            assert afsm.current_state is _State.NEXT
+            assert [type(error) for error in errors] == [TypeError]
+            assert not list(Journal.read(journal.path))
+
+            with raises(TypeError):
+                journal.flush()
+
+            name["first"] = 1
+        finally:
+            journal.close()
+
+        assert [record.key for record in Journal.read(journal.path)] == [{"first": 1}]
+
+    def record_with_flush_interval_succeeds(self, tmp_path: Path) -> None:
+        # Given
+        journal = Journal(str(tmp_path / "machines.journal"), key=id, flush_interval=0.01)
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, journal=journal):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+        try:
+            # When
+            AFSM().to_next_state()
+
+            for _ in range(500):
+                if list(Journal.read(journal.path)):
+                    break
+
+                sleep(0.01)
+
+            # Then
+            assert len(list(Journal.read(journal.path))) == 1
+        finally:
+            journal.close()
+
+    def replay_succeeds(self, machine_class: Any, journal: Journal) -> None:
+        # Given
+        first = machine_class("first")
+        first.to_next_state()
+        first.to_final_state("")
+        machine_class("second").to_next_state()
+        machine_class("unknown").to_next_state()
+        journal.close()
+        machines = {name: machine_class(name) for name in ("first", "second", "third")}
+
+        # When
+        replayed = Journal.replay(journal.path, machines)
+
+        # Then
+        assert replayed == 3
+        assert [machine.current_state for machine in machines.values()] == [_State.FINAL, _State.NEXT, _State.INITIAL]
+
+        with raises(StateError):
+            machines["first"].to_final_state("")
+
+    def replay_tuple_keys_succeeds(self, tmp_path: Path) -> None:
+        # Given
+        journal = Journal(str(tmp_path / "machines.journal"), key=attrgetter("name"))
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, journal=journal):
+            def __init__(self, name: Tuple[Any, ...]) -> None:
+                self.name = name
+
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+        AFSM(("first", (1, 2))).to_next_state()
+        journal.close()
+        machines = {("first", (1, 2)): AFSM(("first", (1, 2)))}
+
+        # When
+        replayed = Journal.replay(journal.path, machines)
+
+        # Then
+        assert replayed == 1
+        assert [record.key for record in Journal.read(journal.path)] == [("first", (1, 2))]
+        assert machines["first", (1, 2)].current_state is _State.NEXT
+
+    def replay_states_sharing_names_succeeds(self, tmp_path: Path) -> None:
+        # Given
+        journal = Journal(str(tmp_path / "machines.journal"), key=attrgetter("name"))
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, journal=journal):
+            def __init__(self, name: str) -> None:
+                self.name = name
+
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+            @transition(from_=_State.NEXT, to_=_Phase.NEXT)
+            def to_next_phase(self) -> None:
+                pass
+
+        first, second = AFSM("first"), AFSM("second")
+        first.to_next_state()
+        second.to_next_state()
+        second.to_next_phase()
+        journal.close()
+        machines = {"first": AFSM("first"), "second": AFSM("second")}
+
+        # When
+        replayed = Journal.replay(journal.path, machines)
+
+        # Then
+        assert replayed == 3
+        assert machines["first"].current_state is _State.NEXT
+        assert machines["second"].current_state is _Phase.NEXT
+
+    def replay_memoized_guard_results_succeeds(self, tmp_path: Path) -> None:
+        # Given
+        journal = Journal(str(tmp_path / "machines.journal"), key=attrgetter("name"))
+
+        class AFSM(StateMixin, initial_state=_State.INITIAL, journal=journal):
+            def __init__(self, name: str) -> None:
+                self.name = name
+                self.ready = False
+
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+            @transition(from_=_State.NEXT, to_=_State.INITIAL)
+            def to_initial_state(self) -> None:
+                pass
+
+            @transition(from_=_State.INITIAL, to_=_State.FINAL, guard=lambda afsm: afsm.ready, cache_guard=True)
+            def to_final_state(self) -> None:
+                pass
+
+        recorded = AFSM("first")
+        recorded.to_next_state()
+        recorded.to_initial_state()
+        journal.close()
+        afsm = AFSM("first")
+        afsm.to_final_state.try_(afsm)
+        afsm.ready = True
+
+        # When
+        replayed = Journal.replay(journal.path, {"first": afsm})
+        afsm.to_final_state()
+
+        # Then
+        assert replayed == 2
+        assert afsm.current_state is _State.FINAL
+
+    def replay_other_class_succeeds(self, machine_class: Any, journal: Journal) -> None:
+        # Given
+        class AnotherFSM(StateMixin, initial_state=_State.INITIAL):
+            def __init__(self, name: str) -> None:
+                self.name = name
+
+        machine_class("first").to_next_state()
+        journal.close()
+        machines = {"first": AnotherFSM("first")}
+
+        # When
+        replayed = Journal.replay(journal.path, machines)
+
+        # Then
+        assert replayed == 0
+        assert machines["first"].current_state is _State.INITIAL
+
+    def with_invalid_buffer_size_fails(self, tmp_path: Path) -> None:
+        # Then
+        with raises(ValueError):
+            # When
+            Journal(str(tmp_path / "machines.journal"), key=id, buffer_size=0)
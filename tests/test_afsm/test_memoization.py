@@ -0,0 +1,251 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring,too-few-public-methods
+from enum import auto
+from gc import collect
+from typing import Any, Callable, List, Optional, Tuple, cast
+from unittest.mock import Mock
+
+from pytest import mark, raises
+
+from afsm import CacheInfo, CacheScope, Retention, State, StateMixin, transition
+from afsm._state import StateField
+
+
+class _State(State):
+    INITIAL = auto()
+    NEXT = auto()
+    FINAL = auto()
+
+
+class _Payload:
+    pass
+
+
+class TestResultRetention:
+    def without_idempotency_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> _Payload:
+                return _Payload()
+
+        afsm = AFSM()
+
+        # When
+        afsm.to_next_state()
+
+        # Then
+        assert getattr(afsm, StateField.RETURN_VALUES.value) is None
+
+    def returns_weakly_retained_result(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True, result_retention=Retention.WEAK)
+            def to_next_state(self, payload: object) -> object:
+                return payload
+
+        afsm = AFSM()
+        payload = _Payload()
+
+        # When
+        first_result = afsm.to_next_state(payload)
+        second_result = afsm.to_next_state(_Payload())
+
+        # Then
+        assert first_result is payload
+        assert second_result is payload
+
+    def returns_none_when_weakly_retained_result_is_collected(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL, result_retention=Retention.WEAK):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+            def to_next_state(self) -> _Payload:
+                return _Payload()
+
+        afsm = AFSM()
+
+        # When
+        afsm.to_next_state()
+        collect()
+        result = afsm.to_next_state()
+
+        # Then
+        assert result is None
+
+    def returns_strongly_retained_result_without_weak_reference_support(
+        self, class_decorator: Callable[..., Any]
+    ) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL, result_retention=Retention.WEAK):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+            def to_next_state(self, value: str) -> str:
+                return value
+
+        afsm = AFSM()
+
+        # When
+        afsm.to_next_state("blue")
+        result = afsm.to_next_state("orange")
+
+        # Then
+        assert result == "blue"
+
+    @mark.parametrize(
+        "retention, expected_result",
+        ((Retention.STRONG, "blue"), (Retention.CLEAR_ON_LEAVE, None)),
+        ids=("retention:STRONG", "retention:CLEAR_ON_LEAVE"),
+    )
+    def returns_result_after_leaving_and_reentering_state(
+        self, class_decorator: Callable[..., Any], retention: Retention, expected_result: Optional[str]
+    ) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL, result_retention=retention):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+            def to_next_state(self, value: str) -> str:
+                return value
+
+            @transition(from_=_State.NEXT, to_=_State.FINAL)
+            def to_final_state(self) -> None:
+                pass
+
+            @transition(from_=_State.FINAL, to_=_State.NEXT)
+            def back_to_next_state(self) -> None:
+                pass
+
+        afsm = AFSM()
+        afsm.to_next_state("blue")
+        afsm.to_final_state()
+        afsm.back_to_next_state()
+
+        # When
+        result = afsm.to_next_state("orange")
+
+        # Then
+        assert result == expected_result
+
+    def with_inherited_transition_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        class BaseAFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+            def to_next_state(self) -> str:
+                return "blue"
+
+            @transition(from_=_State.NEXT, to_=_State.FINAL)
+            def to_final_state(self) -> None:
+                pass
+
+        @class_decorator
+        class AFSM(BaseAFSM, result_retention=Retention.CLEAR_ON_LEAVE):
+            pass
+
+        afsm = AFSM()
+        afsm.to_next_state()
+
+        # When
+        afsm.to_final_state()
+
+        # Then
+        assert getattr(afsm, StateField.RETURN_VALUES.value) == {}
+
+
+class TestResultMemoization:
+    def returns_memoized_result_for_same_arguments(
+        self, class_decorator: Callable[..., Any], identity_function: Mock
+    ) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True, cache_size=2)
+            def to_next_state(self, value: str) -> str:
+                return cast(str, identity_function(value))
+
+        afsm = AFSM()
+
+        # When
+        results = [afsm.to_next_state(value) for value in ("blue", "orange", "blue", "orange")]
+
+        # Then
+        assert results == ["blue", "orange", "blue", "orange"]
+        assert identity_function.call_count == 2
+        assert AFSM.to_next_state.cache_info(afsm) == CacheInfo(hits=2, misses=2, maxsize=2, currsize=2)
+
+    @mark.parametrize("cache_scope", (CacheScope.INSTANCE, CacheScope.CLASS), ids=("instance", "class"))
+    def raises_type_error_for_unhashable_arguments(
+        self, class_decorator: Callable[..., Any], identity_function: Mock, cache_scope: CacheScope
+    ) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(
+                from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True, cache_size=2, cache_scope=cache_scope
+            )
+            def to_next_state(self, value: List[str]) -> List[str]:
+                return cast(List[str], identity_function(value))
+
+        afsm = AFSM()
+
+        # Then
+        with raises(TypeError):
+            # When
+            afsm.to_next_state(["blue"])
+
+        identity_function.assert_not_called()
+        assert afsm.current_state is _State.INITIAL
+
+    def calls_method_for_evicted_arguments(self, class_decorator: Callable[..., Any], identity_function: Mock) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True, cache_size=1)
+            def to_next_state(self, **kwargs: str) -> str:
+                return cast(str, identity_function(kwargs["value"]))
+
+        afsm = AFSM()
+
+        # When
+        afsm.to_next_state(value="blue")
+        afsm.to_next_state(value="orange")
+        afsm.to_next_state(value="blue")
+
+        # Then
+        assert identity_function.call_count == 3
+        assert AFSM.to_next_state.cache_info(afsm) == CacheInfo(hits=0, misses=3, maxsize=1, currsize=1)
+
+    def returns_result_memoized_by_same_instance_only(
+        self, class_decorator: Callable[..., Any], identity_function: Mock
+    ) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(
+                from_=_State.INITIAL,
+                to_=_State.NEXT,
+                is_idempotent=True,
+                cache_size=2,
+                cache_scope=CacheScope.CLASS,
+            )
+            def to_next_state(self, value: str) -> Tuple[Any, str]:
+                return cast(Tuple[Any, str], identity_function((self, value)))
+
+        first_afsm, second_afsm = AFSM(), AFSM()
+
+        afsms = (first_afsm, second_afsm, first_afsm)
+
+        # When
+        results = [afsm.to_next_state("blue") for afsm in afsms]
+
+        # Then
+        assert all(result[0] is afsm for result, afsm in zip(results, afsms))
+        assert results[2] is results[0]
+        assert identity_function.call_count == 2
+        assert AFSM.to_next_state.cache_info() == CacheInfo(hits=1, misses=2, maxsize=2, currsize=2)
+
+    def raises_on_cache_size_without_idempotency(self) -> None:
+        # Then
+        with raises(ValueError):
+            # When
+            transition(from_=_State.INITIAL, to_=_State.NEXT, cache_size=2)
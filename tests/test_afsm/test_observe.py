@@ -0,0 +1,204 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from enum import auto
+from typing import Any, Callable, Iterator, cast
+
+from pytest import FixtureRequest, fixture, raises
+
+from afsm import LatencyHistogram, State, StateError, StateMixin, TransitionMetrics, observe, transition, unobserve
+
+
+class _State(State):
+    INITIAL = auto()
+    NEXT = auto()
+    FINAL = auto()
+
+
+def _handle_exception(_: Any, __: Exception) -> str:
+    return "handled"
+
+
+def _reraise_exception(_: Any, exception: Exception) -> None:
+    raise RuntimeError("reraised") from exception
+
+
+class TestTransitionMetrics:
+    @fixture(params=(False, True), ids=("compact:False", "compact:True"))
+    def machine_class(self, request: FixtureRequest) -> Callable[..., Any]:
+        class AFSM(StateMixin, initial_state=_State.INITIAL, compact=request.param):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+            @transition(from_=_State.NEXT, to_=_State.FINAL)
+            def to_final_state(self, value: str) -> None:
+                raise ValueError(value)
+
+            @transition(from_=_State.NEXT, to_=_State.FINAL, on_exception=_handle_exception)
+            def to_final_state_handled(self) -> None:
+                raise ValueError()
+
+            @transition(from_=_State.NEXT, to_=_State.FINAL, on_exception=_reraise_exception)
+            def to_final_state_reraised(self) -> None:
+                raise ValueError()
+
+            @transition()
+            def to_same_state(self) -> None:
+                pass
+
+        return cast(Callable[..., Any], AFSM)
+
+    @fixture
+    def metrics(self, machine_class: Any) -> Iterator[TransitionMetrics]:
+        metrics = TransitionMetrics()
+        observe(metrics, machine_class)
+        yield metrics
+        unobserve(metrics, machine_class)
+
+    def to_next_state_succeeds(self, machine_class: Any, metrics: TransitionMetrics) -> None:
+        # Given
+        afsm = machine_class()
+
+        # When
+        afsm.to_next_state()
+        afsm.to_same_state()
+
+        # Then
+        assert metrics.transitions == {
+            (machine_class, _State.INITIAL, _State.NEXT): 1,
+            (machine_class, _State.NEXT, _State.NEXT): 1,
+        }
+        assert metrics.latencies[machine_class, "to_next_state"].count == 1
+        assert afsm.current_state is _State.NEXT
+
+    def from_unexpected_state_fails(self, machine_class: Any, metrics: TransitionMetrics) -> None:
+        # Given
+        afsm = machine_class()
+
+        # Then
+        with raises(StateError):
+            # When
+            afsm.to_final_state("red")
+
+        assert metrics.rejections == {(machine_class, "to_final_state", _State.INITIAL): 1}
+        assert not metrics.transitions
+
+    def raises_on_unhandled_exception(self, machine_class: Any, metrics: TransitionMetrics) -> None:
+        # Given
+        afsm = machine_class()
+        afsm.to_next_state()
+
+        # Then
+        with raises(ValueError, match="red"):
+            # When
+            afsm.to_final_state("red")
+
+        assert metrics.exceptions == {(machine_class, "to_final_state", _State.NEXT): 1}
+        assert metrics.latencies[machine_class, "to_final_state"].count == 1
+
+    def calls_observer_on_handled_exception(self, machine_class: Any, metrics: TransitionMetrics) -> None:
+        # Given
+        afsm = machine_class()
+        afsm.to_next_state()
+
+        # When
+        result = afsm.to_final_state_handled()
+
+        # Then
+        assert result == "handled"
+        assert metrics.exceptions == {(machine_class, "to_final_state_handled", _State.NEXT): 1}
+        assert metrics.transitions[machine_class, _State.NEXT, _State.FINAL] == 1
+
+    def raises_on_exception_handler_exception(self, machine_class: Any, metrics: TransitionMetrics) -> None:
+        # Given
+        afsm = machine_class()
+        afsm.to_next_state()
+
+        # Then
+        with raises(RuntimeError, match="reraised"):
+            # When
+            afsm.to_final_state_reraised()
+
+        assert metrics.exceptions == {(machine_class, "to_final_state_reraised", _State.NEXT): 1}
+        assert metrics.latencies[machine_class, "to_final_state_reraised"].count == 1
+
+    def unobserve_succeeds(self, machine_class: Any) -> None:
+        # Given
+        metrics = TransitionMetrics()
+        observe(metrics, machine_class)
+
+        # When
+        unobserve(metrics, machine_class)
+        machine_class().to_next_state()
+
+        # Then
+        assert not metrics.transitions
+        assert not machine_class.to_next_state.__class_options__.observers
+
+    def unobserve_unregistered_observer_fails(self, machine_class: Any) -> None:
+        # Then
+        with raises(ValueError):
+            # When
+            unobserve(TransitionMetrics(), machine_class)
+
+    def with_sampling_succeeds(self, machine_class: Any) -> None:
+        # Given
+        metrics = TransitionMetrics(sample_every=2)
+        observe(metrics, machine_class)
+
+        try:
+            # When
+            for _ in range(4):
+                machine_class().to_next_state()
+        finally:
+            unobserve(metrics, machine_class)
+
+        # Then
+        assert metrics.transitions[machine_class, _State.INITIAL, _State.NEXT] == 4
+        assert metrics.latencies[machine_class, "to_next_state"].count == 2
+
+    def with_invalid_sampling_fails(self) -> None:
+        # Then
+        with raises(ValueError):
+            # When
+            TransitionMetrics(sample_every=0)
+
+    def global_observer_succeeds(self) -> None:
+        # Given
+        metrics = TransitionMetrics()
+        observe(metrics)
+
+        try:
+            # When
+            class AFSM(StateMixin, initial_state=_State.INITIAL):
+                @transition(from_=_State.INITIAL, to_=_State.NEXT)
+                def to_next_state(self) -> None:
+                    pass
+
+            class ASubFSM(AFSM):
+                pass
+
+            AFSM().to_next_state()
+            ASubFSM().to_next_state()
+        finally:
+            unobserve(metrics)
+
+        # Then
+        assert metrics.transitions == {
+            (AFSM, _State.INITIAL, _State.NEXT): 1,
+            (ASubFSM, _State.INITIAL, _State.NEXT): 1,
+        }
+        assert not AFSM.to_next_state.__class_options__.observers
+
+
+class TestLatencyHistogram:
+    def quantile_succeeds(self) -> None:
+        # Given
+        histogram = LatencyHistogram()
+
+        # When
+        for duration in (0, 3, 100, 100, 5000):
+            histogram.record(duration)
+
+        # Then
+        assert (histogram.count, histogram.mean()) == (5, 1040.6)
+        assert [histogram.quantile(fraction) for fraction in (0.0, 0.5, 0.8, 1.0)] == [1, 128, 128, 8192]
@@ -0,0 +1,36 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+import subprocess  # nosec B404
+import sys
+
+from pytest import raises
+
+import afsm
+from afsm._fleet import Fleet
+from afsm._observe import observe
+
+
+class TestPackage:
+    def import_without_subsystems_succeeds(self) -> None:
+        # Given
+        script = "import sys, afsm; print(sorted(name for name in sys.modules if name.startswith('afsm.')))"
+
+        # When
+        output = subprocess.run(  # nosec B603
+            [sys.executable, "-c", script], check=True, capture_output=True, text=True
+        ).stdout
+
+        # Then
+        assert "'afsm._fsm'" in output
+        assert all(f"'afsm.{name}'" not in output for name in ("_fleet", "_journal", "_shard", "_snapshot"))
+
+    def lazy_attribute_succeeds(self) -> None:
+        # Then
+        assert afsm.Fleet is Fleet
+        assert afsm.observe is observe
+        assert {"Fleet", "Snapshot", "StateMixin"} <= set(dir(afsm))
+
+    def unknown_attribute_fails(self) -> None:
+        # Then
+        with raises(AttributeError):
+            # When
+            getattr(afsm, "unknown")
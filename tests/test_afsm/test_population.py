@@ -0,0 +1,259 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+import gc
+from asyncio import run
+from enum import auto
+from pathlib import Path
+from typing import Any, Callable, cast
+
+from attr import frozen
+from pytest import FixtureRequest, fixture
+
+from afsm import Population, Snapshot, State, StateMixin, transition
+
+
+class _State(State):
+    OPEN = auto()
+    CLOSING = auto()
+    CLOSED = auto()
+
+
+class _Order(State):
+    NEW = auto()
+    FULFILLING = auto()
+
+
+class _Shipping(State, parent=_Order.FULFILLING):
+    PACKING = auto()
+    SHIPPED = auto()
+
+
+class _Payment(State, parent=_Order.FULFILLING):
+    PENDING = auto()
+    PAID = auto()
+
+
+class TestPopulation:
+    @fixture
+    def population(self) -> Population:
+        return Population()
+
+    @fixture(
+        params=({}, {"compact": True}, {"thread_safe": True}),
+        ids=("default", "compact:True", "thread_safe:True"),
+    )
+    def machine_class(self, request: FixtureRequest, population: Population) -> Callable[..., Any]:
+        class AFSM(StateMixin, initial_state=_State.OPEN, population=population, **request.param):
+            @transition(from_=_State.OPEN, to_=_State.CLOSING)
+            def close(self) -> None:
+                pass
+
+            @transition(from_=_State.CLOSING, to_=_State.CLOSED)
+            def finish(self) -> None:
+                pass
+
+            @transition(from_=_State.OPEN)
+            def ping(self) -> None:
+                pass
+
+            @transition(from_=_State.OPEN, to_=_State.CLOSED)
+            def fail(self) -> None:
+                raise RuntimeError("Failed")
+
+        return cast(Callable[..., Any], AFSM)
+
+    def count_succeeds(self, machine_class: Any, population: Population) -> None:
+        # Given
+        machines = [machine_class() for _ in range(3)]
+
+        # When
+        machines[0].close()
+        machines[1].close()
+        machines[1].finish()
+        machines[2].ping()
+
+        # Then
+        assert len(population) == 3
+        assert population.count(_State.OPEN) == 1
+        assert population.count(_State.CLOSING) == 1
+        assert population.count(_State.CLOSED) == 1
+        assert population.counts() == {_State.OPEN: 1, _State.CLOSING: 1, _State.CLOSED: 1}
+
+    def members_succeeds(self, machine_class: Any, population: Population) -> None:
+        # Given
+        first, second, third = machine_class(), machine_class(), machine_class()
+
+        # When
+        third.close()
+        first.close()
+
+        # Then
+        assert list(population.members(_State.CLOSING)) == [third, first]
+        assert list(population.members(_State.OPEN)) == [second]
+        assert not list(population.members(_State.CLOSED))
+
+    def failed_transition_succeeds(self, machine_class: Any, population: Population) -> None:
+        # Given
+        afsm = machine_class()
+
+        # When
+        try:
+            afsm.fail()
+        except RuntimeError:
+            pass
+
+        # Then
+        assert population.counts() == {_State.OPEN: 1}
+
+    def collected_machine_succeeds(self, machine_class: Any, population: Population) -> None:
+        # Given
+        afsm = machine_class()
+        afsm.close()
+
+        # When
+        del afsm
+        gc.collect()
+
+        # Then
+        assert len(population) == 0
+        assert population.count(_State.CLOSING) == 0
+        assert not population.counts()
+
+    def clone_succeeds(self, machine_class: Any, population: Population) -> None:
+        # Given
+        afsm = machine_class()
+        afsm.close()
+
+        # When
+        clones = [afsm.clone(), *machine_class.create_many(2)]
+
+        # Then
+        assert population.counts() == {_State.OPEN: 2, _State.CLOSING: 2}
+        assert clones[0] in population.members(_State.CLOSING)
+
+
+class TestPopulationOptions:
+    def async_transition_succeeds(self) -> None:
+        # Given
+        population = Population()
+
+        class AFSM(StateMixin, initial_state=_State.OPEN, population=population):
+            @transition(from_=_State.OPEN, to_=_State.CLOSING)
+            async def close(self) -> None:
+                pass
+
+        afsm = AFSM()
+
+        # When
+        run(afsm.close())
+
+        # Then
+        assert population.counts() == {_State.CLOSING: 1}
+
+    def hierarchical_machine_succeeds(self) -> None:
+        # Given
+        population = Population()
+
+        class AFSM(StateMixin, initial_state=_Order.NEW, population=population):
+            @transition(from_=_Order.NEW, to_=_Order.FULFILLING)
+            def start(self) -> None:
+                pass
+
+            @transition(from_=_Payment.PENDING, to_=_Payment.PAID)
+            def pay(self) -> None:
+                pass
+
+        first, second = AFSM(), AFSM()
+
+        # When
+        first.start()
+        first.pay()
+
+        # Then
+        assert population.count(_Order.NEW) == 1
+        assert population.count(_Order.FULFILLING) == 1
+        assert population.count(_Payment.PAID) == 1
+        assert population.count(_Payment.PENDING) == 0
+        assert population.count(_Shipping.PACKING) == 1
+        assert list(population.members(_Order.NEW)) == [second]
+
+    def shared_population_succeeds(self) -> None:
+        # Given
+        population = Population()
+
+        @frozen(slots=True)
+        class Parent(StateMixin, initial_state=_State.OPEN, population=population):
+            name: str
+
+            @transition(from_=_State.OPEN, to_=_State.CLOSING)
+            def close(self) -> None:
+                pass
+
+        @frozen(slots=True)
+        class Child(Parent):
+            pass
+
+        # When
+        parent = Parent("parent")
+        child = Child("child")
+        child.close()
+
+        # Then
+        assert population.counts() == {_State.OPEN: 1, _State.CLOSING: 1}
+        assert list(population.members(_State.OPEN)) == [parent]
+
+    def track_restored_machines_succeeds(self, tmp_path: Path) -> None:
+        # Given
+        population = Population()
+
+        class AFSM(StateMixin, initial_state=_State.OPEN, compact=True, population=population):
+            @transition(from_=_State.OPEN, to_=_State.CLOSING)
+            def close(self) -> None:
+                pass
+
+        machines = [AFSM(), AFSM()]
+        machines[0].close()
+        Snapshot.write(str(tmp_path / "snapshot"), AFSM, machines)
+        del machines
+        gc.collect()
+
+        with Snapshot(str(tmp_path / "snapshot"), AFSM) as snapshot:
+            restored = snapshot.restore()
+
+        # When
+        for machine in restored:
+            population.track(machine)
+
+        # Then
+        assert population.counts() == {_State.OPEN: 1, _State.CLOSING: 1}
+
+    def custom_constructor_succeeds(self) -> None:
+        # Given
+        population = Population()
+        created = []
+
+        class Base(StateMixin, initial_state=_State.OPEN):
+            def __new__(cls, *args: Any, **kwargs: Any) -> Any:
+                created.append(cls)
+                return super().__new__(cls, *args, **kwargs)
+
+        class AFSM(Base, population=population):
+            pass
+
+        class Child(AFSM):
+            pass
+
+        # When
+        afsm, child = AFSM(), Child()
+
+        # Then
+        assert created == [AFSM, Child]
+        assert population.counts() == {_State.OPEN: 2}
+        assert list(population.members(_State.OPEN)) == [afsm, child]
+
+    def no_population_succeeds(self) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.OPEN):
+            pass
+
+        # Then
+        assert AFSM.__new__ is StateMixin.__new__
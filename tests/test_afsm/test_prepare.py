@@ -0,0 +1,194 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from enum import auto
+from typing import Any, Callable
+
+from pytest import raises
+
+from afsm import Population, Rejection, State, StateError, StateMixin, TransientState, transition
+from afsm._prepare import is_prepared
+
+
+class _State(State):
+    INITIAL = auto()
+    NEXT = auto()
+    FINAL = auto()
+
+
+class TestLazyPreparation:
+    def with_lazy_preparation_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+        afsm = AFSM()
+        assert not is_prepared(AFSM)
+
+        # When
+        afsm.to_next_state()
+
+        # Then
+        assert is_prepared(AFSM)
+        assert afsm.current_state is _State.NEXT
+        assert AFSM.to_next_state.__name__ == "to_next_state"
+
+    def subclass_of_unprepared_class_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+        @class_decorator
+        class ASubFSM(AFSM, compact=True):
+            @transition(from_=_State.NEXT, to_=_State.FINAL)
+            def to_final_state(self) -> None:
+                pass
+
+        afsm = ASubFSM()
+
+        # When
+        afsm.to_next_state()
+        afsm.to_final_state()
+
+        # Then
+        assert afsm.current_state is _State.FINAL
+        assert not is_prepared(AFSM)
+
+        with raises(StateError):
+            afsm.to_next_state()
+
+    def compact_subclass_of_prepared_class_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+        AFSM().to_next_state()
+
+        @class_decorator
+        class ASubFSM(AFSM, compact=True):
+            pass
+
+        afsm = ASubFSM()
+
+        # When
+        afsm.to_next_state()
+
+        # Then
+        assert afsm.current_state is _State.NEXT
+        assert ASubFSM.to_next_state is not AFSM.to_next_state
+
+    def thread_safe_subclass_of_prepared_class_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> Any:
+                return self.current_state
+
+        AFSM().to_next_state()
+
+        @class_decorator
+        class ASubFSM(AFSM, thread_safe=True):
+            pass
+
+        afsm = ASubFSM()
+
+        # When
+        state_in_transition = afsm.to_next_state()
+
+        # Then
+        assert state_in_transition is TransientState.IN_TRANSITION
+        assert afsm.current_state is _State.NEXT
+
+    def populated_subclass_of_prepared_class_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+        AFSM().to_next_state()
+        population = Population()
+
+        @class_decorator
+        class ASubFSM(AFSM, population=population):
+            pass
+
+        afsm = ASubFSM()
+
+        # When
+        afsm.to_next_state()
+
+        # Then
+        assert population.count(_State.INITIAL) == 0
+        assert population.count(_State.NEXT) == 1
+
+    def super_call_into_unprepared_class_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> str:
+                return "base"
+
+        class ASubFSM(AFSM):  # Not decorated, as rebuilding slotted classes breaks `super()`
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> str:
+                return f"sub+{super().to_next_state()}"
+
+        afsm = ASubFSM()
+
+        # When
+        result = afsm.to_next_state()
+
+        # Then
+        assert result == "sub+base"
+        assert afsm.current_state is _State.NEXT
+        assert is_prepared(AFSM)
+
+    def assigned_under_other_name_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        def to_next_state(afsm: Any) -> str:
+            return type(afsm).__name__
+
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            pass
+
+        setattr(AFSM, "go", transition(from_=_State.INITIAL, to_=_State.NEXT)(to_next_state))
+        afsm = AFSM()
+
+        # When
+        result = getattr(afsm, "go")()
+
+        # Then
+        assert result == "AFSM"
+        assert afsm.current_state is _State.NEXT
+
+        with raises(StateError):
+            getattr(afsm, "go")()
+
+    def from_mixin_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        class AMixin:
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> str:
+                return "next"
+
+        @class_decorator
+        class AFSM(AMixin, StateMixin, initial_state=_State.INITIAL):
+            pass
+
+        afsm = AFSM()
+
+        # When
+        result = AMixin.to_next_state(afsm)
+
+        # Then
+        assert result == "next"
+        assert afsm.current_state is _State.NEXT
+        assert AFSM.to_next_state.try_(afsm) is Rejection.REJECTED
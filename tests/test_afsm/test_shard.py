@@ -0,0 +1,157 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from enum import auto
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Optional
+
+from pytest import FixtureRequest, fixture, raises
+
+from afsm import Rejection, ShardedExecutor, State, StateMixin, transition
+
+
+class _State(State):
+    INITIAL = auto()
+    NEXT = auto()
+    FINAL = auto()
+
+
+class _Machine(StateMixin, initial_state=_State.INITIAL):
+    label: Optional[str] = None
+
+    @transition(from_=_State.INITIAL, to_=_State.NEXT)
+    def to_next_state(self, value: int) -> int:
+        return value * 2
+
+    @transition(from_=_State.NEXT, to_=_State.FINAL)
+    def to_final_state(self) -> Optional[str]:
+        return self.label
+
+    @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+    def start(self, value: int) -> int:
+        return value + 1
+
+    @transition(from_=_State.INITIAL, to_=_State.FINAL)
+    def fail(self) -> None:
+        raise RuntimeError("Transition failed")
+
+
+class _CompactMachine(_Machine, compact=True):
+    pass
+
+
+def _labelled(key: int) -> _Machine:
+    machine = _Machine()
+    machine.label = f"machine {key}"
+    return machine
+
+
+class TestShardedExecutor:
+    @fixture(params=(_Machine, _CompactMachine), ids=("compact:False", "compact:True"))
+    def machine_class(self, request: FixtureRequest) -> Any:
+        return request.param
+
+    def run_succeeds(self, machine_class: Any) -> None:
+        # Given
+        with ShardedExecutor(machine_class, 5, processes=2) as executor:
+            # When
+            results = executor.run([(0, "to_next_state", (1,)), (3, "to_next_state", (2,)), (0, "to_next_state", (3,))])
+
+            # Then
+            assert results == [2, 4, Rejection.REJECTED]
+            assert len(executor) == 5
+            assert [executor.state(key) for key in range(5)] == [
+                _State.NEXT,
+                _State.INITIAL,
+                _State.INITIAL,
+                _State.NEXT,
+                _State.INITIAL,
+            ]
+            assert executor.count(_State.NEXT) == 2
+
+    def run_in_order_succeeds(self, machine_class: Any) -> None:
+        # Given
+        with ShardedExecutor(machine_class, 100, processes=3) as executor:
+            # When
+            results = executor.run(
+                [(key, "to_next_state", (key,)) for key in range(100)]
+                + [(key, "to_final_state", ()) for key in range(0, 100, 2)]
+            )
+
+            # Then
+            assert results == [key * 2 for key in range(100)] + [None] * 50
+            assert executor.count(_State.FINAL) == 50
+            assert executor.count(_State.NEXT) == 50
+
+    def run_idempotent_transition_succeeds(self, machine_class: Any) -> None:
+        # Given
+        with ShardedExecutor(machine_class, 4, processes=2) as executor:
+            # When
+            results = executor.run([(0, "start", (1,)), (0, "start", (1,)), (1, "start", (2,)), (0, "start", (3,))])
+
+            # Then
+            assert results == [2, 2, 3, 2]
+            assert executor.count(_State.NEXT) == 2
+
+    def read_from_shared_memory_succeeds(self) -> None:
+        # Given
+        with ShardedExecutor(_Machine, 3, processes=2) as executor:
+            executor.run([(1, "to_next_state", (1,))])
+
+            # When
+            memory = SharedMemory(executor.name)
+            codes = memory.buf[: len(executor)].cast(executor.codes.format)
+
+            # Then
+            assert codes.tolist() == [0, 1, 0]
+
+            codes.release()
+            memory.close()
+
+    def run_with_factory_succeeds(self) -> None:
+        # Given
+        with ShardedExecutor(_Machine, 2, processes=2, factory=_labelled) as executor:
+            # When
+            results = executor.run([(1, "to_next_state", (1,)), (1, "to_final_state", ())])
+
+            # Then
+            assert results == [2, "machine 1"]
+
+    def run_with_spawned_workers_succeeds(self) -> None:
+        # Given
+        with ShardedExecutor(_Machine, 2, processes=1, context="spawn") as executor:
+            # When
+            results = executor.run([(0, "to_next_state", (1,)), (1, "to_next_state", (2,))])
+
+            # Then
+            assert results == [2, 4]
+            assert executor.count(_State.NEXT) == 2
+
+    def run_with_failing_transition_fails(self) -> None:
+        # Given
+        with ShardedExecutor(_Machine, 2, processes=2) as executor:
+            # Then
+            with raises(RuntimeError, match="Transition failed"):
+                # When
+                executor.run([(0, "fail", ()), (1, "to_next_state", (1,))])
+
+            assert executor.state(0) is _State.INITIAL
+            assert executor.state(1) is _State.NEXT
+
+    def run_with_invalid_key_fails(self) -> None:
+        # Given
+        with ShardedExecutor(_Machine, 2, processes=2) as executor:
+            # Then
+            with raises(IndexError):
+                # When
+                executor.run([(0, "to_next_state", (1,)), (2, "to_next_state", (1,))])
+
+            assert executor.count(_State.INITIAL) == 2
+
+    def with_invalid_machine_class_fails(self) -> None:
+        # Given
+        class AFSM(StateMixin):
+            pass
+
+        # Then
+        with raises(ValueError):
+            # When
+            ShardedExecutor(AFSM, 2, processes=1)
@@ -0,0 +1,197 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring,too-few-public-methods
+from enum import auto
+from pathlib import Path
+from typing import Any, Callable, List, cast
+
+from attr import frozen
+from pytest import FixtureRequest, fixture, raises
+
+from afsm import Retention, Snapshot, State, StateError, StateMixin, transition
+
+
+class _State(State):
+    INITIAL = auto()
+    NEXT = auto()
+    FINAL = auto()
+
+
+class _Result:
+    pass
+
+
+class TestSnapshot:
+    @fixture(params=(False, True), ids=("compact:False", "compact:True"))
+    def machine_class(self, request: FixtureRequest) -> Callable[..., Any]:
+        class AFSM(StateMixin, initial_state=_State.INITIAL, compact=request.param):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+            def to_next_state(self, value: str) -> str:
+                return value
+
+            @transition(from_=_State.NEXT, to_=_State.FINAL, is_idempotent=True, cache_size=2)
+            def to_final_state(self, value: str) -> str:
+                return value.upper()
+
+            @transition(from_=_State.INITIAL, to_=_State.FINAL, is_idempotent=True, result_retention=Retention.WEAK)
+            def to_final_state_weakly(self) -> _Result:
+                return _Result()
+
+        return cast(Callable[..., Any], AFSM)
+
+    @fixture
+    def machines(self, machine_class: Callable[..., Any]) -> List[Any]:
+        machines = [machine_class() for _ in range(4)]
+        machines[1].to_next_state("red")
+        machines[2].to_next_state("green")
+        machines[2].to_final_state("blue")
+        return machines
+
+    def restore_succeeds(self, machine_class: Any, machines: List[Any], tmp_path: Path) -> None:
+        # Given
+        path = str(tmp_path / "machines.afsm")
+        Snapshot.write(path, machine_class, machines)
+
+        # When
+        with Snapshot(path, machine_class) as snapshot:
+            restored = snapshot.restore()
+
+        # Then
+        assert [machine.current_state for machine in restored] == [
+            _State.INITIAL,
+            _State.NEXT,
+            _State.FINAL,
+            _State.INITIAL,
+        ]
+        assert restored[1].to_next_state("other") is None
+        assert restored[3].to_next_state("other") == "other"
+        assert {type(machine) for machine in restored} == {machine_class}
+
+    def restore_with_results_succeeds(self, machine_class: Any, machines: List[Any], tmp_path: Path) -> None:
+        # Given
+        path = str(tmp_path / "machines.afsm")
+        Snapshot.write(path, machine_class, machines, results=True)
+
+        # When
+        with Snapshot(path, machine_class) as snapshot:
+            restored = snapshot.restore()
+
+        # Then
+        assert restored[1].to_next_state("other") == "red"
+        assert restored[2].to_final_state("blue") == "BLUE"
+        assert machine_class.to_final_state.cache_info(restored[2]).hits == 1
+
+    def restore_by_index_succeeds(self, machine_class: Any, machines: List[Any], tmp_path: Path) -> None:
+        # Given
+        path = str(tmp_path / "machines.afsm")
+        Snapshot.write(path, machine_class, machines, results=True)
+
+        # When
+        with Snapshot(path, machine_class) as snapshot:
+            machine = snapshot[-3]
+            states = [snapshot.state(index) for index in range(len(snapshot))]
+            iterated = [machine.current_state for machine in snapshot]
+
+        # Then
+        assert machine.current_state is _State.NEXT
+        assert machine.to_next_state("other") == "red"
+        assert states == iterated == [_State.INITIAL, _State.NEXT, _State.FINAL, _State.INITIAL]
+
+    def restore_weak_result_succeeds(self, machine_class: Any, tmp_path: Path) -> None:
+        # Given
+        path = str(tmp_path / "machines.afsm")
+        machine = machine_class()
+        result = machine.to_final_state_weakly()
+        Snapshot.write(path, machine_class, [machine], results=True)
+
+        # When
+        with Snapshot(path, machine_class) as snapshot:
+            restored = snapshot[0]
+
+        # Then
+        assert restored.current_state is _State.FINAL
+        assert restored.to_final_state_weakly() is not result
+
+    def with_other_class_fails(self, machine_class: Any, machines: List[Any], tmp_path: Path) -> None:
+        # Given
+        class OtherState(State):
+            INITIAL = auto()
+
+        class OtherFSM(StateMixin, initial_state=OtherState.INITIAL):
+            pass
+
+        path = str(tmp_path / "machines.afsm")
+        Snapshot.write(path, machine_class, machines)
+
+        # Then
+        with raises(ValueError, match="states"):
+            # When
+            Snapshot(path, OtherFSM)
+
+    def with_reordered_states_fails(self, machine_class: Any, machines: List[Any], tmp_path: Path) -> None:
+        # Given
+        class OtherState(State):
+            FINAL = auto()
+            NEXT = auto()
+            INITIAL = auto()
+
+        class OtherFSM(StateMixin, initial_state=OtherState.INITIAL):
+            pass
+
+        path = str(tmp_path / "machines.afsm")
+        Snapshot.write(path, machine_class, machines)
+
+        # Then
+        with raises(ValueError, match="states other than"):
+            # When
+            Snapshot(path, OtherFSM)
+
+    def with_invalid_file_fails(self, machine_class: Any, tmp_path: Path) -> None:
+        # Given
+        path = tmp_path / "machines.afsm"
+        path.write_bytes(bytes(64))
+
+        # Then
+        with raises(ValueError, match="not a snapshot"):
+            # When
+            Snapshot(str(path), machine_class)
+
+    def write_machine_in_transition_fails(self, tmp_path: Path) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.INITIAL, thread_safe=True):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                Snapshot.write(str(tmp_path / "machines.afsm"), AFSM, [self])
+
+        # Then
+        with raises(ValueError, match="in transition"):
+            # When
+            AFSM().to_next_state()
+
+    def restore_frozen_slotted_class_succeeds(self, tmp_path: Path) -> None:
+        # Given
+        @frozen
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            value: int
+
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                pass
+
+            @transition(from_=_State.NEXT, to_=_State.FINAL)
+            def to_final_state(self) -> None:
+                pass
+
+        path = str(tmp_path / "machines.afsm")
+        machine = AFSM(1)
+        machine.to_next_state()
+        Snapshot.write(path, AFSM, [machine])
+
+        # When
+        with Snapshot(path, AFSM) as snapshot:
+            restored = snapshot[0]
+
+        # Then
+        assert restored.current_state is _State.NEXT
+        restored.to_final_state()
+
+        with raises(StateError):
+            restored.to_final_state()
@@ -0,0 +1,86 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from enum import auto
+from typing import Any
+
+from pytest import fixture
+
+from afsm import State, StateMixin, TransientState, TransitionTable, transition
+
+
+class _State(State):
+    INITIAL = auto()
+    OPEN = auto()
+    CLOSED = auto()
+    ORPHAN = auto()
+
+
+class TestTransitionTable:
+    @fixture
+    def machine_class(self) -> Any:
+        class AFSM(StateMixin, initial_state=_State.INITIAL):
+            @transition(from_=_State.INITIAL, to_=_State.OPEN, is_idempotent=True)
+            def open(self) -> None:
+                pass
+
+            @transition()
+            def describe(self) -> None:
+                pass
+
+        class ASubFSM(AFSM):
+            @transition(from_=_State.OPEN, to_=_State.CLOSED)
+            def close(self) -> None:
+                pass
+
+            @transition(from_=(_State.OPEN, _State.CLOSED))
+            def read(self) -> None:
+                pass
+
+        return ASubFSM
+
+    def available_succeeds(self, machine_class: Any) -> None:
+        # Given
+        table = TransitionTable.of(machine_class)
+
+        # Then
+        assert table.available(machine_class().current_state) == ("open", "describe")
+        assert table.available(_State.OPEN) == ("open", "describe", "close", "read")
+        assert table.available(_State.CLOSED) == ("describe", "read")
+        assert table.available(_State.ORPHAN) == ("describe",)
+        assert table.states == {_State.INITIAL, _State.OPEN, _State.CLOSED}
+
+    def allows_succeeds(self, machine_class: Any) -> None:
+        # Given
+        table = TransitionTable.of(machine_class)
+
+        # Then
+        assert table.allows(_State.OPEN, "close")
+        assert table.allows(_State.ORPHAN, "describe")
+        assert not table.allows(_State.CLOSED, "close")
+        assert not table.allows(_State.OPEN, "undeclared")
+
+    def reachable_succeeds(self, machine_class: Any) -> None:
+        # Given
+        table = TransitionTable.of(machine_class)
+
+        # Then
+        assert table.reachable(_State.INITIAL) == {_State.INITIAL, _State.OPEN, _State.CLOSED}
+        assert table.reachable(_State.CLOSED) == {_State.CLOSED}
+        assert table.reachable(_State.ORPHAN) == {_State.ORPHAN}
+
+    def with_transitions_from_any_state_succeeds(self) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.INITIAL, thread_safe=True):
+            @transition(to_=_State.CLOSED)
+            def close(self) -> None:
+                pass
+
+            @transition()
+            def describe(self) -> None:
+                pass
+
+        # When
+        table = TransitionTable.of(AFSM)
+
+        # Then
+        assert table.reachable(_State.ORPHAN) == {_State.ORPHAN, _State.CLOSED}
+        assert table.available(TransientState.IN_TRANSITION) == ("describe",)
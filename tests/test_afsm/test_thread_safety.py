@@ -0,0 +1,180 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from asyncio import gather, run, sleep
+from enum import auto
+from threading import Barrier, Event, Thread
+from typing import Any, Callable, List, Tuple
+
+from pytest import mark, raises
+
+from afsm import State, StateError, StateMixin, TransientState, TransitionMetrics, observe, transition
+
+
+class _State(State):
+    INITIAL = auto()
+    NEXT = auto()
+    FINAL = auto()
+
+
+class TestThreadSafeTransition:
+    @mark.parametrize("compact", (False, True), ids=("compact:False", "compact:True"))
+    def from_claimed_instance_fails(self, class_decorator: Callable[..., Any], compact: bool) -> None:
+        # Given
+        entered, release = Event(), Event()
+
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL, compact=compact, thread_safe=True):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                entered.set()
+                release.wait()
+
+            @transition(to_=_State.FINAL)
+            def to_final_state(self) -> None:
+                pass
+
+        afsm = AFSM()
+        thread = Thread(target=afsm.to_next_state)
+        thread.start()
+        entered.wait()
+        claimed_state = afsm.current_state
+
+        # Then
+        assert claimed_state is TransientState.IN_TRANSITION
+
+        for claimed_transition in (afsm.to_next_state, afsm.to_final_state):
+            with raises(StateError, match="Actual state: IN_TRANSITION"):
+                # When
+                claimed_transition()
+
+        release.set()
+        thread.join()
+        assert afsm.current_state is _State.NEXT
+
+    def from_concurrent_threads_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        barrier = Barrier(8)
+        calls: List[None] = []
+
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL, thread_safe=True):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT, is_idempotent=True)
+            def to_next_state(self) -> None:
+                calls.append(None)
+
+        afsm = AFSM()
+        errors: List[StateError] = []
+
+        def run_transition() -> None:
+            barrier.wait()
+
+            try:
+                afsm.to_next_state()
+            except StateError as error:
+                errors.append(error)
+
+        threads = [Thread(target=run_transition) for _ in range(barrier.parties)]
+
+        # When
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        # Then
+        assert len(calls) == 1
+        assert len(errors) < barrier.parties
+        assert afsm.current_state is _State.NEXT
+
+    def observe_concurrent_threads_succeeds(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        barrier = Barrier(8)
+
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL, thread_safe=True):
+            @transition()
+            def to_same_state(self) -> None:
+                pass
+
+        metrics = TransitionMetrics(sample_every=3)
+        observe(metrics, AFSM)
+        machines = [AFSM() for _ in range(barrier.parties)]
+
+        def run_transitions(afsm: AFSM) -> None:
+            barrier.wait()
+
+            for _ in range(1000):
+                afsm.to_same_state()
+
+        threads = [Thread(target=run_transitions, args=(afsm,)) for afsm in machines]
+
+        # When
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        # Then
+        assert metrics.transitions[AFSM, _State.INITIAL, _State.INITIAL] == 8000
+        assert metrics.latencies[AFSM, "to_same_state"].count == 8000 // 3
+
+    def raises_on_unhandled_exception(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL, thread_safe=True):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self, value: str) -> None:
+                raise ValueError(value)
+
+        afsm = AFSM()
+
+        # Then
+        with raises(ValueError, match="red"):
+            # When
+            afsm.to_next_state("red")
+
+        assert afsm.current_state is _State.INITIAL
+
+    def nested_in_transition_fails(self, class_decorator: Callable[..., Any]) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL, thread_safe=True):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            def to_next_state(self) -> None:
+                self.to_final_state()
+
+            @transition(from_=(_State.INITIAL, _State.NEXT), to_=_State.FINAL)
+            def to_final_state(self) -> None:
+                pass
+
+        afsm = AFSM()
+
+        # Then
+        with raises(StateError):
+            # When
+            afsm.to_next_state()
+
+        assert afsm.current_state is _State.INITIAL
+
+
+class TestAsyncTransition:
+    @mark.parametrize("serialize_async", (False, True))
+    def from_concurrent_tasks_succeeds(self, class_decorator: Callable[..., Any], serialize_async: bool) -> None:
+        # Given
+        @class_decorator
+        class AFSM(StateMixin, initial_state=_State.INITIAL, serialize_async=serialize_async):
+            @transition(from_=_State.INITIAL, to_=_State.NEXT)
+            async def to_next_state(self) -> None:
+                await sleep(0)
+
+        afsm = AFSM()
+
+        async def run_concurrently() -> Tuple[Any, ...]:
+            return await gather(afsm.to_next_state(), afsm.to_next_state(), return_exceptions=True)
+
+        # When
+        results = run(run_concurrently())
+
+        # Then
+        assert [isinstance(result, StateError) for result in results] == [False, serialize_async]
@@ -0,0 +1,368 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+from asyncio import get_running_loop, run, sleep
+from enum import auto
+from pathlib import Path
+from time import sleep as sleep_sync
+from typing import Any, Callable, List, Tuple
+
+from pytest import FixtureRequest, fixture, raises
+
+from afsm import Snapshot, State, StateMixin, TimingWheel, transition
+
+
+class _State(State):
+    OPEN = auto()
+    IDLE = auto()
+    EXPIRED = auto()
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Order(State):
+    FULFILLING = auto()
+    EXPIRED = auto()
+
+
+class _Fulfilling(State, parent=_Order.FULFILLING):
+    PAYING = auto()
+    SHIPPING = auto()
+
+
+class TestTimingWheel:
+    @fixture
+    def clock(self) -> _Clock:
+        return _Clock()
+
+    @fixture
+    def errors(self) -> List[Tuple[Any, BaseException]]:
+        return []
+
+    @fixture
+    def wheel(self, clock: _Clock, errors: List[Tuple[Any, BaseException]]) -> TimingWheel:
+        return TimingWheel(
+            tick=1, slots=8, clock=clock, on_error=lambda instance, error: errors.append((instance, error))
+        )
+
+    @fixture(params=(False, True), ids=("compact:False", "compact:True"))
+    def machine_class(self, request: FixtureRequest, wheel: TimingWheel) -> Callable[..., Any]:
+        class AFSM(StateMixin, initial_state=_State.OPEN, compact=request.param, timers=wheel):
+            @transition(from_=_State.OPEN, to_=_State.EXPIRED, timeout=30)
+            def expire(self) -> None:
+                pass
+
+            @transition(from_=_State.OPEN, to_=_State.OPEN)
+            def touch(self) -> None:
+                pass
+
+            @transition(from_=(_State.OPEN, _State.EXPIRED), to_=_State.IDLE)
+            def idle(self) -> None:
+                pass
+
+            @transition(from_=_State.IDLE, to_=_State.OPEN)
+            def reopen(self) -> None:
+                pass
+
+        return AFSM
+
+    def timeout_succeeds(self, machine_class: Any, wheel: TimingWheel, clock: _Clock) -> None:
+        # Given
+        afsm = machine_class()
+        clock.now = 29.5
+        wheel.advance()
+        state_before_timeout = afsm.current_state
+
+        # When
+        clock.now = 30
+        wheel.advance()
+
+        # Then
+        assert state_before_timeout is _State.OPEN
+        assert afsm.current_state is _State.EXPIRED
+
+    def timeout_after_leaving_state_succeeds(self, machine_class: Any, wheel: TimingWheel, clock: _Clock) -> None:
+        # Given
+        afsm = machine_class()
+        clock.now = 10
+        afsm.idle()
+
+        # When
+        clock.now = 100
+        wheel.advance()
+
+        # Then
+        assert afsm.current_state is _State.IDLE
+        assert len(wheel) == 0
+
+    def timeout_after_reentering_state_succeeds(self, machine_class: Any, wheel: TimingWheel, clock: _Clock) -> None:
+        # Given
+        afsm = machine_class()
+        other = machine_class()
+        clock.now = 20
+        afsm.touch()
+        other.idle()
+        other.reopen()
+
+        # When
+        clock.now = 45
+        wheel.advance()
+        states_before_timeout = [afsm.current_state, other.current_state]
+        clock.now = 50
+        wheel.advance()
+
+        # Then
+        assert states_before_timeout == [_State.OPEN, _State.OPEN]
+        assert [afsm.current_state, other.current_state] == [_State.EXPIRED, _State.EXPIRED]
+
+    def timeout_after_reentering_state_many_times_succeeds(
+        self, machine_class: Any, wheel: TimingWheel, clock: _Clock
+    ) -> None:
+        # Given
+        afsm = machine_class()
+
+        # When
+        for _ in range(100):
+            afsm.touch()
+
+        # Then
+        assert len(wheel) == 1
+
+        clock.now = 30
+        wheel.advance()
+        assert afsm.current_state is _State.EXPIRED
+
+    def timeout_after_long_pause_succeeds(self, machine_class: Any, wheel: TimingWheel, clock: _Clock) -> None:
+        # Given
+        machines = [machine_class() for _ in range(3)]
+        clock.now = 5
+        machines[1].touch()
+
+        # When
+        clock.now = 1000
+        wheel.advance()
+
+        # Then
+        assert [machine.current_state for machine in machines] == [_State.EXPIRED] * 3
+
+    def timeout_with_error_succeeds(self, wheel: TimingWheel, clock: _Clock, errors: List[Any]) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.OPEN, timers=wheel):
+            @transition(from_=_State.OPEN, to_=_State.EXPIRED, timeout=1)
+            def expire(self) -> None:
+                raise ValueError("expire")
+
+        afsm = AFSM()
+
+        # When
+        clock.now = 1
+        wheel.advance()
+
+        # Then
+        assert afsm.current_state is _State.OPEN
+        assert [(instance, type(exception)) for instance, exception in errors] == [(afsm, ValueError)]
+
+    def timeout_of_claimed_instance_succeeds(self, wheel: TimingWheel, clock: _Clock, errors: List[Any]) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.OPEN, thread_safe=True, timers=wheel):
+            @transition(from_=_State.OPEN, to_=_State.EXPIRED, timeout=1)
+            def expire(self) -> None:
+                pass
+
+            @transition(from_=_State.OPEN, to_=_State.IDLE)
+            def idle(self) -> None:
+                clock.now = 1
+                wheel.advance()
+                raise ValueError("idle")
+
+        afsm = AFSM()
+
+        with raises(ValueError):
+            afsm.idle()
+
+        state_while_claimed = afsm.current_state
+
+        # When
+        clock.now = 2
+        wheel.advance()
+
+        # Then
+        assert state_while_claimed is _State.OPEN
+        assert afsm.current_state is _State.EXPIRED
+        assert not errors
+
+    def timeout_with_rejecting_guard_succeeds(self, wheel: TimingWheel, clock: _Clock) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_State.OPEN, timers=wheel):
+            def __init__(self) -> None:
+                self.ready = False
+
+            @transition(from_=_State.OPEN, to_=_State.EXPIRED, timeout=1, guard=lambda afsm: afsm.ready)
+            def expire(self) -> None:
+                pass
+
+        afsm = AFSM()
+        clock.now = 1
+        wheel.advance()
+        state_while_rejected = afsm.current_state
+        afsm.ready = True
+
+        # When
+        clock.now = 2
+        wheel.advance()
+
+        # Then
+        assert state_while_rejected is _State.OPEN
+        assert afsm.current_state is _State.EXPIRED
+        assert len(wheel) == 0
+
+    def timeout_with_custom_constructor_succeeds(self, wheel: TimingWheel, clock: _Clock) -> None:
+        # Given
+        created: List[Any] = []
+
+        class Base(StateMixin, initial_state=_State.OPEN):
+            def __new__(cls, *args: Any, **kwargs: Any) -> Any:
+                instance = super().__new__(cls, *args, **kwargs)
+                created.append(instance)
+                return instance
+
+        class AFSM(Base, timers=wheel):
+            @transition(from_=_State.OPEN, to_=_State.EXPIRED, timeout=1)
+            def expire(self) -> None:
+                pass
+
+        class Child(AFSM):
+            pass
+
+        # When
+        machines = [AFSM(), Child()]
+        clock.now = 1
+        wheel.advance()
+
+        # Then
+        assert created == machines
+        assert [afsm.current_state for afsm in machines] == [_State.EXPIRED, _State.EXPIRED]
+
+    def timeout_of_composite_state_succeeds(self, wheel: TimingWheel, clock: _Clock) -> None:
+        # Given
+        class AFSM(StateMixin, initial_state=_Order.FULFILLING, timers=wheel):
+            @transition(from_=_Order.FULFILLING, to_=_Order.EXPIRED, timeout=30)
+            def expire(self) -> None:
+                pass
+
+            @transition(from_=_Fulfilling.PAYING, to_=_Fulfilling.SHIPPING)
+            def ship(self) -> None:
+                pass
+
+        afsm = AFSM()
+        clock.now = 20
+        afsm.ship()
+
+        # When
+        clock.now = 30
+        wheel.advance()
+
+        # Then
+        active_states = afsm.current_state
+        assert isinstance(active_states, frozenset)
+        assert active_states == {_Order.EXPIRED}
+
+    def track_succeeds(self, machine_class: Any, wheel: TimingWheel, clock: _Clock, tmp_path: Path) -> None:
+        # Given
+        path = str(tmp_path / "machines.afsm")
+        Snapshot.write(path, machine_class, [machine_class()])
+
+        with Snapshot(path, machine_class) as snapshot:
+            afsm = snapshot[0]
+
+        wheel.track(afsm)
+        wheel.track(afsm)
+
+        # When
+        clock.now = 30
+        wheel.advance()
+
+        # Then
+        assert afsm.current_state is _State.EXPIRED
+
+    def start_succeeds(self) -> None:
+        # Given
+        wheel = TimingWheel(tick=0.01)
+
+        class AFSM(StateMixin, initial_state=_State.OPEN, timers=wheel):
+            @transition(from_=_State.OPEN, to_=_State.EXPIRED, timeout=0.02)
+            def expire(self) -> None:
+                pass
+
+        afsm = AFSM()
+
+        # When
+        wheel.start()
+
+        try:
+            for _ in range(500):
+                if afsm.current_state is _State.EXPIRED:
+                    break
+
+                sleep_sync(0.01)
+        finally:
+            wheel.stop()
+
+        # Then
+        assert afsm.current_state is _State.EXPIRED
+
+    def run_succeeds(self) -> None:
+        # Given
+        wheel = TimingWheel(tick=0.01)
+
+        class AFSM(StateMixin, initial_state=_State.OPEN, timers=wheel, serialize_async=True):
+            @transition(from_=_State.OPEN, to_=_State.EXPIRED, timeout=0.02)
+            async def expire(self) -> None:
+                await sleep(0)
+
+        async def expire() -> AFSM:
+            afsm: AFSM = AFSM()
+            task = get_running_loop().create_task(wheel.run())
+
+            for _ in range(500):
+                if afsm.current_state is _State.EXPIRED:
+                    break
+
+                await sleep(0.01)
+
+            task.cancel()
+            return afsm
+
+        # When
+        afsm = run(expire())
+
+        # Then
+        assert afsm.current_state is _State.EXPIRED
+
+    def with_invalid_timeout_fails(self) -> None:
+        # Then
+        with raises(ValueError):
+            # When
+            transition(to_=_State.EXPIRED, timeout=1)
+
+        with raises(ValueError):
+            transition(from_=_State.OPEN, to_=_State.EXPIRED, timeout=0)
+
+    def without_timing_wheel_fails(self) -> None:
+        # Then
+        with raises(ValueError, match="timing wheel"):
+            # When
+            class AFSM(StateMixin, initial_state=_State.OPEN):  # pylint: disable=unused-variable
+                @transition(from_=_State.OPEN, to_=_State.EXPIRED, timeout=1)
+                def expire(self) -> None:
+                    pass
+
+    def with_invalid_tick_fails(self) -> None:
+        # Then
+        with raises(ValueError):
+            # When
+            TimingWheel(tick=0)